@@ -0,0 +1,90 @@
+"""Requests per second served by the HTTP API.
+
+    python -m benchmarks.bench_api --people 10000 --clients 8 --seconds 5
+
+The server runs in a forked process on a seeded database and every
+client thread keeps one HTTP/1.1 connection open.
+"""
+
+import argparse
+import multiprocessing
+import socket
+import threading
+import time
+
+import httpx
+
+from benchmarks.data import seeded_database
+from dundie import api
+from dundie.core import create_api_token
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def client(url, token, path, deadline, latencies):
+    with httpx.Client(
+        base_url=url, headers={"Authorization": f"Bearer {token}"}
+    ) as http:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            http.get(path).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    paths = ["/people?dept=Dept%201&per_page=50", "/stats", "/movements"]
+
+    with seeded_database(args.people):
+        token = create_api_token()
+        port = free_port()
+        server = multiprocessing.get_context("fork").Process(
+            target=api.serve, args=("127.0.0.1", port), daemon=True
+        )
+        server.start()
+        url = f"http://127.0.0.1:{port}"
+
+        while True:
+            try:
+                httpx.get(url)
+                break
+            except httpx.TransportError:
+                time.sleep(0.05)
+
+        try:
+            for path in paths:
+                latencies: list = []
+                deadline = time.perf_counter() + args.seconds
+                threads = [
+                    threading.Thread(
+                        target=client,
+                        args=(url, token, path, deadline, latencies),
+                    )
+                    for _ in range(args.clients)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+                latencies.sort()
+                p99 = latencies[int(len(latencies) * 0.99) - 1]
+                print(
+                    f"{path:<36} {len(latencies) / args.seconds:8.1f} req/s "
+                    f"p99={p99 * 1000:.1f}ms"
+                )
+        finally:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Many concurrent reads against one SQLite file, sync vs asyncio.
+
+    python -m benchmarks.bench_async --people 10000 --reads 500
+
+The sync API serves the reads one after another, the async API keeps up
+to `--concurrency` of them in flight on a single event loop.
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.data import seeded_database
+from dundie import core, core_async
+
+
+def emails(people, reads):
+    return [f"person{i % (people - 1) + 1}@dm.com" for i in range(reads)]
+
+
+async def read_concurrently(addresses, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def read(email):
+        async with semaphore:
+            return await core_async.read(email=email)
+
+    return await asyncio.gather(*[read(email) for email in addresses])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=10_000)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    addresses = emails(args.people, args.reads)
+
+    with seeded_database(args.people):
+        start = time.perf_counter()
+        for email in addresses:
+            core.read(email=email)
+        elapsed = time.perf_counter() - start
+        print(f"sync       {args.reads / elapsed:8.1f} reads/s")
+
+        start = time.perf_counter()
+        asyncio.run(read_concurrently(addresses, args.concurrency))
+        elapsed = time.perf_counter() - start
+        print(
+            f"async({args.concurrency:<3}) {args.reads / elapsed:8.1f} reads/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
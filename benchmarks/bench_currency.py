@@ -0,0 +1,72 @@
+"""Currency conversion cost of `core.read` on a multi-currency roster.
+
+    python -m benchmarks.bench_currency --people 100000
+
+Rates are stubbed so only dundie's work is measured. `previous` is the
+old path: a DISTINCT query for the currencies, then a rate attribute
+lookup per row.
+"""
+
+import argparse
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from sqlmodel import select
+
+from benchmarks.data import seeded_database
+from dundie import core
+from dundie.database import get_session
+from dundie.models import Person
+from dundie.records import PersonRecord
+from dundie.utils.cache import clear_cache
+from dundie.utils.exchange import USDRate
+
+CURRENCIES = ("USD", "BRL", "EUR", "GBP", "JPY")
+
+
+def fake_rates(currencies):
+    return {
+        code: USDRate(high=Decimal(i + 1) / 3)
+        for i, code in enumerate(currencies)
+    }
+
+
+def previous_read():
+    with get_session() as session:
+        currencies = session.exec(select(Person.currency).distinct())
+        rates = fake_rates(list(currencies))
+        rows = session.exec(core.read_sql({})).all()
+
+    return [
+        PersonRecord(*row, rates[row.currency].value * row.value)
+        for row in rows
+    ]
+
+
+def measure(label, func, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        clear_cache()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<16} rows={len(result):<8} best={best:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with (
+        seeded_database(args.people, currencies=CURRENCIES),
+        patch("dundie.core.get_rates", side_effect=fake_rates),
+    ):
+        measure("previous", previous_read)
+        measure("read", core.read)
+        measure("read --currency", lambda: core.read(currency="EUR"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Command latency with and without `dundie serve`.
+
+    python -m benchmarks.bench_daemon --runs 20 -- show --format tsv
+
+Each run spawns a fresh `python -m dundie` process, as automation does.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run(argv, env, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "dundie", *argv],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<12} mean={statistics.mean(timings) * 1000:.0f}ms "
+        f"p50={statistics.median(timings) * 1000:.0f}ms "
+        f"p95={p95 * 1000:.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("argv", nargs="*", default=["--version"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "dundie.sock")
+        env = {**os.environ, "DUNDIE_SOCKET": socket_path}
+
+        report(
+            "in-process",
+            run(args.argv, {**env, "DUNDIE_NO_DAEMON": "1"}, args.runs),
+        )
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "dundie", "serve"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.05)
+            report("daemon", run(args.argv, env, args.runs))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Blocking vs asyncio SMTP delivery against a slow local server.
+
+    python -m benchmarks.bench_email --messages 200 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import socket
+import time
+from unittest.mock import patch
+
+from aiosmtpd.controller import Controller
+
+from dundie.utils.email import send_emails_async, send_emails_blocking
+
+
+class SlowHandler:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    port = free_port()
+    controller = Controller(
+        SlowHandler(args.latency), hostname="127.0.0.1", port=port
+    )
+    controller.start()
+
+    messages = [
+        ("master@dundie.com", f"user{i}@dm.com", "Benchmark", "text")
+        for i in range(args.messages)
+    ]
+
+    try:
+        with (
+            patch("dundie.utils.email.SMTP_HOST", "127.0.0.1"),
+            patch("dundie.utils.email.SMTP_PORT", port),
+        ):
+            start = time.perf_counter()
+            sent = send_emails_blocking(messages)
+            blocking = time.perf_counter() - start
+            print(f"blocking: {sent} sent in {blocking:.2f}s")
+
+            start = time.perf_counter()
+            sent = asyncio.run(
+                send_emails_async(messages, concurrency=args.concurrency)
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f"async({args.concurrency}): {sent} sent in {elapsed:.2f}s "
+                f"({blocking / elapsed:.1f}x)"
+            )
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Ledger export: columnar file vs CSV, size and time.
+
+    python -m benchmarks.bench_ledger --people 10000 --movements 50
+
+CSV is what finance builds today from `dundie movements`. Both files are
+then read back to total the values per actor.
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from decimal import Decimal
+
+from benchmarks.data import seeded_database
+from dundie import core
+from dundie.ledger import LedgerReader
+from dundie.records import format_field
+
+
+def timed(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def export_csv(path):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        for record in core.movements():
+            writer.writerow(map(format_field, record))
+
+
+def read_csv(path):
+    totals: Counter = Counter()
+    with open(path, newline="") as file:
+        for row in csv.reader(file):
+            totals[row[6]] += Decimal(row[5])
+    return totals
+
+
+def read_ledger(path):
+    totals: Counter = Counter()
+    with LedgerReader(path) as ledger:
+        for group in ledger.groups():
+            for actor, value in zip(group["actor"], group["value"]):
+                totals[actor] += value
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=10_000)
+    parser.add_argument("--movements", type=int, default=50)
+    args = parser.parse_args()
+
+    with (
+        seeded_database(args.people, movements=args.movements),
+        tempfile.TemporaryDirectory() as tmp,
+    ):
+        csv_path = os.path.join(tmp, "ledger.csv")
+        ledger_path = os.path.join(tmp, "ledger.dlg")
+
+        for label, export, read, path in (
+            ("csv", export_csv, read_csv, csv_path),
+            ("ledger", core.export_ledger, read_ledger, ledger_path),
+        ):
+            write_time, write_peak = timed(export, path)
+            read_time, read_peak = timed(read, path)
+            print(
+                f"{label:<7} size={os.path.getsize(path) / 2**20:7.1f}MiB "
+                f"export={write_time:6.2f}s peak={write_peak / 2**20:6.1f}MiB "
+                f"read={read_time:6.2f}s peak={read_peak / 2**20:6.1f}MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
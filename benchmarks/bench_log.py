@@ -0,0 +1,83 @@
+"""Per record logging overhead in a tight `add_movement` loop.
+
+    python -m benchmarks.bench_log --movements 5000
+
+`add_movement` logs every movement at DEBUG. `blocking` is the previous
+setup: a RotatingFileHandler per `get_logger()` call (five modules) on
+the caller's thread. `queue` is `configure_logging`: one QueueHandler and
+a listener thread writing the file.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from logging import handlers
+
+from benchmarks.data import seeded_database
+from dundie.database import get_session
+from dundie.models import Person
+from dundie.utils import log as dundie_log
+from dundie.utils.db import add_movement
+
+
+def loop(movements: int, runs: int = 3) -> float:
+    """Best time of `runs` loops, each rolled back."""
+    best = float("inf")
+    for _ in range(runs):
+        with get_session() as session:
+            person = session.get(Person, 1)
+            start = time.perf_counter()
+            for _ in range(movements):
+                add_movement(session, person, 1, "bench")
+            best = min(best, time.perf_counter() - start)
+            session.rollback()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movements", type=int, default=5_000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("dundie")
+    configured = list(logger.handlers)
+
+    with seeded_database(10), tempfile.TemporaryDirectory() as tmp:
+        logger.handlers = []
+        logger.setLevel("WARNING")
+        baseline = loop(args.movements)
+
+        logger.setLevel("DEBUG")
+        for _ in range(5):
+            file_handler = handlers.RotatingFileHandler(
+                os.path.join(tmp, "blocking.log"), maxBytes=10**6
+            )
+            file_handler.setFormatter(dundie_log.fmt)
+            logger.addHandler(file_handler)
+        blocking = loop(args.movements)
+
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers = configured
+        queued = loop(args.movements)
+        # Includes waiting for the listener to drain the queue.
+        start = time.perf_counter()
+        dundie_log._listener.stop()
+        queued += time.perf_counter() - start
+        dundie_log._listener.start()
+
+        for label, elapsed in (
+            ("disabled", baseline),
+            ("blocking", blocking),
+            ("queue", queued),
+        ):
+            overhead = (elapsed - baseline) / args.movements * 1e6
+            print(
+                f"{label:<9} {elapsed:6.2f}s overhead={overhead:6.1f}us/record"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Password hashing cost vs login latency and bulk load throughput.
+
+    python -m benchmarks.bench_password --costs 12 13 14 15 --users 2000
+
+Prints the time of one hash/verify (what a login pays) per scrypt cost,
+then hashes `--users` passwords serially and in the process pool used by
+`dundie load` at the configured cost.
+"""
+
+import argparse
+import time
+from unittest.mock import patch
+
+from dundie.settings import PASSWORD_HASH_COST
+from dundie.utils import user
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--costs", type=int, nargs="+", default=[12, 14, 16])
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    for cost in args.costs:
+        elapsed, stored = timed(user.hash_password, "password", cost)
+        verify, _ = timed(user.verify_password, "password", stored)
+        print(
+            f"cost={cost:<3} n={2**cost:<8} hash={elapsed * 1000:7.1f}ms "
+            f"login={verify * 1000:7.1f}ms mem={128 * 8 * 2**cost >> 20}MiB"
+        )
+
+    passwords = [user.generate_simple_password() for _ in range(args.users)]
+
+    with patch.object(user, "PASSWORD_POOL_THRESHOLD", args.users + 1):
+        serial, _ = timed(user.hash_passwords, passwords)
+    pooled, _ = timed(user.hash_passwords, passwords)
+
+    print(
+        f"{args.users} users at cost {PASSWORD_HASH_COST}: "
+        f"serial={serial:.2f}s pool={pooled:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Peak memory and time of the listing paths.
+
+Compares the record based `core.read` / `core.movements` with the
+previous ORM implementation that built a model and a dict per row.
+
+    python -m benchmarks.bench_read --people 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from sqlmodel import select
+
+from benchmarks.data import seeded_database
+from dundie import core
+from dundie.database import get_session
+from dundie.models import Movement, Person
+from dundie.settings import DATEFMT
+from dundie.utils.exchange import get_rates
+
+
+def legacy_read():
+    return_data = []
+    with get_session() as session:
+        currencies = session.exec(select(Person.currency).distinct())
+        rates = get_rates(list(currencies))
+
+        for person in session.exec(select(Person)):
+            total = rates[person.currency].value * person.balance.value
+            movements = session.exec(
+                select(Movement).where(Movement.person_id == person.id)
+            ).all()
+            return_data.append(
+                {
+                    "email": person.email,
+                    "balance": person.balance.value,
+                    "last_movement": movements[-1].date.strftime(DATEFMT),
+                    **person.model_dump(exclude={"id"}),
+                    "value": total,
+                }
+            )
+    return return_data
+
+
+def legacy_movements():
+    return_data = []
+    with get_session() as session:
+        for person in session.exec(select(Person)):
+            sql = select(Movement.date, Movement.value, Movement.actor).where(
+                Movement.person == person
+            )
+            for date, value, actor in session.exec(sql).all():
+                return_data.append(
+                    {
+                        "email": person.email,
+                        "name": person.name,
+                        "dept": person.dept,
+                        "role": person.role,
+                        "date": date.strftime(DATEFMT),
+                        "value": value,
+                        "actor": actor,
+                    }
+                )
+    return return_data
+
+
+def measure(label, func, people):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_100k = elapsed * 100_000 / people
+    print(
+        f"{label:<20} rows={len(result):<8} time={elapsed:.2f}s "
+        f"({per_100k:.2f}s/100k) peak={peak / 2**20:.1f}MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with seeded_database(args.people):
+        measure("legacy read", legacy_read, args.people)
+        measure("read", core.read, args.people)
+        measure("legacy movements", legacy_movements, args.people)
+        measure("movements", core.movements, args.people)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Latency of `core.search` against filtering the full listing.
+
+    python -m benchmarks.bench_search --people 100000
+
+People get names drawn from a small pool, so most words match many
+rows. `scan` is what finding people took before: read everyone and
+filter in Python.
+"""
+
+import argparse
+import itertools
+import time
+
+from sqlalchemy import bindparam, update
+
+from benchmarks.data import seeded_database
+from dundie import core
+from dundie.database import get_session
+from dundie.models import Person
+from dundie.utils.cache import clear_cache
+
+FIRST = "Jim Pam Dwight Michael Angela Oscar Kevin Stanley Phyllis Ryan"
+LAST = "Halpert Beesly Schrute Scott Martin Martinez Malone Hudson Vance"
+QUERIES = ("jim", "ji", "jim hal", "dwight schrute dept 7", "salesman")
+
+
+def rename_people(people: int):
+    names = itertools.cycle(
+        f"{first} {last} {n}"
+        for n in range(100)
+        for first in FIRST.split()
+        for last in LAST.split()
+    )
+    sql = (
+        update(Person)
+        .where(Person.id == bindparam("person_id"))
+        .values(name=bindparam("new_name"))
+    )
+    with get_session() as session:
+        session.connection().execute(
+            sql,
+            [
+                {"person_id": i, "new_name": next(names)}
+                for i in range(2, people + 1)
+            ],
+        )
+        session.commit()
+
+
+def scan(term: str):
+    words = term.lower().split()
+    return [
+        person
+        for person in core.read()
+        if all(
+            any(
+                value.lower().startswith(word)
+                for field in (person.name, person.email, person.dept)
+                for value in field.replace("@", " ").split()
+            )
+            for word in words
+        )
+    ][:20]
+
+
+def measure(label, func, runs=5):
+    best = float("inf")
+    for _ in range(runs):
+        clear_cache()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32} rows={len(result):<4} best={best * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with seeded_database(args.people):
+        rename_people(args.people)
+        measure("scan jim hal", lambda: scan("jim hal"), runs=1)
+        for term in QUERIES:
+            measure(
+                f"search {term}",
+                lambda term=term: core.search(term=term, limit=20),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Upstream calls made by many dundie processes started together.
+
+    python -m benchmarks.bench_shared_cache --processes 50
+
+Each process resolves the logged person and two exchange rates, as a
+`dundie show` does, against a fake rates API answering in `--latency`
+seconds. Compared with the shared cache disabled and enabled.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.data import seeded_database
+from dundie import database
+from dundie.settings import ADMIN_EMAIL
+from dundie.utils import exchange
+from dundie.utils.auth import get_person
+from dundie.utils.shared_cache import shared_cache
+
+
+def command(start, calls, lookups):
+    database.engine.dispose(close=False)
+    start.wait()
+
+    def lookup(*args, **kwargs):
+        with lookups.get_lock():
+            lookups.value += 1
+        return database.get_read_session()
+
+    with patch("dundie.utils.auth.get_read_session", lookup):
+        get_person(ADMIN_EMAIL)
+    exchange.get_rates(["BRL", "EUR"])
+
+
+def run(processes, latency, path):
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    calls = context.Value("i", 0)
+    lookups = context.Value("i", 0)
+
+    def upstream(url, *args, **kwargs):
+        with calls.get_lock():
+            calls.value += 1
+        time.sleep(latency)
+        currency = url.rsplit("-", 1)[-1]
+        return httpx.Response(200, json={f"USD{currency}": {"high": "5"}})
+
+    with (
+        patch("httpx.get", upstream),
+        patch.object(shared_cache, "path", path),
+    ):
+        workers = [
+            context.Process(target=command, args=(start, calls, lookups))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        began = time.perf_counter()
+        start.set()
+        for worker in workers:
+            worker.join()
+
+    return calls.value, lookups.value, time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with seeded_database(100), tempfile.TemporaryDirectory() as tmp:
+        for label, path in (
+            ("disabled", ""),
+            ("shared", os.path.join(tmp, "cache.db")),
+        ):
+            calls, lookups, elapsed = run(args.processes, args.latency, path)
+            print(
+                f"{label:<9} rate fetches={calls:<4} person lookups="
+                f"{lookups:<4} wall={elapsed:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
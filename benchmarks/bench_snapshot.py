@@ -0,0 +1,94 @@
+"""Report latency while writers are busy, live database vs `--snapshot`.
+
+    python -m benchmarks.bench_snapshot --people 50000 --writers 2
+
+Writer processes credit points in a loop on the live database while the
+reports (`read`, `movements`, `stats`) run first on the live file, then
+on a snapshot. Writes per second are reported for both phases.
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import time
+from unittest.mock import patch
+
+from benchmarks.data import seeded_database
+from dundie import core, database
+from dundie.utils.snapshot import snapshot
+
+REPORTS = {
+    "read": lambda: core.read(limit=1000),
+    "movements": lambda: core.movements(dept="Dept 7"),
+    "stats": lambda: core.stats(),
+}
+
+
+def writer(stop, counter, person):
+    # Forked with the seeded engine, connections must not be shared.
+    database.engine.dispose(close=False)
+    while not stop.is_set():
+        core.add(1, email=f"person{person}@dm.com")
+        with counter.get_lock():
+            counter.value += 1
+
+
+def measure(label, seconds, counter):
+    timings = {name: [] for name in REPORTS}
+    start_writes = counter.value
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        for name, report in REPORTS.items():
+            start = time.perf_counter()
+            report()
+            timings[name].append(time.perf_counter() - start)
+
+    writes = (counter.value - start_writes) / seconds
+    for name, values in timings.items():
+        values.sort()
+        p99 = values[int(len(values) * 0.99) - 1]
+        print(
+            f"{label:<9} {name:<10} "
+            f"p50={statistics.median(values) * 1000:7.1f}ms "
+            f"p99={p99 * 1000:7.1f}ms"
+        )
+    print(f"{label:<9} writers    {writes:7.1f} writes/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=50_000)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    counter = context.Value("i", 0)
+
+    with (
+        seeded_database(args.people),
+        patch("dundie.utils.cache.QUERY_CACHE_SIZE", 0),
+    ):
+        writers = [
+            context.Process(target=writer, args=(stop, counter, i + 2))
+            for i in range(args.writers)
+        ]
+        for process in writers:
+            process.start()
+
+        try:
+            measure("live", args.seconds, counter)
+            start = time.perf_counter()
+            with snapshot():
+                print(f"snapshot taken in {time.perf_counter() - start:.2f}s")
+                measure("snapshot", args.seconds, counter)
+        finally:
+            stop.set()
+            for process in writers:
+                process.join()
+
+
+if __name__ == "__main__":
+    main()
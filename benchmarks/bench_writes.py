@@ -0,0 +1,63 @@
+"""Write throughput and latency with and without group commit.
+
+    python -m benchmarks.bench_writes --clients 16 --seconds 5
+
+Every client thread credits one point to its own person in a loop, as
+concurrent API requests do.
+"""
+
+import argparse
+import threading
+import time
+
+from benchmarks.data import seeded_database
+from dundie import core
+from dundie.utils import writer
+
+
+def client(email, deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        core.add(1, email=email)
+        latencies.append(time.perf_counter() - start)
+
+
+def run(clients, seconds):
+    latencies: list = []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=client, args=(f"person{i + 1}@dm.com", deadline, latencies)
+        )
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return len(latencies) / seconds, latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    with seeded_database(1000):
+        rate, p99 = run(args.clients, args.seconds)
+        print(f"per-call commit {rate:8.1f} writes/s p99={p99 * 1000:.1f}ms")
+
+        group = writer.start_writer()
+        rate, p99 = run(args.clients, args.seconds)
+        writer.stop_writer()
+        print(
+            f"group commit    {rate:8.1f} writes/s p99={p99 * 1000:.1f}ms "
+            f"({group.operations / group.batches:.1f} writes/batch)"
+        )
+
+
+if __name__ == "__main__":
+    main()
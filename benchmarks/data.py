@@ -0,0 +1,68 @@
+"""Helpers to seed large databases for the benchmarks."""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlalchemy import insert
+from sqlmodel import create_engine
+
+from dundie import models
+from dundie.settings import ADMIN_EMAIL
+from dundie.utils.shared_cache import shared_cache
+
+
+@contextmanager
+def seeded_database(people: int, currencies=("USD",), movements: int = 1):
+    """Yields an engine seeded with `people` rows, patched into dundie.
+
+    The admin user is the first person so `login_required` passes.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        models.SQLModel.metadata.create_all(bind=engine)
+        now = datetime.now()
+
+        person_rows = [
+            {
+                "id": i + 1,
+                "email": ADMIN_EMAIL if i == 0 else f"person{i}@dm.com",
+                "name": f"Person {i}",
+                "dept": f"Dept {i % 50}",
+                "role": "Manager" if i % 10 == 0 else "Salesman",
+                "currency": currencies[i % len(currencies)],
+            }
+            for i in range(people)
+        ]
+
+        with engine.begin() as conn:
+            conn.execute(insert(models.Person.__table__), person_rows)
+            conn.execute(
+                insert(models.Balance.__table__),
+                [
+                    {"person_id": i + 1, "value": 500 * movements}
+                    for i in range(people)
+                ],
+            )
+            conn.execute(
+                insert(models.Movement.__table__),
+                [
+                    {
+                        "person_id": i + 1,
+                        "actor": "system",
+                        "value": 500,
+                        "date": now,
+                    }
+                    for i in range(people)
+                    for _ in range(movements)
+                ],
+            )
+
+        with (
+            patch("dundie.database.engine", engine),
+            patch("keyring.get_password", return_value=ADMIN_EMAIL),
+            patch.object(shared_cache, "path", os.path.join(tmp, "cache.db")),
+        ):
+            yield engine
@@ -1,35 +1,144 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Set before any dundie import: settings are read once and the database
+# is created at import time, tests must never touch the real one or log
+# to the working directory.
+_scratch = tempfile.mkdtemp(prefix="dundie-tests-")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+os.environ["DUNDIE_DATABASE_PATH"] = os.path.join(_scratch, "database.db")
+os.environ["DUNDIE_DATABASE_URL"] = (
+    f"sqlite:///{os.environ['DUNDIE_DATABASE_PATH']}"
+)
+os.environ["DUNDIE_LOG_FILE"] = os.path.join(_scratch, "dundie.log")
+# Cheapest scrypt cost, tests do not need slow password hashes.
+os.environ.setdefault("DUNDIE_PASSWORD_HASH_COST", "4")
+# Every test has its own database, cached people would leak between them.
+os.environ.setdefault("DUNDIE_SHARED_CACHE_PATH", "")
+
 from unittest.mock import patch
+
+import httpx
 import pytest
 from sqlmodel import create_engine
 from dundie import models
 from dundie.models import Person
+from dundie.utils import cache
 from dundie.utils.db import add_person
 from dundie.database import get_session
 
 
-@pytest.fixture(autouse=True, scope="function")
-def setup_testing_database(tmp_path):
-    """For each test, create a database file on tmpdir
-    force database.py to use that filepath.
-    """
-    test_db = tmp_path / "database.test.db"
-    engine = create_engine(f"sqlite:///{test_db}")
+pytest_plugins = ["tests.perf"]
+
+# Set DUNDIE_TEST_POSTGRES_URL to also run every test against PostgreSQL.
+BACKENDS = ["sqlite"]
+if os.getenv("DUNDIE_TEST_POSTGRES_URL"):
+    BACKENDS.append("postgresql")
+
+ADMIN = {
+    "role": "Manager",
+    "dept": "Management",
+    "name": "Michael Scott",
+    "email": "michael@dundermifflin.com",
+}
+
+
+def create_database(url: str):
+    """Creates the schema and the admin user, whose password is 1234."""
+    engine = create_engine(url)
     models.SQLModel.metadata.create_all(bind=engine)
-    with patch("dundie.database.engine", engine), get_session() as session, patch("keyring.get_password") as mock_keyring:
-        data = {
-                "role": "Manager",
-                "dept": "Management",
-                "name": "Michael Scott",
-                "email": "michael@dundermifflin.com",
-            }
-        password = "1234"
-        person, _ = add_person(session, Person(**data), password)
+    with (
+        patch("dundie.database.engine", engine),
+        patch("dundie.utils.db.send_email"),
+        get_session() as session,
+    ):
+        add_person(session, Person(**ADMIN), "1234")
         session.commit()
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def template_database(tmp_path_factory):
+    """SQLite database built once per session, copied for every test."""
+    path = tmp_path_factory.mktemp("template") / "database.db"
+    create_database(f"sqlite:///{path}")
+    return path
+
+
+@pytest.fixture(params=BACKENDS)
+def database_url(request, tmp_path):
+    if request.param == "sqlite":
+        path = tmp_path / "database.test.db"
+        shutil.copyfile(request.getfixturevalue("template_database"), path)
+        return f"sqlite:///{path}"
+
+    url = os.environ["DUNDIE_TEST_POSTGRES_URL"]
+    engine = create_engine(url)
+    models.SQLModel.metadata.drop_all(bind=engine)
+    engine.dispose()
+    create_database(url)
+    return url
+
+
+@pytest.fixture
+def sqlite_only(database_url):
+    if not database_url.startswith("sqlite"):
+        pytest.skip("SQLite only")
 
-        mock_keyring.return_value = person.email
-        
+
+def fake_rate_response(url: str) -> httpx.Response:
+    code = str(url).rsplit("-", 1)[-1]
+    return httpx.Response(200, json={f"USD{code}": {"high": "1"}})
+
+
+@pytest.fixture(autouse=True)
+def outbox():
+    """Stubs SMTP and the exchange rate API so no test waits on them.
+
+    Yields the emails that would have been sent. Every rate is 1.
+    """
+    sent = []
+
+    async def fake_async_get(client, url, *args, **kwargs):
+        return fake_rate_response(url)
+
+    def fake_bulk(messages, failed=None):
+        sent.extend(messages)
+        return len(messages)
+
+    with (
+        patch("dundie.utils.db.send_email", lambda *msg: sent.append(msg)),
+        patch("dundie.core.send_bulk_email", fake_bulk),
+        patch("httpx.get", lambda url, *a, **kw: fake_rate_response(url)),
+        patch("httpx.AsyncClient.get", fake_async_get),
+    ):
+        yield sent
+
+
+@pytest.fixture(autouse=True, scope="function")
+def setup_testing_database(database_url, outbox):
+    """For each test, use a fresh database (a copy of the template on
+    tmpdir or the PostgreSQL test database) and force database.py to use it.
+    """
+    engine = create_engine(database_url)
+    with (
+        patch("dundie.database.engine", engine),
+        patch("keyring.get_password", return_value=ADMIN["email"]),
+    ):
         yield
 
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def query_cache():
+    """Cached listings belong to one test database, never reuse them."""
+    cache.clear_cache()
+    yield
+    cache.clear_cache()
+
 
 @pytest.fixture(scope="function")
 def fictional_data():
@@ -1,5 +1,25 @@
-# Import absoluto, utiliza o nome do pacote.
-from dundie.cli import main
+import sys
+
+from dundie import client
+
+
+def main():
+    """Entry point, forwards to `dundie serve` when it is running.
+
+    Only `dundie.client` is imported up front, the CLI and its heavy
+    dependencies are loaded only when the command runs in-process.
+    """
+    argv = sys.argv[1:]
+
+    if client.should_forward(argv):
+        exit_code = client.forward(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from dundie.cli import main as cli
+
+    cli()
+
 
 # Ao invocar o programa através do comando `python3 -m dundie` e o
 # principal entry point do programa seja uma função, ela não vai ser chamada,
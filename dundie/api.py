@@ -0,0 +1,263 @@
+"""HTTP JSON API over `dundie.core`.
+
+The server runs in one process for its whole life, so the database engine
+and its connection pool, the exchange rate cache and the imports are paid
+once. Requests authenticate with `Authorization: Bearer <token>`, tokens
+are created with `dundie token`.
+
+    GET  /people?dept=&email=&currency=&page=1&per_page=100
+    GET  /movements?dept=&email=&page=1&per_page=100
+    GET  /stats?dept=&email=
+    POST /add       {"value": 10, "dept": "Sales"}
+    POST /transfer  {"value": 10, "to": "jim@dundermifflin.com"}
+
+POST requests accept an `Idempotency-Key` header, retries with the same
+key return the first result instead of writing again.
+"""
+
+import json
+from decimal import Decimal
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from dundie import core
+from dundie.records import json_field, to_dicts
+from dundie.utils.auth import get_permission, get_token_person, principal
+from dundie.utils.errors import (
+    IdempotencyKeyReused,
+    InsufficientBalanceError,
+    UserNotFoundError,
+)
+from dundie.utils.log import get_logger
+from dundie.utils.writer import start_writer, stop_writer
+
+log = get_logger(__name__)
+
+DEFAULT_PER_PAGE = 100
+MAX_PER_PAGE = 1000
+PAGE_PARAMS = {"page", "per_page"}
+
+
+class APIError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def check_params(params: dict, allowed: set):
+    """Refuses query parameters the listing does not take."""
+    unknown = sorted(set(params) - allowed)
+    if unknown:
+        raise APIError(
+            HTTPStatus.BAD_REQUEST,
+            f"Unknown parameters: {', '.join(unknown)}",
+        )
+
+
+def paginate(func, params: dict, filters: set) -> dict:
+    """Calls a listing function for one page of results.
+
+    `filters` are the parameters passed on to `func` besides the page.
+    """
+    if "limit" in params or "offset" in params:
+        raise APIError(
+            HTTPStatus.BAD_REQUEST, "Paginate with page and per_page"
+        )
+    check_params(params, filters | PAGE_PARAMS)
+
+    try:
+        page = max(int(params.pop("page", 1)), 1)
+        per_page = int(params.pop("per_page", DEFAULT_PER_PAGE))
+    except ValueError:
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid pagination") from None
+
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+
+    # One extra row tells whether there is a next page without a COUNT.
+    items = func(limit=per_page + 1, offset=(page - 1) * per_page, **params)
+
+    return {
+        "items": to_dicts(items[:per_page]),
+        "page": page,
+        "per_page": per_page,
+        "next_page": page + 1 if len(items) > per_page else None,
+    }
+
+
+def get_people(params: dict) -> dict:
+    return paginate(core.read, params, {"dept", "email", "currency"})
+
+
+def get_movements(params: dict) -> dict:
+    return paginate(core.movements, params, {"dept", "email"})
+
+
+def get_stats(params: dict) -> dict:
+    check_params(params, {"dept", "email"})
+    result = core.stats(**params)
+    result["balance"] = json_field(result["balance"])
+    for dept in result["depts"].values():
+        dept["balance"] = json_field(dept["balance"])
+    return result
+
+
+def post_add(body: dict) -> dict:
+    try:
+        value = Decimal(body["value"])
+    except (KeyError, ArithmeticError, TypeError, ValueError):
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid value") from None
+
+    query = {key: body.get(key) for key in ("dept", "email")}
+    try:
+        core.add(value, idempotency_key=body.get("idempotency_key"), **query)
+    except RuntimeError:
+        raise APIError(HTTPStatus.NOT_FOUND, "Not Found") from None
+    except IdempotencyKeyReused as e:
+        raise APIError(HTTPStatus.CONFLICT, str(e)) from e
+
+    return {"added": json_field(value)}
+
+
+def post_transfer(body: dict) -> dict:
+    try:
+        value = int(body["value"])
+        to_email = str(body["to"])
+    except (KeyError, TypeError, ValueError):
+        raise APIError(HTTPStatus.BAD_REQUEST, "Invalid transfer") from None
+
+    if value <= 0:
+        raise APIError(HTTPStatus.BAD_REQUEST, "Value must be positive")
+
+    try:
+        _, name = core.transfer(
+            value,
+            to_email=to_email,
+            idempotency_key=body.get("idempotency_key"),
+        )
+    except (InsufficientBalanceError, IdempotencyKeyReused) as e:
+        raise APIError(HTTPStatus.CONFLICT, str(e)) from e
+    except UserNotFoundError as e:
+        raise APIError(HTTPStatus.NOT_FOUND, str(e)) from e
+
+    return {"transferred": value, "to": name}
+
+
+# path -> (handler, command name used by `get_permission`)
+ROUTES = {
+    ("GET", "/people"): (get_people, "read"),
+    ("GET", "/movements"): (get_movements, "movements"),
+    ("GET", "/stats"): (get_stats, "stats"),
+    ("POST", "/add"): (post_add, "add"),
+    ("POST", "/transfer"): (post_transfer, "transfer"),
+}
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes, with Nagle enabled keep-alive
+    # clients wait for a delayed ACK on every response.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def dispatch(self, method: str):
+        url = urlparse(self.path)
+
+        try:
+            route = ROUTES.get((method, url.path))
+            if route is None:
+                raise APIError(HTTPStatus.NOT_FOUND, "Unknown endpoint")
+
+            handler, command = route
+            person = self.authenticate()
+
+            if method == "GET":
+                params = {
+                    key: values[-1]
+                    for key, values in parse_qs(url.query).items()
+                }
+            else:
+                params = self.read_body()
+                if "Idempotency-Key" in self.headers:
+                    params["idempotency_key"] = self.headers["Idempotency-Key"]
+
+            if not get_permission(person, params, command):
+                raise APIError(HTTPStatus.FORBIDDEN, "Permission denied")
+
+            with principal(person.email):
+                result = handler(params)
+
+            self.send_json(HTTPStatus.OK, result)
+        except APIError as e:
+            self.send_json(e.status, {"error": e.message})
+        except SystemExit:
+            self.send_json(HTTPStatus.FORBIDDEN, {"error": "Forbidden"})
+        except Exception:
+            log.exception("%s %s failed", method, self.path)
+            self.send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Server error"}
+            )
+
+    def authenticate(self):
+        header = self.headers.get("Authorization", "")
+        scheme, _, token = header.partition(" ")
+
+        if scheme.lower() != "bearer" or not token:
+            raise APIError(HTTPStatus.UNAUTHORIZED, "Missing bearer token")
+
+        person = get_token_person(token.strip())
+        if person is None:
+            raise APIError(HTTPStatus.UNAUTHORIZED, "Invalid token")
+
+        return person
+
+    def read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            raise APIError(HTTPStatus.BAD_REQUEST, "Invalid JSON") from None
+
+        if not isinstance(body, dict):
+            raise APIError(HTTPStatus.BAD_REQUEST, "Expected an object")
+
+        return body
+
+    def send_json(self, status: HTTPStatus, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.info("%s - %s", self.address_string(), format % args)
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8000):
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000):
+    """Serves the API until interrupted.
+
+    Writes from concurrent requests are group committed.
+    """
+    start_writer()
+    with create_server(host, port) as server:
+        log.info("dundie API listening on %s:%s", host, port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop_writer()
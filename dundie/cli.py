@@ -1,4 +1,6 @@
 import json
+import os
+from contextlib import nullcontext
 from importlib.metadata import metadata
 
 import rich_click as click
@@ -7,7 +9,15 @@ from rich.table import Table
 from getpass import getpass
 from dundie.utils.email import check_valid_email
 
-from dundie import core
+from dundie import core, daemon
+from dundie.client import notify_auth_changed
+from dundie.records import MovementRecord, PersonRecord, to_dicts
+from dundie.settings import DAEMON_SOCKET, LOAD_CHUNK_SIZE
+from dundie.utils.checkpoint import Outbox
+from dundie.utils.errors import CheckpointError
+from dundie.utils.render import FORMATS, render
+from dundie.utils.schedule import PERIODS
+from dundie.utils.snapshot import snapshot
 
 click.rich_click.USE_RICH_MARKUP = True
 click.rich_click.USE_MARKDOWN = True
@@ -16,6 +26,18 @@ click.rich_click.GROUP_ARGUMENTS_OPTIONS = True
 click.rich_click.SHOW_METAVARS_COLUMN = False
 click.rich_click.APPEND_METAVARS_HELP = True
 
+snapshot_option = click.option(
+    "--snapshot",
+    "use_snapshot",
+    is_flag=True,
+    help="Read a read-only copy of the database, without waiting on writes.",
+)
+
+
+def reading(use_snapshot: bool):
+    """Where reports read from, the live database or a snapshot."""
+    return snapshot() if use_snapshot else nullcontext()
+
 
 @click.group()
 @click.version_option(metadata("giovannipad-dundie").get("version"))
@@ -28,16 +50,51 @@ def main():
 
 @main.command()
 @click.argument("filepath", type=click.Path())
-def load(filepath):
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show what would change without writing to the database.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue a load that stopped after its last committed chunk.",
+)
+@click.option(
+    "--chunk-size",
+    type=click.INT,
+    default=LOAD_CHUNK_SIZE,
+    show_default=True,
+    help="Rows committed at a time.",
+)
+def load(filepath, dry_run, resume, chunk_size):
     """Loads the file to the database."""
 
+    if dry_run:
+        summary = core.load_diff(filepath)
+
+        table = Table(title="Load Dry Run")
+        table.add_column("Change", style="magenta")
+        table.add_column("People", style="magenta")
+
+        for change, value in summary.items():
+            count = value if isinstance(value, int) else len(value)
+            table.add_row(change.title(), str(count))
+
+        Console().print(table)
+        return
+
     table = Table(title="Dunder Mifflin Associates")
     headers = ["email", "name", "dept", "role", "currency", "created"]
 
     for header in headers:
         table.add_column(header, style="magenta")
 
-    result = core.load(filepath)
+    try:
+        result = core.load(filepath, resume=resume, chunk_size=chunk_size)
+    except CheckpointError as e:
+        click.secho(str(e), fg="red")
+        raise SystemExit(1) from e
     for person in result:
         table.add_row(*[str(value) for value in person.values()])
 
@@ -45,68 +102,147 @@ def load(filepath):
 
     console.print(table)
 
+    rejects = core.reject_path(filepath)
+    if os.path.exists(rejects):
+        console.print(f"Rows that could not be loaded are in {rejects}")
+
+    undelivered = Outbox(filepath).path
+    if os.path.exists(undelivered):
+        console.print(
+            f"Emails that could not be sent are in {undelivered}, "
+            "`dundie load --resume` sends them again"
+        )
+
 
 @main.command()
 @click.option("--dept", required=False)
 @click.option("--email", required=False)
 @click.option("--output", default=None)
-def show(output, **query):
+@click.option(
+    "--currency",
+    default=None,
+    help="Report every value in this currency, e.g. `BRL`.",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMATS),
+    default="auto",
+    help="Table format, `auto` streams TSV when piped.",
+)
+@snapshot_option
+def show(output, fmt, currency, use_snapshot, **query):
     """Shows information about users."""
 
-    result = core.read(**query)
+    with reading(use_snapshot):
+        result = core.read(currency=currency, **query)
 
     if output:
         with open(output, "w") as output_file:
-            output_file.write(json.dumps(result))
+            output_file.write(json.dumps(to_dicts(result)))
 
     if not result:
         print("Nothing to show.")
+        return
 
-    table = Table(title="Dunder Mifflin Associates")
+    headers = [key.title().replace("_", "") for key in PersonRecord._fields]
+    render("Dunder Mifflin Associates", headers, result, fmt)
 
-    for key in result[0]:
-        table.add_column(key.title().replace("_", ""), style="magenta")
 
-    for person in result:
-        person["value"] = f"{person['value']:.2f}"
-        person["balance"] = f"{person['balance']:.2f}"
-        table.add_row(*[str(value) for value in person.values()])
+@main.command()
+@click.argument("term", required=False, default="")
+@click.option("--dept", required=False)
+@click.option("--email", required=False)
+@click.option("--limit", type=click.INT, default=20, show_default=True)
+@click.option(
+    "--currency",
+    default=None,
+    help="Report every value in this currency, e.g. `BRL`.",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMATS),
+    default="auto",
+    help="Table format, `auto` streams TSV when piped.",
+)
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    help="Rebuild the search index from the people table.",
+)
+@snapshot_option
+def search(term, limit, currency, fmt, rebuild, use_snapshot, **query):
+    """Searches people by name, email, dept or role.
+
+    Every word must match the start of a word, best matches first, e.g.
+    `dundie search "jim sales"`.
+    """
+    if rebuild:
+        indexed = core.rebuild_search()
+        print(f"Indexed {indexed} people")
+        if not term:
+            return
+
+    with reading(use_snapshot):
+        result = core.search(
+            term=term, limit=limit, currency=currency, **query
+        )
 
-    console = Console()
+    if not result:
+        print("Nothing to show.")
+        return
 
-    console.print(table)
+    headers = [key.title().replace("_", "") for key in PersonRecord._fields]
+    render("Search Results", headers, result, fmt)
 
 
 @main.command()
 @click.option("--dept", required=False)
 @click.option("--email", required=False)
-def movements(**query):
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(FORMATS),
+    default="auto",
+    help="Table format, `auto` streams TSV when piped.",
+)
+@snapshot_option
+def movements(fmt, use_snapshot, **query):
     """Show the movements of user(s)."""
-    result = core.movements(**query)
+    with reading(use_snapshot):
+        result = core.movements(**query)
 
-    table = Table(title="Account Movements")
-    headers = ["email", "name", "dept", "role", "date", "value", "actor"]
-
-    for header in headers:
-        table.add_column(header.capitalize(), style="magenta")
+    headers = [header.capitalize() for header in MovementRecord._fields]
+    render("Account Movements", headers, result, fmt)
 
-    for movement in result:
-        table.add_row(*[str(value) for value in movement.values()])
 
-    console = Console()
+@main.command("export-ledger")
+@click.argument("filepath", type=click.Path())
+@click.option("--chunk-size", type=click.INT, default=50_000)
+def export_ledger(filepath, chunk_size):
+    """Export all movements to a columnar file for analytics.
 
-    console.print(table)
+    Read it back with `dundie.ledger.LedgerReader`.
+    """
+    rows = core.export_ledger(filepath, chunk_size=chunk_size)
+    print(f"Exported {rows} movements to {filepath}")
 
 
 @main.command()
 @click.argument("value", type=click.INT, required=True)
 @click.option("--dept", required=False)
 @click.option("--email", required=False)
+@click.option(
+    "--idempotency-key",
+    default=None,
+    help="Retries with the same key are applied only once.",
+)
 @click.pass_context
-def add(ctx, value, **query):
+def add(ctx, value, idempotency_key, **query):
     """Add points to the user or dept."""
 
-    core.add(value, **query)
+    core.add(value, idempotency_key=idempotency_key, **query)
 
     ctx.invoke(show, **query)
 
@@ -115,25 +251,98 @@ def add(ctx, value, **query):
 @click.argument("value", type=click.INT, required=True)
 @click.option("--dept", required=False)
 @click.option("--email", required=False)
+@click.option(
+    "--idempotency-key",
+    default=None,
+    help="Retries with the same key are applied only once.",
+)
 @click.pass_context
-def remove(ctx, value, **query):
+def remove(ctx, value, idempotency_key, **query):
     """Remove points from the user or dept."""
 
-    core.add(value * -1, **query)
+    core.remove(value, idempotency_key=idempotency_key, **query)
 
     ctx.invoke(show, **query)
 
 
 @main.command()
-@click.argument("value", type=click.INT, required=True)
+@click.argument("value", type=click.IntRange(min=1), required=True)
 @click.option("--to", required=True)
-def transfer(value: int, to: str):
+@click.option(
+    "--idempotency-key",
+    default=None,
+    help="Retries with the same key are applied only once.",
+)
+def transfer(value: int, to: str, idempotency_key: str | None):
     """Transfer points to another user."""
-    success, user = core.transfer(value, to_email=to)
+    success, user = core.transfer(
+        value, to_email=to, idempotency_key=idempotency_key
+    )
     if success:
         print(
-            f"Sucesso. {value} pontos transferidos da sua conta para a conta de {user}."
+            f"Sucesso. {value} pontos transferidos da sua conta "
+            f"para a conta de {user}."
+        )
+
+
+@main.group()
+def schedule():
+    """Recurring point grants, run `dundie schedule run` from cron."""
+
+
+@schedule.command("add")
+@click.argument("value", type=click.INT, required=True)
+@click.option("--dept", required=False, help="Everyone when omitted.")
+@click.option(
+    "--period",
+    type=click.Choice(PERIODS),
+    default="monthly",
+    show_default=True,
+)
+def schedule_add(value, dept, period):
+    """Grant points to a dept every period."""
+    rule_id = core.add_grant_rule(value, period, dept=dept)
+    print(f"Rule {rule_id}: {value} points {period} to {dept or 'everyone'}.")
+
+
+@schedule.command("list")
+def schedule_list():
+    """Show the active grant rules."""
+    table = Table(title="Grant Rules")
+    for header in ["Id", "Dept", "Value", "Period", "Actor"]:
+        table.add_column(header, style="magenta")
+
+    for rule in core.grant_rules():
+        table.add_row(
+            str(rule.id),
+            rule.dept or "everyone",
+            str(rule.value),
+            rule.period,
+            rule.actor,
+        )
+
+    Console().print(table)
+
+
+@schedule.command("remove")
+@click.argument("rule_id", type=click.INT, required=True)
+def schedule_remove(rule_id):
+    """Stop a grant rule."""
+    if not core.remove_grant_rule(rule_id):
+        raise click.ClickException(f"No active rule {rule_id}")
+
+
+@schedule.command("run")
+def schedule_run():
+    """Apply the rules not applied yet in their current period."""
+    applied = core.run_schedule()
+    for run in applied:
+        print(
+            f"Rule {run['rule']} applied for {run['period']} "
+            f"to {run['people']} people."
         )
+    if not applied:
+        print("Nothing due.")
 
 
 @main.command()
@@ -150,6 +359,7 @@ def login(email: str):
     logged_on = core.login(email.strip(), password.strip())
 
     if logged_on:
+        notify_auth_changed()
         click.secho("Logged in successfully!", fg="green")
     else:
         click.secho("Invalid credentials.", fg="red")
@@ -161,6 +371,39 @@ def logout():
     logged_out = core.logout()
 
     if logged_out:
+        notify_auth_changed()
         click.secho("Logged out succesfully!", fg="green")
     else:
         click.secho("You need to be logged in to log out.", fg="red")
+
+
+@main.command()
+@click.option("--socket", "socket_path", default=DAEMON_SOCKET)
+def serve(socket_path: str):
+    """Run a local daemon that keeps dundie warm for other commands.
+
+    While it is running, `dundie` forwards commands to it over a Unix
+    socket. Set `DUNDIE_NO_DAEMON=1` to always run commands in-process.
+    """
+    click.secho(f"Listening on {socket_path}", fg="green")
+    daemon.serve(socket_path)
+
+
+@main.command()
+def token():
+    """Create an API token for the logged user.
+
+    The token is shown only once, send it as `Authorization: Bearer TOKEN`.
+    """
+    click.echo(core.create_api_token())
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", type=click.INT, default=8000)
+def api(host: str, port: int):
+    """Run the HTTP JSON API authenticated with API tokens."""
+    from dundie import api as http_api
+
+    click.secho(f"Serving API on http://{host}:{port}", fg="green")
+    http_api.serve(host, port)
@@ -0,0 +1,98 @@
+"""Forwards commands to a running `dundie serve` daemon.
+
+This module is imported before the CLI, so it must stay cheap to import:
+only the standard library, `dundie.config` and `dundie.settings` are
+allowed here.
+"""
+
+import json
+import os
+import shutil
+import socket
+import stat
+import sys
+
+from dundie.config import config_fingerprint
+from dundie.settings import DAEMON_SOCKET
+
+# Commands that prompt on stdin, run servers or may keep the daemon busy
+# for long run in-process.
+LOCAL_COMMANDS = {"serve", "api", "login", "logout", "load", "export-ledger"}
+# After these run locally the daemon must forget the cached login.
+AUTH_COMMANDS = {"login", "logout"}
+
+
+def should_forward(argv: list) -> bool:
+    """Returns True when `argv` can be executed by the daemon."""
+    if os.getenv("DUNDIE_NO_DAEMON"):
+        return False
+    if not is_own_socket(DAEMON_SOCKET):
+        return False
+    return not LOCAL_COMMANDS.intersection(argv)
+
+
+def is_own_socket(path: str) -> bool:
+    """Tells whether `path` is a socket created by this user.
+
+    Another user could create one at the same path to read or spoof the
+    output of our commands, so nothing else is ever talked to.
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def request(payload: dict, path: str = DAEMON_SOCKET) -> dict | None:
+    """Sends one request to the daemon, None when it is not reachable."""
+    if not is_own_socket(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    if not chunks:
+        return None
+
+    return json.loads(b"".join(chunks))
+
+
+def forward(argv: list, path: str = DAEMON_SOCKET) -> int | None:
+    """Runs `argv` on the daemon and replays its output.
+
+    Returns the exit code, or None so the caller falls back to running
+    the command in-process, as it does when the daemon runs with other
+    settings (`DUNDIE_*` variables or config file) than this process.
+    """
+    response = request(
+        {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "user": os.getenv("USER"),
+            "tty": sys.stdout.isatty(),
+            "columns": shutil.get_terminal_size().columns,
+            "config": config_fingerprint(),
+        },
+        path,
+    )
+
+    if response is None or response.get("local"):
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+def notify_auth_changed(path: str = DAEMON_SOCKET):
+    """Tells a running daemon to re-read the logged user."""
+    request({"reset": True}, path)
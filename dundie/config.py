@@ -0,0 +1,135 @@
+"""Loads settings from a TOML file and environment variables.
+
+Each setting in `dundie.settings` is resolved once, at import, from:
+
+1. the `DUNDIE_<NAME>` environment variable
+2. the `<name>` key of the config file, either at the top level or as
+   `name = value` in a `[section]` whose name prefixes it, e.g.
+   `[smtp] host = "mail"` for `SMTP_HOST`
+3. its default
+
+The config file is `$DUNDIE_CONFIG`, else `./dundie.toml`, else
+`~/.config/dundie/config.toml`. When there is none `tomllib` is not even
+imported, defaults cost a dict lookup.
+"""
+
+import json
+import os
+from functools import cache
+from typing import Any, Dict
+
+from dundie.utils.errors import ConfigError
+
+CONFIG_PATHS = ("dundie.toml", "~/.config/dundie/config.toml")
+# Variables that change how a command is run, not what it does.
+CLIENT_VARIABLES = {"DUNDIE_NO_DAEMON"}
+TRUE = {"1", "true", "yes", "on"}
+FALSE = {"0", "false", "no", "off"}
+
+_known: set = set()
+
+
+def find_config() -> str | None:
+    """Path of the config file in use, if any."""
+    path = os.getenv("DUNDIE_CONFIG")
+    if path:
+        return path
+
+    for candidate in CONFIG_PATHS:
+        candidate = os.path.expanduser(candidate)
+        if os.path.isfile(candidate):
+            return candidate
+
+    return None
+
+
+def config_fingerprint() -> str:
+    """Identifies the effective settings of this process.
+
+    Made of the `DUNDIE_*` variables and the path, size and modification
+    time of the config file, so the daemon can tell whether a client
+    would run with other settings.
+    """
+    variables = sorted(
+        (name, value)
+        for name, value in os.environ.items()
+        if name.startswith("DUNDIE_") and name not in CLIENT_VARIABLES
+    )
+
+    config_file = None
+    path = find_config()
+    if path:
+        path = os.path.abspath(os.path.expanduser(path))
+        try:
+            stat = os.stat(path)
+            config_file = [path, stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            config_file = [path]
+
+    return json.dumps([variables, config_file])
+
+
+@cache
+def load_config(path: str | None = None) -> Dict[str, Any]:
+    """Parses the config file once into flat lowercase keys."""
+    path = path or find_config()
+    if path is None:
+        return {}
+
+    import tomllib
+
+    try:
+        with open(path, "rb") as config_file:
+            data = tomllib.load(config_file)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ConfigError(f"Cannot read config {path!r}: {e}") from e
+
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}_{sub_key}".lower()] = sub_value
+        else:
+            flat[key.lower()] = value
+
+    return flat
+
+
+def cast(name: str, value: Any, default: Any) -> Any:
+    """Converts `value` to the type of `default`."""
+    kind = type(default)
+
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        if str(value).lower() in TRUE | FALSE:
+            return str(value).lower() in TRUE
+    elif isinstance(value, bool):
+        pass
+    elif kind in (int, float):
+        try:
+            return kind(value)
+        except (TypeError, ValueError):
+            pass
+    elif isinstance(value, (str, int, float)):
+        return kind(value)
+
+    raise ConfigError(f"{name}: expected {kind.__name__}, got {value!r}")
+
+
+def setting(name: str, default: Any) -> Any:
+    """Resolves setting `name`, see the module docstring."""
+    _known.add(name.lower())
+
+    value = os.environ.get(f"DUNDIE_{name}")
+    if value is None:
+        value = load_config().get(name.lower(), default)
+
+    return cast(name, value, default)
+
+
+def check_config():
+    """Refuses config keys that match no setting, likely typos."""
+    unknown = sorted(set(load_config()) - _known)
+    if unknown:
+        raise ConfigError(f"Unknown settings in config: {', '.join(unknown)}")
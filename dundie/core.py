@@ -1,189 +1,770 @@
 """Core module of dundie"""
 
 import os
+import secrets
 from csv import reader
 from datetime import datetime
 from decimal import Decimal
+from itertools import islice
 from typing import Any, Dict, List, cast
 import keyring
-from dundie.settings import KEYRING_SERVICE_NAME, KEYRING_USERNAME
-from sqlmodel import select
-from dundie.database import get_session
-from dundie.models import Balance, Movement, Person, User
-from dundie.settings import DATEFMT
-from dundie.utils.auth import login_required
-from dundie.utils.db import add_movement, add_person
-from dundie.utils.errors import InsufficientBalanceError
-from dundie.utils.exchange import get_rates
+from dundie.settings import (
+    KEYRING_SERVICE_NAME,
+    KEYRING_USERNAME,
+    LOAD_CHUNK_SIZE,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import func, select, update
+from dundie.database import get_read_session, get_session
+from dundie.ledger import write_ledger
+from dundie.models import (
+    APIToken,
+    Balance,
+    GrantRule,
+    GrantRun,
+    Movement,
+    Person,
+    User,
+)
+from dundie.records import MovementRecord, PersonRecord
+from dundie.utils.cache import cached_query
+from dundie.utils.auth import (
+    Scope,
+    forget_logged_email,
+    forget_people,
+    hash_token,
+    login_required,
+    resolve_scope,
+    scope_filters,
+)
+from dundie.utils.db import add_movement, add_person, withdraw
+from dundie.utils.email import check_valid_email, send_bulk_email
+from dundie.utils.checkpoint import (
+    Checkpoint,
+    Outbox,
+    Position,
+    Reject,
+    RejectFile,
+    read_lines,
+)
+from dundie.utils.errors import (
+    InsufficientBalanceError,
+    InvalidEmailError,
+    UserNotFoundError,
+)
+from dundie.utils.exchange import USDRate, get_rates
 from dundie.utils.log import get_logger
-
-log = get_logger()
+from dundie.utils.schedule import apply_rule, period_key
+from dundie.utils.search import rebuild_index, search_sql, search_words
+from dundie.utils.idempotency import run_idempotent
+from dundie.utils.user import (
+    hash_password,
+    hash_passwords,
+    needs_rehash,
+    verify_password,
+)
+
+log = get_logger(__name__)
 
 Query = Dict[str, Any]
 ResultDict = List[Dict[str, Any]]
 
 
-@login_required
-def load(filepath: str, from_person: Person) -> ResultDict:
-    """Loads data from filepath to the database"""
+LOAD_HEADERS = ["name", "dept", "role", "email", "currency"]
+
+
+def reject_path(filepath: str) -> str:
+    """Where `load` writes the rows it could not load."""
+    return f"{filepath}.rejects.csv"
+
+
+def load_rows(
+    session,
+    chunk,
+    outbox: list,
+    unhashed: list,
+    rejects: List[Reject],
+) -> ResultDict:
+    """Adds the people of a chunk of lines, rejecting invalid ones.
+
+    Rows are validated before they reach the session, so a rejected row
+    leaves nothing behind, it is appended to `rejects` to be written once
+    the chunk is committed. Database errors abort the whole chunk, which
+    is not committed and is retried by a resume.
+    """
+    people = []
+
+    for position, raw in chunk:
+        try:
+            line = raw.decode()
+        except UnicodeDecodeError as e:
+            log.warning("Rejected row %s: %s", position.row, e)
+            line = raw.decode(errors="backslashreplace")
+            rejects.append((position.row, e, [line]))
+            continue
+
+        fields = [item.strip() for item in next(reader([line]))]
+        try:
+            if len(fields) != len(LOAD_HEADERS):
+                raise ValueError(
+                    f"Expected {len(LOAD_HEADERS)} fields, got {len(fields)}"
+                )
+            instance = Person(**dict(zip(LOAD_HEADERS, fields)))
+            if not check_valid_email(instance.email):
+                raise InvalidEmailError(f"Invalid email {instance.email!r}")
+        except (InvalidEmailError, ValueError) as e:
+            log.warning("Rejected row %s: %s", position.row, e)
+            rejects.append((position.row, e, fields))
+            continue
+
+        person, created = add_person(
+            session, instance, outbox=outbox, unhashed=unhashed
+        )
+
+        return_data = person.model_dump(exclude={"id"})
+        return_data["created"] = created
+        people.append(return_data)
+
+    return people
+
+
+def deliver_emails(undelivered: Outbox, messages: list):
+    """Sends `messages` and drops the delivered ones from `undelivered`."""
+    if not messages:
+        return
+    failed: list = []
+    send_bulk_email(messages, failed)
+    delivered = list(messages)
+    for message in failed:
+        delivered.remove(message)
+    undelivered.remove(delivered)
 
-    try:
-        csv_data = reader(open(filepath))
-    except FileNotFoundError as e:
+
+@login_required
+def load(
+    filepath: str,
+    from_person: Person,
+    resume: bool = False,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+) -> ResultDict:
+    """Loads data from filepath to the database
+
+    Rows are committed `chunk_size` at a time and a checkpoint records
+    the last committed row, so `resume` continues a load that stopped
+    from there. Rows that cannot be loaded (e.g. an invalid email) are
+    written to `reject_path` with their error instead of aborting.
+    Emails that could not be delivered stay in the `Outbox` of the file
+    and are sent again by `resume`.
+    """
+    if not os.path.exists(filepath):
+        e = FileNotFoundError(f"No such file: {filepath!r}")
         log.error(str(e))
         raise e
 
+    checkpoint = Checkpoint(filepath)
+    start = checkpoint.load() if resume else Position()
+    if start.row:
+        log.info("Resuming %s after row %s", filepath, start.row)
+
+    undelivered = Outbox(filepath)
+    if resume:
+        deliver_emails(undelivered, undelivered.pending())
+
     people = []
+    lines = read_lines(filepath, start)
+    reject_file = RejectFile(reject_path(filepath), append=resume)
+
+    while chunk := list(islice(lines, chunk_size)):
+        outbox: list = []
+        unhashed: list = []
+        rejects: List[Reject] = []
+
+        with get_session() as session:
+            people += load_rows(session, chunk, outbox, unhashed, rejects)
+
+            hashes = hash_passwords([password for _, password in unhashed])
+            for (user, _), password_hash in zip(unhashed, hashes):
+                user.password = password_hash
+
+            # Saved first: once committed a resume sees these people as
+            # existing and would never email them their passwords.
+            undelivered.add(outbox)
+            try:
+                session.commit()
+            except BaseException:
+                undelivered.remove(outbox)
+                raise
+
+        reject_file.write(rejects)
+        checkpoint.save(chunk[-1][0])
+        # Roles and depts may have changed, other processes must see them.
+        forget_people()
+        deliver_emails(undelivered, outbox)
+
+    if reject_file.count:
+        log.warning(
+            "%s rows of %s rejected, see %s",
+            reject_file.count,
+            filepath,
+            reject_file.path,
+        )
+    if undelivered.pending():
+        log.warning(
+            "Emails of %s could not be sent, they are in %s",
+            filepath,
+            undelivered.path,
+        )
+    checkpoint.clear()
+    return people
+
+
+@login_required
+def load_diff(filepath: str, from_person: Person) -> Dict[str, Any]:
+    """Computes the changes a load would apply without writing them.
+
+    - Existing people are indexed by email with a single query
+    - The file is streamed, so memory grows with the roster only
+    """
+
     headers = ["name", "dept", "role", "email", "currency"]
+    summary: Dict[str, Any] = {
+        "created": [],
+        "updated": [],
+        "unchanged": 0,
+        "missing": [],
+        "invalid": [],
+    }
 
     with get_session() as session:
-        for line in csv_data:
+        sql = select(Person.email, Person.dept, Person.role, Person.currency)
+        index = {
+            email: (dept, role, currency)
+            for email, dept, role, currency in session.exec(sql)
+        }
+
+    seen = set()
+
+    if not os.path.exists(filepath):
+        e = FileNotFoundError(f"No such file: {filepath!r}")
+        log.error(str(e))
+        raise e
+
+    with open(filepath) as csv_file:
+        for line in reader(csv_file):
             person_data = dict(zip(headers, [item.strip() for item in line]))
-            instance = Person(**person_data)
-            person, created = add_person(session, instance)
-            return_data = person.model_dump(exclude={"id"})
-            return_data["created"] = created
-            people.append(return_data)
+            email = person_data.get("email", "")
 
-        session.commit()
+            if not check_valid_email(email):
+                summary["invalid"].append(email)
+                continue
 
-    return people
+            current = index.get(email)
+            incoming = (
+                person_data.get("dept"),
+                person_data.get("role"),
+                person_data.get("currency") or "USD",
+            )
 
+            if current is None:
+                summary["created"].append(email)
+            elif current != incoming or email in seen:
+                # A repeated row updates the person its first row created.
+                summary["updated"].append(email)
+            else:
+                summary["unchanged"] += 1
 
-@login_required
-def read(from_person: Person, **query: Query) -> ResultDict:
-    """Read data from db and filters using query"""
-    query = {key: value for key, value in query.items() if value is not None}
+            seen.add(email)
+            index[email] = incoming
+
+    summary["missing"] = [email for email in index if email not in seen]
+
+    return summary
 
-    return_data = []
-    query_statements = []
+
+def build_filters(query: Query, scope: Scope | None = None) -> list:
+    """Turns the `dept` and `email` filters into SQL where clauses.
+
+    With `scope` the rows outside the caller's scope are filtered too.
+    """
+    query_statements = [] if scope is None else scope_filters(scope)
 
     if "dept" in query:
         query_statements.append(Person.dept == query["dept"])
     if "email" in query:
         query_statements.append(Person.email == query["email"])
 
-    sql = select(Person)
+    return query_statements
+
+
+def read_sql(
+    query: Query,
+    limit: int | None = None,
+    offset: int = 0,
+    scope: Scope | None = None,
+):
+    """Builds the listing query used by `read`."""
+    last_movement = (
+        select(
+            Movement.person_id,
+            func.max(Movement.date).label("last_movement"),
+        )
+        .group_by(Movement.person_id)
+        .subquery()
+    )
 
+    sql = (
+        select(
+            Person.email,
+            Balance.value,
+            last_movement.c.last_movement,
+            Person.name,
+            Person.dept,
+            Person.role,
+            Person.currency,
+        )
+        .join(Balance, Balance.person_id == Person.id)
+        .outerjoin(last_movement, last_movement.c.person_id == Person.id)
+        .order_by(Person.id)
+    )
+
+    query_statements = build_filters(query, scope)
     if query_statements:
         sql = sql.where(*query_statements)
+    if limit is not None:
+        sql = sql.limit(limit).offset(offset)
+
+    return sql
+
+
+def convert_rows(
+    rows, rates: Dict[str, USDRate], currency: str | None = None
+) -> List[PersonRecord]:
+    """Builds records from `read_sql` rows with balances converted.
+
+    Rates are resolved once per currency, each row then costs a dict
+    lookup and a multiplication. With `currency` every value is reported
+    in that currency instead of the person's.
+    """
+    currency = report_currency(currency)
+    factors = {code: rate.value for code, rate in rates.items()}
+    make = PersonRecord._make
+
+    # person = (email, balance, last_movement, name, dept, role)
+    if currency is not None:
+        factor = factors[currency]
+        return [
+            make((*person, currency, person[1] * factor))
+            for *person, _ in rows
+        ]
+
+    return [
+        make((*person, code, person[1] * factors[code]))
+        for *person, code in rows
+    ]
+
+
+def report_currency(currency: str | None) -> str | None:
+    """The code a listing reports values in, None for each person's."""
+    return currency.upper() if currency else None
+
+
+def row_currencies(rows, currency: str | None = None) -> List[str]:
+    """Currencies whose rates are needed to convert `rows`."""
+    currency = report_currency(currency)
+    if currency is not None:
+        return [currency]
+    return sorted({row.currency for row in rows})
 
-    with get_session() as session:
-        currencies = session.exec(select(Person.currency).distinct())
-
-        rates = get_rates(list(currencies))
-        results = session.exec(sql)
-
-        for person in results:
-            total = rates[person.currency].value * person.balance.value
-
-            movements = session.exec(
-                select(Movement).where(Movement.person_id == person.id)
-            ).all()
-
-            return_data.append(
-                {
-                    "email": person.email,
-                    "balance": person.balance.value,
-                    "last_movement": movements[-1].date.strftime(DATEFMT),
-                    **person.model_dump(exclude={"id"}),
-                    **{"value": total},
-                }
-            )
 
-    return return_data
+@login_required
+@cached_query
+def read(
+    from_person: Person,
+    limit: int | None = None,
+    offset: int = 0,
+    currency: str | None = None,
+    **query: Query,
+) -> List[PersonRecord]:
+    """Read data from db and filters using query
+
+    `limit` and `offset` paginate in SQL, ordered by person. Results are
+    cached until the next write, see `dundie.utils.cache`. `currency`
+    reports every value in that currency.
+    """
+    query = {key: value for key, value in query.items() if value is not None}
+    sql = read_sql(query, limit, offset, resolve_scope(from_person))
+
+    with get_read_session() as session:
+        rows = session.exec(sql).all()
+
+    rates = get_rates(row_currencies(rows, currency))
+    return convert_rows(rows, rates, currency)
 
 
 @login_required
-def add(value: Decimal, from_person: Person, **query: Query):
-    """Add value to each record on query."""
+@cached_query
+def search(
+    from_person: Person,
+    limit: int | None = None,
+    offset: int = 0,
+    currency: str | None = None,
+    term: str = "",
+    **query: Query,
+) -> List[PersonRecord]:
+    """People whose name, email, dept or role match every word of `term`.
+
+    Words match as prefixes and results come best match first, see
+    `dundie.utils.search`. Takes the same filters as `read`.
+    """
+    if not search_words(term):
+        return []
+
     query = {key: value for key, value in query.items() if value is not None}
+    filters = build_filters(query, resolve_scope(from_person))
 
-    people = read(**query)
+    with get_read_session() as session:
+        dialect = session.bind.dialect.name
+        sql = search_sql(term, filters, limit, offset, dialect)
+        rows = session.exec(sql).all()
 
-    if not people:  # prama: no cover
-        raise RuntimeError("Not Found")
+    rates = get_rates(row_currencies(rows, currency))
+    return convert_rows(rows, rates, currency)
 
+
+@login_required
+def rebuild_search(from_person: Person) -> int:
+    """Rebuilds the search index, returns the number of people indexed."""
     with get_session() as session:
-        user = os.getenv("USER")
+        indexed = rebuild_index(session)
+        session.commit()
+
+    return indexed
+
+
+def add_points(
+    value: Decimal,
+    from_person: Person,
+    idempotency_key: str | None,
+    command: str,
+    query: Query,
+):
+    """Adds `value` to each record on query, recorded as `command`."""
+    query = {key: value for key, value in query.items() if value is not None}
+    user = os.getenv("USER")
+
+    def add_to_people(session):
+        sql = select(Person).where(*build_filters(query))
+        people = session.exec(sql).all()
+
+        if not people:  # prama: no cover
+            raise RuntimeError("Not Found")
 
         for person in people:
-            instance = session.exec(
-                select(Person).where(Person.email == person["email"])
-            ).first()
+            add_movement(session, cast(Person, person), value, user)
+
+    run_idempotent(
+        add_to_people,
+        from_person.id,
+        idempotency_key,
+        command,
+        {"value": Decimal(value).normalize(), "query": query},
+    )
 
-            add_movement(session, cast(Person, instance), value, user)
 
-        session.commit()
+@login_required
+def add(
+    value: Decimal,
+    from_person: Person,
+    idempotency_key: str | None = None,
+    **query: Query,
+):
+    """Add value to each record on query.
+
+    Retrying with the same `idempotency_key` does not add it again.
+    """
+    add_points(value, from_person, idempotency_key, "add", query)
 
 
 @login_required
-def transfer(value: int, to_email: str, from_person: Person):
-    """Transfer points between users"""
+def remove(
+    value: Decimal,
+    from_person: Person,
+    idempotency_key: str | None = None,
+    **query: Query,
+):
+    """Remove value from each record on query.
+
+    Retrying with the same `idempotency_key` does not remove it again.
+    """
+    add_points(-value, from_person, idempotency_key, "remove", query)
 
-    confirmation = None
-    with get_session() as session:
-        sql = select(Balance.value).where(Balance.person == from_person)
-        from_person_balance = session.exec(sql).first()
 
-        if from_person_balance < value:
+@login_required
+def transfer(
+    value: int,
+    to_email: str,
+    from_person: Person,
+    idempotency_key: str | None = None,
+):
+    """Transfer points between users
+
+    Retrying with the same `idempotency_key` returns the first result.
+    """
+    if value <= 0:
+        raise ValueError("Transfer value must be positive")
+
+    def transfer_points(session):
+        sql = select(Person).where(Person.email == to_email)
+        to_person = session.exec(sql).first()
+
+        if to_person is None:
+            raise UserNotFoundError(f"User {to_email!r} not found")
+
+        if not withdraw(
+            session, from_person, Decimal(value), from_person.name
+        ):
             raise InsufficientBalanceError(
                 "You don't have sufficient balance to transfer"
             )
 
-        add_movement(session, from_person, Decimal(-value), from_person.name)
+        add_movement(session, to_person, Decimal(value), from_person.name)
+        return [True, to_person.name]
+
+    return run_idempotent(
+        transfer_points,
+        from_person.id,
+        idempotency_key,
+        "transfer",
+        {"value": value, "to": to_email},
+    )
+
 
-        sql = select(Person).where(Person.email == to_email)
-        to_person = session.exec(sql).first()
+def movements_sql(
+    query: Query,
+    limit: int | None = None,
+    offset: int = 0,
+    scope: Scope | None = None,
+):
+    """Builds the listing query used by `movements`."""
+    sql = (
+        select(
+            Person.email,
+            Person.name,
+            Person.dept,
+            Person.role,
+            Movement.date,
+            Movement.value,
+            Movement.actor,
+        )
+        .join(Movement, Movement.person_id == Person.id)
+        .order_by(Person.id, Movement.id)
+    )
 
-        add_movement(session, to_person, Decimal(value), from_person.name)
-        confirmation = [True, to_person.name]
-        session.commit()
+    query_statements = build_filters(query, scope)
+    if query_statements:
+        sql = sql.where(*query_statements)
+    if limit is not None:
+        sql = sql.limit(limit).offset(offset)
 
-    return confirmation
+    return sql
 
 
 @login_required
-def movements(from_person: Person, **query: Query):
-    """Show the movements from users."""
+@cached_query
+def movements(
+    from_person: Person,
+    limit: int | None = None,
+    offset: int = 0,
+    **query: Query,
+) -> List[MovementRecord]:
+    """Show the movements from users.
+
+    `limit` and `offset` paginate in SQL, ordered by person and movement.
+    """
     query = {key: value for key, value in query.items() if value is not None}
+    sql = movements_sql(query, limit, offset, resolve_scope(from_person))
 
-    return_data = []
-    query_statements = []
+    with get_read_session() as session:
+        rows = session.exec(sql).all()
 
-    if "dept" in query:
-        query_statements.append(Person.dept == query["dept"])
-    if "email" in query:
-        query_statements.append(Person.email == query["email"])
+    return [MovementRecord(*row) for row in rows]
 
-    sql = select(Person)
 
+def stats_sql(query: Query, scope: Scope | None = None):
+    """Builds the per dept aggregation used by `stats`."""
+    sql = (
+        select(Person.dept, func.count(Person.id), func.sum(Balance.value))
+        .join(Balance, Balance.person_id == Person.id)
+        .group_by(Person.dept)
+        .order_by(Person.dept)
+    )
+
+    query_statements = build_filters(query, scope)
     if query_statements:
         sql = sql.where(*query_statements)
+
+    return sql
+
+
+@login_required
+def stats(from_person: Person, **query: Query) -> Dict[str, Any]:
+    """Aggregates people and balances per dept."""
+    query = {key: value for key, value in query.items() if value is not None}
+    sql = stats_sql(query, resolve_scope(from_person))
+
+    with get_read_session() as session:
+        rows = session.exec(sql).all()
+
+    return summarize_stats(rows)
+
+
+def summarize_stats(rows) -> Dict[str, Any]:
+    """Turns the rows of `stats_sql` into totals per dept."""
+    depts = {
+        dept: {"people": people, "balance": Decimal(balance or 0)}
+        for dept, people, balance in rows
+    }
+
+    return {
+        "people": sum(dept["people"] for dept in depts.values()),
+        "balance": sum(
+            (dept["balance"] for dept in depts.values()), Decimal(0)
+        ),
+        "depts": depts,
+    }
+
+
+@login_required
+def export_ledger(
+    path: str, from_person: Person, chunk_size: int = 50_000
+) -> int:
+    """Writes every movement to a columnar ledger file, see `ledger`.
+
+    Rows are streamed `chunk_size` at a time, so memory stays flat
+    whatever the size of the ledger: from a raw DBAPI cursor on SQLite,
+    from a server side cursor elsewhere, where client side cursors (e.g.
+    psycopg's) fetch the whole result on execute.
+    """
+    sql = "SELECT id, person_id, date, value, actor FROM movement ORDER BY id"
+
+    with get_session() as session:
+        connection = session.connection()
+        if connection.dialect.name != "sqlite":
+            result = connection.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).exec_driver_sql(sql)
+            with result, open(path, "wb") as file:
+                return write_ledger(file, result.partitions(chunk_size))
+
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(sql)
+            chunks = iter(lambda: cursor.fetchmany(chunk_size), [])
+            with open(path, "wb") as file:
+                return write_ledger(file, chunks)
+        finally:
+            cursor.close()
+
+
+@login_required
+def add_grant_rule(
+    value: Decimal,
+    period: str,
+    from_person: Person,
+    dept: str | None = None,
+) -> int:
+    """Saves a rule granting `value` to `dept` (or everyone) per period."""
+    period_key(period, datetime.now())  # validates the period
+
+    with get_session() as session:
+        rule = GrantRule(
+            dept=dept, value=value, period=period, actor=from_person.name
+        )
+        session.add(rule)
+        session.commit()
+        return rule.id
+
+
+@login_required
+def grant_rules(from_person: Person) -> List[GrantRule]:
+    """Lists the active grant rules."""
     with get_session() as session:
-        persons = session.exec(sql)
-        for person in persons:
-            sql = select(Movement.date, Movement.value, Movement.actor).where(
-                Movement.person == person
+        sql = select(GrantRule).where(GrantRule.active).order_by(GrantRule.id)
+        return list(session.exec(sql).all())
+
+
+@login_required
+def remove_grant_rule(rule_id: int, from_person: Person) -> bool:
+    """Deactivates a rule, its past runs are kept."""
+    with get_session() as session:
+        result = session.exec(
+            update(GrantRule)
+            .where(GrantRule.id == rule_id, GrantRule.active)
+            .values(active=False)
+        )
+        session.commit()
+        return result.rowcount > 0
+
+
+@login_required
+def run_schedule(
+    from_person: Person, now: datetime | None = None
+) -> List[Dict[str, Any]]:
+    """Applies every rule not yet applied for its current period.
+
+    All rules due are applied in one transaction together with their
+    `GrantRun` rows. The runs are unique per rule and period, so running
+    twice, or two runners at once, never credits a period twice.
+    """
+    now = now or datetime.now()
+    applied = []
+
+    with get_session() as session:
+        rules = session.exec(select(GrantRule).where(GrantRule.active)).all()
+        due = {rule.id: (rule, period_key(rule.period, now)) for rule in rules}
+
+        done = session.exec(
+            select(GrantRun.rule_id, GrantRun.period).where(
+                GrantRun.rule_id.in_(due)
             )
-            movements: list[tuple[datetime, Decimal, str]] = session.exec(
-                sql
-            ).all()
-
-            for date, value, actor in movements:
-                return_data.append(
-                    {
-                        "email": person.email,
-                        "name": person.name,
-                        "dept": person.dept,
-                        "role": person.role,
-                        "date": date.strftime(DATEFMT),
-                        "value": value,
-                        "actor": actor,
-                    }
+        ).all()
+        for rule_id, period in done:
+            if due[rule_id][1] == period:
+                del due[rule_id]
+
+        for rule, period in due.values():
+            people = apply_rule(session, rule, now)
+            session.add(
+                GrantRun(
+                    rule_id=rule.id, period=period, people=people, date=now
                 )
+            )
+            applied.append(
+                {"rule": rule.id, "period": period, "people": people}
+            )
+
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another runner applied the same periods first.
+            session.rollback()
+            return []
 
-    return return_data
+    return applied
+
+
+@login_required
+def create_api_token(from_person: Person) -> str:
+    """Creates an API token for the logged user, only its hash is saved."""
+    token = secrets.token_urlsafe(32)
+
+    with get_session() as session:
+        session.add(
+            APIToken(person_id=from_person.id, token_hash=hash_token(token))
+        )
+        session.commit()
+
+    return token
 
 
 def login(email: str, password: str):
@@ -196,11 +777,18 @@ def login(email: str, password: str):
     with get_session() as session:
         user = session.exec(sql).first()
 
-    if not user or password != user[1]:
-        return False
+        if not user or not verify_password(password, user[1]):
+            return False
+
+        user = user[0]
+        # Read before a commit expires it, the session closes right after.
+        email = user.email
+        if needs_rehash(user.user.password):
+            user.user.password = hash_password(password)
+            session.commit()
 
-    user = user[0]
-    keyring.set_password(KEYRING_SERVICE_NAME, KEYRING_USERNAME, user.email)
+    keyring.set_password(KEYRING_SERVICE_NAME, KEYRING_USERNAME, email)
+    forget_logged_email()
     return True
 
 
@@ -208,5 +796,6 @@ def logout():
     logged = keyring.get_password(KEYRING_SERVICE_NAME, KEYRING_USERNAME)
     if logged:
         keyring.delete_password(KEYRING_SERVICE_NAME, KEYRING_USERNAME)
+        forget_logged_email()
         return True
     return False
@@ -0,0 +1,152 @@
+"""Asyncio version of the dundie core API.
+
+Uses the same queries and returns the same records as `dundie.core`, but
+runs them on an async engine (aiosqlite for SQLite) and fetches exchange
+rates concurrently, so it can be awaited from an asyncio service without
+blocking its event loop.
+"""
+
+import os
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from dundie.core import (
+    Query,
+    build_filters,
+    convert_rows,
+    movements_sql,
+    read_sql,
+    row_currencies,
+    stats_sql,
+    summarize_stats,
+)
+from dundie.database import get_async_session
+from dundie.models import Balance, Movement, Person
+from dundie.records import MovementRecord, PersonRecord
+from dundie.utils.auth import async_login_required, resolve_scope
+from dundie.utils.db import (
+    UPSERT_DIALECTS,
+    increment_balance_sql,
+    withdraw_sql,
+)
+from dundie.utils.errors import InsufficientBalanceError, UserNotFoundError
+from dundie.utils.exchange import get_rates_async
+
+
+@async_login_required
+async def read(
+    from_person: Person,
+    limit: int | None = None,
+    offset: int = 0,
+    currency: str | None = None,
+    **query: Query,
+) -> List[PersonRecord]:
+    """Read data from db and filters using query"""
+    query = {key: value for key, value in query.items() if value is not None}
+    sql = read_sql(query, limit, offset, resolve_scope(from_person))
+
+    async with get_async_session() as session:
+        rows = (await session.exec(sql)).all()
+
+    rates = await get_rates_async(row_currencies(rows, currency))
+    return convert_rows(rows, rates, currency)
+
+
+@async_login_required
+async def movements(
+    from_person: Person,
+    limit: int | None = None,
+    offset: int = 0,
+    **query: Query,
+) -> List[MovementRecord]:
+    """Show the movements from users."""
+    query = {key: value for key, value in query.items() if value is not None}
+    sql = movements_sql(query, limit, offset, resolve_scope(from_person))
+
+    async with get_async_session() as session:
+        rows = (await session.exec(sql)).all()
+
+    return [MovementRecord(*row) for row in rows]
+
+
+@async_login_required
+async def stats(from_person: Person, **query: Query) -> Dict[str, Any]:
+    """Aggregates people and balances per dept."""
+    query = {key: value for key, value in query.items() if value is not None}
+
+    async with get_async_session() as session:
+        sql = stats_sql(query, resolve_scope(from_person))
+        rows = (await session.exec(sql)).all()
+
+    return summarize_stats(rows)
+
+
+async def add_movement(
+    session: AsyncSession, person_id: int, value: Decimal, actor: str
+):
+    """Adds movement to user account and increments its balance."""
+    session.add(Movement(person_id=person_id, actor=actor, value=value))
+
+    dialect = session.bind.dialect.name
+    result = await session.exec(
+        increment_balance_sql(dialect, person_id, value)
+    )
+
+    if dialect not in UPSERT_DIALECTS and result.rowcount == 0:
+        session.add(Balance(person_id=person_id, value=value))
+
+
+@async_login_required
+async def add(value: Decimal, from_person: Person, **query: Query):
+    """Add value to each record on query."""
+    query = {key: value for key, value in query.items() if value is not None}
+
+    async with get_async_session() as session:
+        sql = select(Person.id).where(*build_filters(query))
+        people = (await session.exec(sql)).all()
+
+        if not people:
+            raise RuntimeError("Not Found")
+
+        user = os.getenv("USER")
+        for person_id in people:
+            await add_movement(session, person_id, value, user)
+
+        await session.commit()
+
+
+@async_login_required
+async def transfer(value: int, to_email: str, from_person: Person):
+    """Transfer points between users"""
+    if value <= 0:
+        raise ValueError("Transfer value must be positive")
+
+    async with get_async_session() as session:
+        sql = select(Person.id, Person.name).where(Person.email == to_email)
+        to_person = (await session.exec(sql)).first()
+
+        if to_person is None:
+            raise UserNotFoundError(f"User {to_email!r} not found")
+
+        result = await session.exec(withdraw_sql(from_person.id, value))
+        if result.rowcount == 0:
+            raise InsufficientBalanceError(
+                "You don't have sufficient balance to transfer"
+            )
+
+        session.add(
+            Movement(
+                person_id=from_person.id,
+                actor=from_person.name,
+                value=Decimal(-value),
+            )
+        )
+        await add_movement(
+            session, to_person.id, Decimal(value), from_person.name
+        )
+        await session.commit()
+
+    return [True, to_person.name]
@@ -0,0 +1,134 @@
+"""Local daemon that keeps dundie warm for repeated commands.
+
+`dundie serve` imports the CLI once, opens the database engine, caches
+the logged user and exchange rates, then executes the commands sent by
+`dundie.client` over a Unix domain socket. Requests are handled one at a
+time because each one redirects stdout and changes directory.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import traceback
+
+from dundie.config import config_fingerprint
+from dundie.database import get_session
+from dundie.settings import DAEMON_SOCKET
+from dundie.utils import auth, render
+from dundie.utils.cache import cache_info
+from dundie.utils.files import private_dir
+from dundie.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+class ClientStream(io.StringIO):
+    """Captures output while reporting the client terminal state."""
+
+    def __init__(self, tty: bool):
+        super().__init__()
+        self.tty = tty
+
+    def isatty(self) -> bool:
+        return self.tty
+
+
+def run_command(payload: dict) -> dict:
+    """Executes one CLI invocation and returns its captured output."""
+    from dundie.cli import main
+
+    stdout = ClientStream(payload.get("tty", False))
+    stderr = ClientStream(False)
+    exit_code = 0
+
+    os.chdir(payload.get("cwd") or "/")
+    os.environ["COLUMNS"] = str(payload.get("columns", 80))
+    if payload.get("user"):
+        os.environ["USER"] = payload["user"]
+
+    with (
+        contextlib.redirect_stdout(stdout),
+        contextlib.redirect_stderr(stderr),
+    ):
+        try:
+            main.main(args=payload["argv"], prog_name="dundie")
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                exit_code = e.code
+            elif e.code is not None:
+                print(e.code, file=stderr)
+                exit_code = 1
+        except Exception:
+            log.exception("Command %s failed", payload["argv"])
+            traceback.print_exc(file=stderr)
+            exit_code = 1
+
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "exit_code": exit_code,
+    }
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        payload = json.loads(self.rfile.readline())
+
+        if payload.get("reset"):
+            auth.forget_logged_email()
+            response = {"stdout": "", "stderr": "", "exit_code": 0}
+        elif payload.get("config") != self.server.config:
+            # The client has other settings, e.g. another database.
+            response = {"local": True}
+        else:
+            response = run_command(payload)
+
+        self.wfile.write(json.dumps(response).encode())
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    def __init__(self, path: str = DAEMON_SOCKET):
+        private_dir(os.path.dirname(os.path.abspath(path)))
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+        super().__init__(path, CommandHandler)
+        os.chmod(path, 0o600)
+        # Settings were resolved at import, from the environment and the
+        # config file seen from the directory the daemon started in.
+        self.config = config_fingerprint()
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.server_address)
+
+
+def warm_up():
+    """Loads the CLI and opens a pooled database connection."""
+    import dundie.cli  # noqa: F401
+
+    auth.cache_logged_email()
+    render.PAGER_ENABLED = False
+
+    with get_session() as session:
+        session.connection()
+
+
+def serve(path: str = DAEMON_SOCKET):
+    """Serves commands on `path` until interrupted or terminated."""
+    warm_up()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    with DaemonServer(path) as server:
+        log.info("dundie daemon listening on %s", path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            log.info("dundie daemon query cache: %s", cache_info())
@@ -1,11 +1,126 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from dundie import models
-from dundie.settings import SQL_CON_STRING
+from dundie.settings import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_SIZE,
+    SQL_CON_STRING,
+)
+
+
+def engine_options(url: str | URL) -> dict:
+    """Pool options from settings for the backend of `url`."""
+    url = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    if url.get_backend_name() == "sqlite" and url.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return options
+
+    options["pool_size"] = DB_POOL_SIZE
+    options["max_overflow"] = DB_MAX_OVERFLOW
+    return options
+
+
+def create_search_index(bind: Engine):
+    """Adds the people search index to SQLite databases without it.
 
-engine = create_engine(SQL_CON_STRING, echo=False)
+    `create_all` only runs its DDL when it creates `person` itself, so
+    databases created before it existed get it here, filled from the
+    current rows.
+    """
+    if bind.dialect.name != "sqlite":
+        return
+
+    with bind.begin() as connection:
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'person_search'"
+        ).first()
+        if exists:
+            return
+
+        for statement in models.PERSON_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO person_search(person_search) VALUES ('rebuild')"
+        )
+
+
+engine = create_engine(
+    SQL_CON_STRING, echo=False, **engine_options(SQL_CON_STRING)
+)
 models.SQLModel.metadata.create_all(bind=engine)
+create_search_index(engine)
 
 
 def get_session() -> Session:
     return Session(bind=engine)
+
+
+# Engine of a read-only snapshot used by the listings, see `use_snapshot`.
+_snapshot_engine: ContextVar[Engine | None] = ContextVar(
+    "snapshot_engine", default=None
+)
+
+
+def get_read_session() -> Session:
+    """Session for reports, on the snapshot when one is in use."""
+    return Session(bind=_snapshot_engine.get() or engine)
+
+
+def using_snapshot() -> bool:
+    return _snapshot_engine.get() is not None
+
+
+@contextmanager
+def use_snapshot(snapshot: Engine):
+    """Sends `get_read_session` to `snapshot` inside the block."""
+    token = _snapshot_engine.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _snapshot_engine.reset(token)
+
+
+# sync driver -> asyncio driver used by `dundie.core_async`
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg",
+}
+_async_engines: dict = {}
+
+
+def get_async_engine() -> AsyncEngine:
+    """Returns an async engine pointing to the same database as `engine`."""
+    url = engine.url
+
+    if url not in _async_engines:
+        drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+        options = engine_options(url)
+        if url.get_backend_name() == "sqlite":
+            # aiosqlite connections own a worker thread bound to the event
+            # loop that opened them, pooling them outlives `asyncio.run`.
+            options = {"poolclass": NullPool}
+        _async_engines[url] = create_async_engine(
+            url.set(drivername=drivername), echo=False, **options
+        )
+
+    return _async_engines[url]
+
+
+def get_async_session() -> AsyncSession:
+    return AsyncSession(bind=get_async_engine())
@@ -0,0 +1,193 @@
+"""Columnar binary file of the movement ledger.
+
+Written by `dundie export-ledger`, read with `LedgerReader`. The file is
+a sequence of row groups, one per exported chunk, followed by a footer:
+
+    b"DLEDGER1"
+    row group: id, person_id, date, value as int64 and actor as uint32
+               arrays of the same length, little endian, one after the
+               other
+    footer:    actor dictionary and (offset, rows) of every row group
+    uint64 footer length, b"DLEDGER1"
+
+`date` is microseconds since 1970-01-01 of the stored (naive) datetime,
+`value` is the decimal scaled by `10 ** VALUE_SCALE` and `actor` indexes
+the dictionary. Columns are 8 byte aligned so the reader maps the file
+and exposes them as `memoryview`s without copying (on little endian
+hosts, which is every platform dundie runs on).
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+MAGIC = b"DLEDGER1"
+VALUE_SCALE = 3
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+INT_COLUMNS = ("id", "person_id", "date", "value")
+COLUMNS = INT_COLUMNS + ("actor",)
+
+_length = struct.Struct("<Q")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _to_micros(value) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - EPOCH) // MICROSECOND
+
+
+class LedgerWriter:
+    """Appends row groups to an open binary file."""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.actors: Dict[str, int] = {}
+        self.groups: List[Tuple[int, int]] = []
+        self.file.write(MAGIC)
+
+    def write_rows(self, rows: Sequence[tuple]):
+        """Writes (id, person_id, date, value, actor) rows as a group."""
+        if not rows:
+            return
+
+        scale = 10**VALUE_SCALE
+        ids, person_ids, dates, values, actors = zip(*rows)
+        codes = [
+            self.actors.setdefault(actor, len(self.actors)) for actor in actors
+        ]
+
+        self.groups.append((self.file.tell(), len(rows)))
+        self.file.write(_little_endian(array("q", ids)))
+        self.file.write(_little_endian(array("q", person_ids)))
+        self.file.write(_little_endian(array("q", map(_to_micros, dates))))
+        self.file.write(
+            _little_endian(
+                array("q", (round(Decimal(v) * scale) for v in values))
+            )
+        )
+        actor_bytes = _little_endian(array("I", codes))
+        # Pads to keep the next group's int64 columns aligned.
+        self.file.write(actor_bytes + b"\0" * (-len(actor_bytes) % 8))
+
+    def close(self):
+        footer = json.dumps(
+            {
+                "columns": COLUMNS,
+                "value_scale": VALUE_SCALE,
+                "actors": list(self.actors),
+                "groups": self.groups,
+            }
+        ).encode()
+        self.file.write(footer)
+        self.file.write(_length.pack(len(footer)))
+        self.file.write(MAGIC)
+
+
+def write_ledger(file: BinaryIO, chunks: Iterable[Sequence[tuple]]) -> int:
+    """Writes every chunk of rows as a row group, returns the row count."""
+    writer = LedgerWriter(file)
+    total = 0
+    for rows in chunks:
+        writer.write_rows(rows)
+        total += len(rows)
+    writer.close()
+    return total
+
+
+class LedgerReader:
+    """Memory maps a ledger file, columns are read without copying.
+
+    with LedgerReader("ledger.dlg") as ledger:
+        for group in ledger.groups():
+            total += sum(group["value"])
+    """
+
+    def __init__(self, path: str):
+        # The map keeps its own handle, the file can be closed right away.
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        # Column views handed out, released on close so the map can close.
+        self._exports: List[memoryview] = []
+
+        size = len(self._map)
+        if (
+            self._map[:8] != MAGIC
+            or size < 24
+            or self._map[size - 8 :] != MAGIC
+        ):
+            raise ValueError(f"{path!r} is not a dundie ledger file")
+
+        (footer_length,) = _length.unpack_from(self._map, size - 16)
+        footer = json.loads(
+            bytes(self._map[size - 16 - footer_length : size - 16])
+        )
+        self.actors: List[str] = footer["actors"]
+        self.value_scale: int = footer["value_scale"]
+        self._groups: List[Tuple[int, int]] = footer["groups"]
+
+    def __len__(self) -> int:
+        return sum(rows for _, rows in self._groups)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in self._exports:
+            view.release()
+        self._exports.clear()
+        self._view.release()
+        self._map.close()
+
+    def groups(self) -> Iterator[Dict[str, memoryview]]:
+        """Yields the columns of each row group as int memoryviews.
+
+        The views are only valid until the reader is closed.
+        """
+        for offset, rows in self._groups:
+            columns = {}
+            for name in INT_COLUMNS:
+                end = offset + 8 * rows
+                columns[name] = self._view[offset:end].cast("q")
+                offset = end
+            columns["actor"] = self._view[offset : offset + 4 * rows].cast("I")
+            self._exports.extend(columns.values())
+            yield columns
+
+    def column(self, name: str) -> array:
+        """Returns a whole column as an array, copying it once."""
+        result = array("I" if name == "actor" else "q")
+        for group in self.groups():
+            result.extend(group[name])
+        return result
+
+    def rows(self) -> Iterator[tuple]:
+        """Decodes rows as (id, person_id, date, value, actor)."""
+        for group in self.groups():
+            yield from (
+                (
+                    id_,
+                    person_id,
+                    EPOCH + date * MICROSECOND,
+                    Decimal(value).scaleb(-self.value_scale),
+                    self.actors[actor],
+                )
+                for id_, person_id, date, value, actor in zip(
+                    *(group[name] for name in COLUMNS)
+                )
+            )
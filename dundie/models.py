@@ -3,6 +3,7 @@ from decimal import Decimal
 from typing import Optional
 
 from pydantic import field_validator
+from sqlalchemy import DDL, UniqueConstraint, event
 from sqlmodel import Field, Relationship, SQLModel
 from typing_extensions import Annotated
 
@@ -33,6 +34,51 @@ class Person(SQLModel, table=True):
         return v
 
 
+# External content FTS5 index over people for `dundie search`, kept in
+# sync by triggers so every write path updates it. SQLite only.
+PERSON_SEARCH_DDL = [
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS person_search USING fts5("
+        "name, email, dept, role, content='person', content_rowid='id', "
+        "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS person_search_insert "
+        "AFTER INSERT ON person BEGIN "
+        "INSERT INTO person_search(rowid, name, email, dept, role) "
+        "VALUES (new.id, new.name, new.email, new.dept, new.role); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS person_search_delete "
+        "AFTER DELETE ON person BEGIN "
+        "INSERT INTO person_search(person_search, rowid, name, email, "
+        "dept, role) VALUES ('delete', old.id, old.name, old.email, "
+        "old.dept, old.role); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS person_search_update "
+        "AFTER UPDATE OF name, email, dept, role ON person BEGIN "
+        "INSERT INTO person_search(person_search, rowid, name, email, "
+        "dept, role) VALUES ('delete', old.id, old.name, old.email, "
+        "old.dept, old.role); "
+        "INSERT INTO person_search(rowid, name, email, dept, role) "
+        "VALUES (new.id, new.name, new.email, new.dept, new.role); END"
+    ),
+]
+
+for statement in PERSON_SEARCH_DDL:
+    event.listen(
+        Person.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Person.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS person_search").execute_if(dialect="sqlite"),
+)
+
+
 class Balance(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     person_id: int = Field(
@@ -49,7 +95,7 @@ class Balance(SQLModel, table=True):
 
 class Movement(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
-    person_id: int = Field(foreign_key="person.id")
+    person_id: int = Field(foreign_key="person.id", index=True)
     actor: str = Field(nullable=False, index=True)
     value: Annotated[Decimal, Field(decimal_places=3, default=0)]
     date: datetime = Field(default_factory=lambda: datetime.now())
@@ -66,3 +112,53 @@ class User(SQLModel, table=True):
     password: str = Field(default_factory=generate_simple_password)
 
     person: Person = Relationship(back_populates="user")
+
+
+class APIToken(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True, index=True)
+    person_id: int = Field(foreign_key="person.id", index=True)
+    token_hash: str = Field(
+        nullable=False, index=True, sa_column_kwargs={"unique": True}
+    )
+    created: datetime = Field(default_factory=lambda: datetime.now())
+
+
+class GrantRule(SQLModel, table=True):
+    """Points granted to a dept (or everyone) once per period."""
+
+    id: Optional[int] = Field(default=None, primary_key=True, index=True)
+    dept: Optional[str] = Field(default=None, nullable=True)
+    value: Annotated[Decimal, Field(decimal_places=3)]
+    period: str = Field(nullable=False)
+    actor: str = Field(nullable=False)
+    active: bool = Field(default=True)
+    created: datetime = Field(default_factory=lambda: datetime.now())
+
+
+class GrantRun(SQLModel, table=True):
+    """A rule applied for a period, unique so a period is granted once."""
+
+    __table_args__ = (UniqueConstraint("rule_id", "period"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True, index=True)
+    rule_id: int = Field(foreign_key="grantrule.id")
+    period: str = Field(nullable=False)
+    people: int = Field(default=0)
+    date: datetime = Field(default_factory=lambda: datetime.now())
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Result of a write, returned again when its key is retried."""
+
+    __table_args__ = (UniqueConstraint("person_id", "key"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True, index=True)
+    person_id: int = Field(foreign_key="person.id")
+    key: str = Field(nullable=False)
+    command: str = Field(nullable=False)
+    # Digest of the arguments, a retry must repeat them.
+    fingerprint: str = Field(default="", nullable=False)
+    result: str = Field(nullable=False)
+    created: datetime = Field(
+        default_factory=lambda: datetime.now(), index=True
+    )
@@ -0,0 +1,63 @@
+"""Read-only records returned by the listing commands.
+
+Records are plain named tuples projected straight from the columns of a
+query, so listings hold no ORM instances, identity map or per-row dict.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+from dundie.settings import DATEFMT
+
+
+class PersonRecord(NamedTuple):
+    email: str
+    balance: Decimal
+    last_movement: datetime | None
+    name: str
+    dept: str
+    role: str
+    currency: str
+    value: Decimal
+
+
+class MovementRecord(NamedTuple):
+    email: str
+    name: str
+    dept: str
+    role: str
+    date: datetime
+    value: Decimal
+    actor: str
+
+
+def format_field(value: Any) -> str:
+    """Formats a record field for display."""
+    if isinstance(value, Decimal):
+        return f"{value:.2f}"
+    if isinstance(value, datetime):
+        return value.strftime(DATEFMT)
+    if value is None:
+        return ""
+    return str(value)
+
+
+def json_field(value: Any) -> Any:
+    """Converts a record field to a JSON compatible value."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def to_dicts(records: Iterable[NamedTuple]) -> List[Dict[str, Any]]:
+    """Serializes records to JSON compatible dicts."""
+    return [
+        {
+            field: json_field(value)
+            for field, value in zip(record._fields, record)
+        }
+        for record in records
+    ]
@@ -1,19 +1,117 @@
+"""Settings of dundie, each one can be overridden, see `dundie.config`."""
+
 import os
+import tempfile
+
+from dundie.config import check_config, setting
+
+
+def _private_dir() -> str:
+    """Per-user directory of the shared cache and the daemon socket."""
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "dundie")
+    home = os.path.expanduser("~")
+    if home != "~":
+        return os.path.join(home, ".cache", "dundie")
+    # No home directory, `dundie.utils.files` refuses it if not ours.
+    return os.path.join(tempfile.gettempdir(), f"dundie-{os.getuid()}")
 
-SMTP_HOST: str = "localhost"
-SMTP_PORT: int = 8025
-SMTP_TIMEOUT: int = 5
-EMAIL_FROM: str = "master@dundie.com"
+
+SMTP_HOST: str = setting("SMTP_HOST", "localhost")
+SMTP_PORT: int = setting("SMTP_PORT", 8025)
+SMTP_TIMEOUT: int = setting("SMTP_TIMEOUT", 5)
+EMAIL_FROM: str = setting("EMAIL_FROM", "master@dundie.com")
+# `smtp` sends with blocking smtplib, `async` uses a pool of asyncio
+# connections with at most `SMTP_CONCURRENCY` messages in flight.
+EMAIL_BACKEND: str = setting("EMAIL_BACKEND", "smtp")
+SMTP_CONCURRENCY: int = setting("SMTP_CONCURRENCY", 10)
 
 
 ROOT_PATH: str = os.path.dirname(__file__)
-DATABASE_PATH: str = os.path.join(ROOT_PATH, "..", "assets", "database.db")
-SQL_CON_STRING: str = f"sqlite:///{DATABASE_PATH}"
+DATABASE_PATH: str = setting(
+    "DATABASE_PATH", os.path.join(ROOT_PATH, "..", "assets", "database.db")
+)
+SQL_CON_STRING: str = setting("DATABASE_URL", f"sqlite:///{DATABASE_PATH}")
+# Pool options, ignored for in-memory SQLite which uses a single connection.
+DB_POOL_SIZE: int = setting("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW: int = setting("DB_MAX_OVERFLOW", 10)
+DB_POOL_PRE_PING: bool = setting("DB_POOL_PRE_PING", True)
+
+# scrypt work factor N = 2**PASSWORD_HASH_COST, each step doubles login
+# time and memory (14 is ~16MiB), tune with `benchmarks.bench_password`.
+PASSWORD_HASH_COST: int = setting("PASSWORD_HASH_COST", 14)
+# Loads creating at least this many users hash in a process pool.
+PASSWORD_POOL_THRESHOLD: int = setting("PASSWORD_POOL_THRESHOLD", 32)
+
+# Group commit used by long running servers: concurrent writes wait at
+# most `GROUP_COMMIT_MAX_DELAY` seconds to share one transaction of up to
+# `GROUP_COMMIT_BATCH_SIZE` writes, see `dundie.utils.writer`.
+GROUP_COMMIT_BATCH_SIZE: int = setting("GROUP_COMMIT_BATCH_SIZE", 100)
+GROUP_COMMIT_MAX_DELAY: float = setting("GROUP_COMMIT_MAX_DELAY", 0.002)
+
+# Logs are written by a background thread, `LOG_FORMAT` is `text` or
+# `json` and `LOG_LEVELS` sets levels per subsystem, e.g. "api=INFO,
+# utils.email=DEBUG" for the `dundie.api` and `dundie.utils.email` loggers.
+LOG_FILE: str = setting("LOG_FILE", "dundie.log")
+LOG_LEVEL: str = setting("LOG_LEVEL", os.getenv("LOG_LEVEL", "WARNING"))
+LOG_FORMAT: str = setting("LOG_FORMAT", "text")
+LOG_LEVELS: str = setting("LOG_LEVELS", "")
 
-DATEFMT: str = "%d/%m/%Y %H:%M:%S"
+# `--snapshot` reports read a copy of the SQLite database taken with the
+# backup API, reused while younger than `SNAPSHOT_MAX_AGE` seconds (0
+# copies every time). `SNAPSHOT_PATH` defaults to the database path plus
+# `.snapshot`, it is read through `SNAPSHOT_MMAP_SIZE` bytes of mmap.
+SNAPSHOT_PATH: str = setting("SNAPSHOT_PATH", "")
+SNAPSHOT_MAX_AGE: int = setting("SNAPSHOT_MAX_AGE", 60)
+SNAPSHOT_MMAP_SIZE: int = setting("SNAPSHOT_MMAP_SIZE", 1 << 30)
 
-API_BASE_URL = "https://economia.awesomeapi.com.br/json/last/USD-{currency}"
+# `load` commits every `LOAD_CHUNK_SIZE` rows and records a checkpoint,
+# `load --resume` continues after the last committed chunk.
+LOAD_CHUNK_SIZE: int = setting("LOAD_CHUNK_SIZE", 1000)
 
-ADMIN_EMAIL = "michael@dundermifflin.com"
+# Idempotency keys are kept at least this many seconds, expired ones are
+# deleted in bulk at most every `IDEMPOTENCY_PURGE_INTERVAL` seconds.
+IDEMPOTENCY_TTL: int = setting("IDEMPOTENCY_TTL", 86400)
+IDEMPOTENCY_PURGE_INTERVAL: int = setting("IDEMPOTENCY_PURGE_INTERVAL", 600)
+
+DATEFMT: str = setting("DATEFMT", "%d/%m/%Y %H:%M:%S")
+
+# Listings above this many rows are paginated instead of rendered as a
+# single Rich table, streaming formats flush every page.
+RENDER_ROW_THRESHOLD: int = setting("RENDER_ROW_THRESHOLD", 500)
+RENDER_PAGE_SIZE: int = setting("RENDER_PAGE_SIZE", 100)
+
+API_BASE_URL: str = setting(
+    "API_BASE_URL",
+    "https://economia.awesomeapi.com.br/json/last/USD-{currency}",
+)
+RATES_CACHE_TTL: int = setting("RATES_CACHE_TTL", 300)
+
+# Rates and the logged person are shared between the user's processes
+# through this SQLite file, see `dundie.utils.shared_cache`. Its
+# directory must be writable only by the user, empty disables it.
+# Waiting for another process' fetch gives up after
+# `SHARED_CACHE_LOCK_TIMEOUT` seconds.
+SHARED_CACHE_PATH: str = setting(
+    "SHARED_CACHE_PATH", os.path.join(_private_dir(), "cache.db")
+)
+SHARED_CACHE_LOCK_TIMEOUT: int = setting("SHARED_CACHE_LOCK_TIMEOUT", 30)
+PRINCIPAL_CACHE_TTL: int = setting("PRINCIPAL_CACHE_TTL", 60)
+
+# Results of `read` and `movements` kept per process, dropped after any
+# write to the SQLite file or after `QUERY_CACHE_TTL` seconds (on other
+# backends writes from other processes are only seen then). A size of 0
+# disables the cache.
+QUERY_CACHE_SIZE: int = setting("QUERY_CACHE_SIZE", 128)
+QUERY_CACHE_TTL: int = setting("QUERY_CACHE_TTL", RATES_CACHE_TTL)
+
+DAEMON_SOCKET: str = setting(
+    "SOCKET", os.path.join(_private_dir(), "daemon.sock")
+)
+
+ADMIN_EMAIL: str = setting("ADMIN_EMAIL", "michael@dundermifflin.com")
 KEYRING_SERVICE_NAME = "Dundie"
 KEYRING_USERNAME = "logged_user"
+
+check_config()
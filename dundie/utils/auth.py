@@ -1,37 +1,177 @@
+import asyncio
+import hashlib
+import os
 import keyring
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
+from typing import NamedTuple
 from sqlmodel import select
-from dundie.database import get_session
-from dundie.models import Person
+from dundie import database
+from dundie.database import (
+    get_async_session,
+    get_read_session,
+    get_session,
+)
+from dundie.utils.errors import AuthenticationError
+from dundie.models import APIToken, Person
 import click
-from dundie.settings import ADMIN_EMAIL, KEYRING_USERNAME, KEYRING_SERVICE_NAME
+from dundie.settings import (
+    ADMIN_EMAIL,
+    KEYRING_SERVICE_NAME,
+    KEYRING_USERNAME,
+    PRINCIPAL_CACHE_TTL,
+)
+from dundie.utils.log import get_logger
+from dundie.utils.shared_cache import shared_cache
+
+log = get_logger(__name__)
+
+
+# Set per request by servers that authenticate with API tokens, takes
+# precedence over the keyring.
+current_principal: ContextVar[str | None] = ContextVar(
+    "current_principal", default=None
+)
+
+# Listings, the only commands a person may run from a cached principal
+# and, besides the ones acting on themselves, the only ones non admins
+# may run.
+READ_COMMANDS = ["read", "movements", "stats", "search"]
+
+# Filled only when a long running process (e.g. `dundie serve`) opts in,
+# one-shot commands always read the keyring.
+_logged_cache: dict = {"enabled": False}
+
+
+def get_logged_email() -> str | None:
+    """Returns the email saved in the keyring by `dundie login`."""
+    principal = current_principal.get()
+    if principal is not None:
+        return principal
+
+    if _logged_cache["enabled"] and "email" in _logged_cache:
+        return _logged_cache["email"]
+
+    email = keyring.get_password(KEYRING_SERVICE_NAME, KEYRING_USERNAME)
+
+    if _logged_cache["enabled"]:
+        _logged_cache["email"] = email
+
+    return email
+
+
+def cache_logged_email(enabled: bool = True):
+    """Keeps the logged email in memory instead of reading the keyring."""
+    forget_logged_email()
+    _logged_cache["enabled"] = enabled
+
+
+def forget_logged_email():
+    """Drops the cached logged email after a login or logout."""
+    _logged_cache.pop("email", None)
+
+
+@contextmanager
+def principal(email: str):
+    """Runs `login_required` functions as `email` in this context."""
+    token = current_principal.set(email)
+    try:
+        yield
+    finally:
+        current_principal.reset(token)
+
+
+def hash_token(token: str) -> str:
+    """Returns the digest stored for an API token."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_token_person(token: str) -> Person | None:
+    """Returns the person owning an API token."""
+    sql = (
+        select(Person)
+        .join(APIToken, APIToken.person_id == Person.id)
+        .where(APIToken.token_hash == hash_token(token))
+    )
+    with get_session() as session:
+        return session.exec(sql).first()
+
+
+def database_key() -> str:
+    """Short digest naming the database in shared cache keys.
+
+    SQLite paths are made absolute so a relative URL used from different
+    directories does not mix two files.
+    """
+    url = database.engine.url
+    in_memory = url.database in (None, "", ":memory:")
+    if url.get_backend_name() == "sqlite" and not in_memory:
+        url = url.set(database=os.path.abspath(url.database))
+    rendered = url.render_as_string(hide_password=True)
+    return hashlib.sha256(rendered.encode()).hexdigest()[:16]
+
+
+def person_key(email: str) -> str:
+    return f"person:{database_key()}:{email}"
+
+
+def get_person(email: str, fresh: bool = False) -> Person | None:
+    """The person logged in as `email`.
+
+    Shared with the user's other processes using the same database for
+    `PRINCIPAL_CACHE_TTL` seconds, see `dundie.utils.shared_cache`.
+    `load` drops the entries. `fresh` reads the database, as commands
+    that write do: they never trust a role kept outside of it.
+    """
+
+    def lookup():
+        # The session is closed before calling the command so it does not
+        # hold two pooled connections while it writes. Reports on a
+        # snapshot look the user up there too, away from writers.
+        with get_read_session() as session:
+            sql = select(Person).where(Person.email == email)
+            person = session.exec(sql).first()
+        return None if person is None else person.model_dump()
+
+    if fresh:
+        data = lookup()
+    else:
+        data = shared_cache.get_or_fetch(
+            person_key(email), PRINCIPAL_CACHE_TTL, lookup
+        )
+        if data is not None and data.get("email") != email:
+            log.warning("Shared cache entry of %s is not theirs", email)
+            data = lookup()
+    return None if data is None else Person(**data)
+
+
+def forget_people():
+    """Drops the people of this database shared by `get_person`."""
+    shared_cache.delete_prefix(person_key(""))
 
 
 def login_required(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        logged = keyring.get_password(KEYRING_SERVICE_NAME, KEYRING_USERNAME)
+        logged = get_logged_email()
         if logged:
-            with get_session() as session:
-                sql = select(Person).where(Person.email == logged)
-                user = session.exec(sql).first()
-
-                if not user:
-                    click.secho(
-                        "User doesn't exists! Try login again", fg="red"
-                    )
-                    exit()
-
-                permission = get_permission(user, kwargs, func.__name__)
-
-                if not permission:
-                    click.secho(
-                        "You don't have permission to use this command",
-                        fg="red",
-                    )
-                    exit()
-
-                return func(*args, from_person=user, **kwargs)
+            user = get_person(logged, fresh=func.__name__ not in READ_COMMANDS)
+
+            if not user:
+                click.secho("User doesn't exists! Try login again", fg="red")
+                exit()
+
+            permission = get_permission(user, kwargs, func.__name__)
+
+            if not permission:
+                click.secho(
+                    "You don't have permission to use this command",
+                    fg="red",
+                )
+                exit()
+
+            return func(*args, from_person=user, **kwargs)
         else:
             click.secho(
                 "You need to be logged in to use this command!", fg="red"
@@ -41,38 +181,88 @@ def login_required(func):
     return wrapper
 
 
+def async_login_required(func):
+    """`login_required` for coroutines, raising `AuthenticationError`.
+
+    The keyring is read in a worker thread so the event loop keeps going.
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        logged = await asyncio.to_thread(get_logged_email)
+        if not logged:
+            raise AuthenticationError("You need to be logged in")
+
+        async with get_async_session() as session:
+            sql = select(Person).where(Person.email == logged)
+            user = (await session.exec(sql)).first()
+
+        if not user:
+            raise AuthenticationError("User doesn't exists")
+
+        if not get_permission(user, kwargs, func.__name__):
+            raise AuthenticationError("You don't have permission")
+
+        return await func(*args, from_person=user, **kwargs)
+
+    return wrapper
+
+
+class Scope(NamedTuple):
+    """Rows a principal may see, `None` fields are not restricted.
+
+    Admin sees everything, a manager its dept and anyone else itself.
+    """
+
+    dept: str | None = None
+    email: str | None = None
+
+
+def resolve_scope(person: Person) -> Scope:
+    """Computes the scope of `person` from its role, without queries."""
+    if person.email == ADMIN_EMAIL:
+        return Scope()
+    if person.role == "Manager":
+        return Scope(dept=person.dept)
+    return Scope(dept=person.dept, email=person.email)
+
+
+def scope_filters(scope: Scope) -> list:
+    """Turns a scope into SQL where clauses on `Person`."""
+    filters = []
+    if scope.dept is not None:
+        filters.append(Person.dept == scope.dept)
+    if scope.email is not None:
+        filters.append(Person.email == scope.email)
+    return filters
+
+
 def get_permission(
     from_person: Person, query: dict[str] = {}, command: str = None
 ):
-    person_email = from_person.email
-    person_role = from_person.role
-    person_dept = from_person.dept
-
-    query_dept = query.get("dept")
-    query_email = query.get("email")
+    """Tells whether `from_person` may run `command` with `query`.
 
-    admin_commands = ["load", "add"]
+    The admin may run everything, other people only the commands acting
+    on themselves and the listings, anything else is denied. Listings
+    are restricted to the person's scope inside their SQL, here only
+    filters that fall outside the scope are refused. A manager filtering
+    by an email of another dept gets an empty listing.
+    """
+    self_commands = ["transfer", "create_api_token"]
 
-    if person_email == ADMIN_EMAIL or command == "transfer":
+    if command in self_commands:
         return True
 
-    if (
-        query_dept
-        and (command not in admin_commands)
-        and (person_role == "Manager")
-        and (person_dept == query_dept)
-    ):
+    scope = resolve_scope(from_person)
+    if scope == Scope():
         return True
+    if command not in READ_COMMANDS:
+        return False
+
+    for field in Scope._fields:
+        allowed = getattr(scope, field)
+        requested = query.get(field)
+        if allowed is not None and requested not in (None, allowed):
+            return False
 
-    if query_email and command not in admin_commands:
-        if person_role == "Manager":
-            with get_session() as session:
-                user_dept = session.exec(
-                    select(Person.dept).where(Person.email == query_email)
-                ).first()
-            if user_dept == person_dept:
-                return True
-        if query_email == person_email:
-            return True
-
-    return False
+    return True
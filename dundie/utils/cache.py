@@ -0,0 +1,179 @@
+"""Per process cache of listing results.
+
+Entries are keyed by the function, the caller's scope and its filters
+plus a generation counter. Every ORM session that writes bumps the
+generation when it commits, so cached results never outlive a local
+write. On SQLite, commits of other processes are seen through `PRAGMA
+data_version` before serving a hit; other backends rely on
+`QUERY_CACHE_TTL` for them.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from dundie import database
+from dundie.database import using_snapshot
+from dundie.settings import QUERY_CACHE_SIZE, QUERY_CACHE_TTL
+from dundie.utils.auth import resolve_scope
+from dundie.utils.log import get_logger
+
+log = get_logger(__name__)
+
+_lock = threading.Lock()
+# key -> (expires at, result), most recently used last.
+_entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+_stats: Dict[str, int] = {"generation": 0, "hits": 0, "misses": 0}
+# Connection of our own to the SQLite file, only used for `data_version`.
+_watch: Dict[str, Any] = {"path": None, "connection": None, "version": None}
+
+
+def bump_generation():
+    """Invalidates every cached result."""
+    with _lock:
+        _stats["generation"] += 1
+        _entries.clear()
+
+
+def cache_info() -> Dict[str, int]:
+    """Returns hit/miss counts, current size and generation."""
+    with _lock:
+        return {**_stats, "size": len(_entries)}
+
+
+def clear_cache():
+    """Drops cached results and resets the counters."""
+    with _lock:
+        _entries.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def _forget_watch():
+    if _watch["connection"] is not None:
+        _watch["connection"].close()
+    _watch.update(path=None, connection=None, version=None)
+
+
+def _sqlite_file() -> str | None:
+    url = database.engine.url
+    if url.get_backend_name() != "sqlite" or url.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return None
+    return os.path.abspath(url.database)
+
+
+def _check_external_writes():
+    """Invalidates the cache when another connection committed.
+
+    `PRAGMA data_version` changes on a connection whenever any other
+    connection, of this process or not, commits to the file. Must be
+    called holding `_lock`.
+    """
+    path = _sqlite_file()
+    if path is None:
+        return
+
+    try:
+        if _watch["path"] != path:
+            # Another database, nothing cached so far applies to it.
+            _forget_watch()
+            _entries.clear()
+            connection = sqlite3.connect(
+                f"file:{path}?mode=ro", uri=True, check_same_thread=False
+            )
+            _watch.update(path=path, connection=connection)
+
+        (version,) = (
+            _watch["connection"].execute("PRAGMA data_version").fetchone()
+        )
+    except sqlite3.Error as e:
+        log.debug("Cannot watch %s for writes: %s", path, e)
+        _forget_watch()
+        return
+
+    if version != _watch["version"]:
+        if _watch["version"] is not None:
+            _stats["generation"] += 1
+            _entries.clear()
+        _watch["version"] = version
+
+
+def _drop_watch_after_fork():
+    # SQLite connections must not be used across a fork.
+    _watch.update(path=None, connection=None, version=None)
+
+
+os.register_at_fork(after_in_child=_drop_watch_after_fork)
+
+
+@event.listens_for(Session, "after_flush")
+def _flushed(session, flush_context):
+    session.info["dundie_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed(orm_execute_state):
+    # Bulk UPDATE/DELETE/INSERT statements do not go through the flush.
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["dundie_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session):
+    if session.info.pop("dundie_writes", False):
+        bump_generation()
+
+
+def cached_query(func):
+    """Caches the result of a `login_required` listing function.
+
+    Must be applied below `login_required`, which provides `from_person`.
+    """
+
+    @wraps(func)
+    def wrapper(from_person, limit=None, offset=0, **query: Any):
+        # Snapshots are read as they were taken, never from the cache.
+        if QUERY_CACHE_SIZE <= 0 or using_snapshot():
+            return func(from_person, limit, offset, **query)
+
+        filters = tuple(
+            sorted((k, v) for k, v in query.items() if v is not None)
+        )
+        # Callers with the same scope see the same rows, they share entries.
+        scope = resolve_scope(from_person)
+        key = (func.__name__, scope, limit, offset, filters)
+        now = time.monotonic()
+
+        with _lock:
+            _check_external_writes()
+            generation = _stats["generation"]
+            cached = _entries.get(key)
+            if cached and cached[0] > now:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                return list(cached[1])
+            _stats["misses"] += 1
+
+        result = func(from_person, limit, offset, **query)
+
+        with _lock:
+            # A commit while querying may have made the result stale.
+            if _stats["generation"] == generation:
+                _entries[key] = (now + QUERY_CACHE_TTL, tuple(result))
+                _entries.move_to_end(key)
+                while len(_entries) > QUERY_CACHE_SIZE:
+                    _entries.popitem(last=False)
+
+        return result
+
+    return wrapper
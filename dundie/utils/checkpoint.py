@@ -0,0 +1,152 @@
+"""Checkpoints, reject files and outboxes of long running loads.
+
+A checkpoint records how far a file was committed: the byte offset
+after the last committed row and that row number, plus the size and
+modification time of the file so a resume refuses a file that changed.
+It is written next to the file and replaced atomically, as is the
+outbox of the emails still to be delivered.
+"""
+
+import json
+import os
+from contextlib import suppress
+from csv import writer
+from typing import Iterator, List, NamedTuple, Sequence, Tuple
+
+from dundie.utils.errors import CheckpointError
+
+
+class Position(NamedTuple):
+    offset: int = 0
+    row: int = 0
+
+
+class Checkpoint:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.path = f"{filepath}.checkpoint"
+
+    def fingerprint(self) -> dict:
+        stat = os.stat(self.filepath)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def load(self) -> Position:
+        """Where the last run stopped, the start when there is no record."""
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return Position()
+
+        if data["file"] != self.fingerprint():
+            raise CheckpointError(
+                f"{self.filepath} changed since {self.path} was written, "
+                "load it again without resuming"
+            )
+
+        return Position(data["offset"], data["row"])
+
+    def save(self, position: Position):
+        partial = f"{self.path}.partial"
+        with open(partial, "w") as file:
+            json.dump({**position._asdict(), "file": self.fingerprint()}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(partial, self.path)
+
+    def clear(self):
+        with suppress(FileNotFoundError):
+            os.remove(self.path)
+
+
+def read_lines(
+    filepath: str, start: Position | None = None
+) -> Iterator[Tuple[Position, bytes]]:
+    """Yields the non blank lines after `start` with the position past them.
+
+    Lines are left undecoded, a row in another encoding is rejected by
+    the caller instead of stopping the file.
+    """
+    offset, row = start or Position()
+
+    with open(filepath, "rb") as file:
+        file.seek(offset)
+        for raw in file:
+            offset += len(raw)
+            row += 1
+            line = raw.strip()
+            if line:
+                yield Position(offset, row), line
+
+
+# row number, error, fields
+Reject = Tuple[int, Exception, List[str]]
+
+
+class RejectFile:
+    """CSV of the rows a load could not take, created on the first one.
+
+    Each line is the row number, the error and the row fields.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.count = 0
+        if not append:
+            with suppress(FileNotFoundError):
+                os.remove(path)
+
+    def write(self, rejects: Sequence[Reject]):
+        if not rejects:
+            return
+        with open(self.path, "a", newline="") as file:
+            writer(file).writerows(
+                [row, error, *fields] for row, error, fields in rejects
+            )
+        self.count += len(rejects)
+
+
+class Outbox:
+    """Emails a load could not deliver yet, one JSON message per line.
+
+    Messages are added before they are sent and removed once delivered,
+    so a crash or an SMTP outage leaves them for the next resume. Welcome
+    emails carry passwords, the file is only readable by its owner.
+    """
+
+    def __init__(self, filepath: str):
+        self.path = f"{filepath}.outbox"
+
+    def pending(self) -> List[tuple]:
+        try:
+            with open(self.path) as file:
+                return [tuple(json.loads(line)) for line in file]
+        except FileNotFoundError:
+            return []
+
+    def add(self, messages: Sequence[tuple]):
+        if messages:
+            self._write([*self.pending(), *messages])
+
+    def remove(self, messages: Sequence[tuple]):
+        """Drops delivered `messages`, the file goes with the last one."""
+        remaining = self.pending()
+        for message in messages:
+            with suppress(ValueError):
+                remaining.remove(tuple(message))
+        self._write(remaining)
+
+    def _write(self, messages: List[tuple]):
+        if not messages:
+            with suppress(FileNotFoundError):
+                os.remove(self.path)
+            return
+
+        partial = f"{self.path}.partial"
+        fd = os.open(partial, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        with open(fd, "w") as file:
+            for message in messages:
+                file.write(json.dumps(message) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(partial, self.path)
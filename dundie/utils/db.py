@@ -1,18 +1,26 @@
 from decimal import Decimal
 from typing import Optional, cast
 
-from sqlmodel import Session, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, update
 
 from dundie.database import get_session
 from dundie.models import Balance, InvalidEmailError, Movement, Person, User
 from dundie.settings import EMAIL_FROM
 from dundie.utils.email import check_valid_email, send_email
+from dundie.utils.log import get_logger
+from dundie.utils.user import generate_simple_password, hash_password
 
 session = get_session()
+log = get_logger(__name__)
 
 
 def add_person(
-    session: Session, instance: Person, password: str | None = None
+    session: Session,
+    instance: Person,
+    password: str | None = None,
+    outbox: list | None = None,
+    unhashed: list | None = None,
 ):
     """Saves person data to database.
 
@@ -20,6 +28,9 @@ def add_person(
     - If exists, update, else create
     - Set initial balance (managers = 100, others = 500)
     - Generate a password if user is new and send email
+    - When `outbox` is given the email is queued there instead of sent
+    - When `unhashed` is given (user, password) pairs are queued there and
+      the caller hashes them, see `hash_passwords`
     """
 
     if not check_valid_email(instance.email):
@@ -35,13 +46,16 @@ def add_person(
         session.add(instance)
         set_initial_balance(session, instance)
 
-        password = set_initial_password(session, instance, password)
+        password = set_initial_password(session, instance, password, unhashed)
 
-        # TODO: encrypt and send only link not raw password
+        # TODO: send only link not raw password
         # TODO: Usar sistema de filas (conteúdo extra)
-        send_email(
-            EMAIL_FROM, instance.email, "Your dundie password", password
-        )
+        subject = "Your dundie password"
+        message = (EMAIL_FROM, instance.email, subject, password)
+        if outbox is not None:
+            outbox.append(message)
+        else:
+            send_email(*message)
 
         return instance, created
     else:
@@ -57,15 +71,23 @@ def add_person(
 
 
 def set_initial_password(
-    session: Session, instance: Person, password: str | None = None
+    session: Session,
+    instance: Person,
+    password: str | None = None,
+    unhashed: list | None = None,
 ) -> str:
-    """Generated and saves password."""
+    """Generates a password and saves its hash, returns the password."""
+    if password is None:
+        password = generate_simple_password()
+
     user = User(person=instance)
-    if password is not None:
-        user.password = password
+    if unhashed is not None:
+        unhashed.append((user, password))
+    else:
+        user.password = hash_password(password)
 
     session.add(user)
-    return user.password
+    return password
 
 
 def set_initial_balance(session: Session, person: Person):
@@ -76,30 +98,79 @@ def set_initial_balance(session: Session, person: Person):
     add_movement(session, person, Decimal(value))
 
 
+# Dialects with INSERT ... ON CONFLICT DO UPDATE, others use the
+# portable UPDATE then INSERT path.
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def increment_balance_sql(dialect: str, person_id: int, value: Decimal):
+    """Returns the statement adding `value` to a balance.
+
+    On dialects without upsert support the returned UPDATE matches no row
+    for people without a balance yet, the caller then inserts it.
+    """
+    insert = UPSERT_DIALECTS.get(dialect)
+
+    if insert is None:
+        return (
+            update(Balance)
+            .where(Balance.person_id == person_id)
+            .values(value=Balance.value + value)
+        )
+
+    sql = insert(Balance).values(person_id=person_id, value=value)
+    return sql.on_conflict_do_update(
+        index_elements=[Balance.person_id],
+        set_={"value": Balance.value + sql.excluded.value},
+    )
+
+
 def add_movement(
     session: Session,
     person: Person,
     value: Decimal,
     actor: Optional[str] = "system",
 ):
-    """Adds movement to user account."""
+    """Adds movement to user account.
+
+    The balance is incremented in SQL instead of summing every movement.
+    """
 
     if not person.id:
-        movement = Movement(person=person, actor=actor, value=value)
-    else:
-        movement = Movement(person_id=person.id, actor=actor, value=value)
+        session.add(person)
+        session.flush()
 
-    session.add(movement)
+    session.add(Movement(person_id=person.id, actor=actor, value=value))
+    log.debug("Movement of %s to person %s by %s", value, person.id, actor)
 
-    movements = session.exec(select(Movement).where(Movement.person == person))
+    dialect = session.get_bind().dialect.name
+    result = session.exec(increment_balance_sql(dialect, person.id, value))
 
-    total = Decimal(sum([mov.value for mov in movements]))
+    if dialect not in UPSERT_DIALECTS and result.rowcount == 0:
+        session.add(Balance(person_id=person.id, value=value))
 
-    existing_balance = session.exec(
-        select(Balance).where(Balance.person == person)
-    ).first()
-    if existing_balance:
-        existing_balance.value = total
-        session.add(existing_balance)
-    else:
-        session.add(Balance(person=person, value=total))
+
+def withdraw_sql(person_id: int, value: Decimal):
+    """Returns the UPDATE debiting `value` when the balance covers it."""
+    return (
+        update(Balance)
+        .where(Balance.person_id == person_id, Balance.value >= value)
+        .values(value=Balance.value - value)
+    )
+
+
+def withdraw(
+    session: Session, person: Person, value: Decimal, actor: str
+) -> bool:
+    """Debits `value` only when the balance covers it.
+
+    The check and the debit are one conditional UPDATE, so concurrent
+    transfers cannot overdraw an account.
+    """
+    result = session.exec(withdraw_sql(person.id, value))
+
+    if result.rowcount == 0:
+        return False
+
+    session.add(Movement(person_id=person.id, actor=actor, value=-value))
+    return True
@@ -1,14 +1,26 @@
+import asyncio
 import re
 import smtplib
+import socket
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
+from typing import List, Sequence, Tuple
 
-from dundie.settings import SMTP_HOST, SMTP_PORT, SMTP_TIMEOUT
+from dundie.settings import (
+    EMAIL_BACKEND,
+    SMTP_CONCURRENCY,
+    SMTP_HOST,
+    SMTP_PORT,
+    SMTP_TIMEOUT,
+)
 from dundie.utils.log import get_logger
 
-log = get_logger()
+log = get_logger(__name__)
 
 regex = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
 
+Message = Tuple[str, str | List[str], str, str]
+
 
 def check_valid_email(address):
     """Return True if email is valid."""
@@ -16,20 +28,188 @@ def check_valid_email(address):
     return bool(re.fullmatch(regex, address))
 
 
-def send_email(from_, to, subject, text):
+def build_message(from_, to, subject, text) -> Tuple[List[str], str]:
+    """Returns the recipients list and the rendered message."""
     if not isinstance(to, list):
         to = [to]
 
+    message = MIMEText(text)
+
+    message["Subject"] = subject
+    message["From"] = from_
+    message["To"] = ",".join(to)
+
+    return to, message.as_string()
+
+
+def send_email(from_, to, subject, text):
+    to, message = build_message(from_, to, subject, text)
+
     try:
         with smtplib.SMTP(
             host=SMTP_HOST, port=SMTP_PORT, timeout=SMTP_TIMEOUT
         ) as server:
-            message = MIMEText(text)
+            server.sendmail(from_, to, message)
+    except OSError:
+        log.error("Cannot send email to %s", to)
 
-            message["Subject"] = subject
-            message["From"] = from_
-            message["To"] = ",".join(to)
 
-            server.sendmail(from_, to, message.as_string())
-    except Exception:
-        log.error("Cannot send email to %s", to)
+def send_bulk_email(
+    messages: Sequence[Message], failed: list | None = None
+) -> int:
+    """Delivers many messages using the configured `EMAIL_BACKEND`.
+
+    - `smtp` reuses a single blocking connection
+    - `async` keeps `SMTP_CONCURRENCY` connections busy on an event loop,
+      its own thread's when called from a running loop
+    - When `failed` is given the undelivered messages are appended to it
+    """
+    if not messages:
+        return 0
+
+    if EMAIL_BACKEND == "async":
+        send = send_emails_async(messages, failed=failed)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(send)
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, send).result()
+
+    return send_emails_blocking(messages, failed)
+
+
+def send_emails_blocking(
+    messages: Sequence[Message], failed: list | None = None
+) -> int:
+    """Sends messages one after another over one SMTP connection."""
+    delivered = set()
+
+    try:
+        with smtplib.SMTP(
+            host=SMTP_HOST, port=SMTP_PORT, timeout=SMTP_TIMEOUT
+        ) as server:
+            for index, (from_, to, subject, text) in enumerate(messages):
+                to, message = build_message(from_, to, subject, text)
+                try:
+                    server.sendmail(from_, to, message)
+                    delivered.add(index)
+                except smtplib.SMTPException:
+                    log.error("Cannot send email to %s", to)
+    except OSError:
+        log.error("Cannot connect to %s:%s", SMTP_HOST, SMTP_PORT)
+
+    if failed is not None:
+        failed.extend(
+            message
+            for index, message in enumerate(messages)
+            if index not in delivered
+        )
+
+    return len(delivered)
+
+
+class AsyncSMTP:
+    """Minimal asyncio SMTP client speaking plain ESMTP."""
+
+    def __init__(self, host=None, port=None, timeout=None):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.timeout = timeout or SMTP_TIMEOUT
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        await self.expect(220)
+        await self.command(f"EHLO {socket.getfqdn()}", 250)
+
+    async def expect(self, code: int) -> str:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise smtplib.SMTPServerDisconnected("Connection closed")
+
+            line = line.decode().rstrip("\r\n")
+            lines.append(line[4:])
+            if line[3:4] != "-":
+                break
+
+        if int(line[:3]) != code:
+            raise smtplib.SMTPResponseException(
+                int(line[:3]), "\n".join(lines)
+            )
+
+        return "\n".join(lines)
+
+    async def command(self, line: str, code: int) -> str:
+        self.writer.write(f"{line}\r\n".encode())
+        return await self.expect(code)
+
+    async def sendmail(self, from_: str, to: List[str], message: str):
+        await self.command(f"MAIL FROM:<{from_}>", 250)
+        for address in to:
+            await self.command(f"RCPT TO:<{address}>", 250)
+        await self.command("DATA", 354)
+
+        lines = message.replace("\r\n", "\n").split("\n")
+        data = "\r\n".join(
+            "." + line if line.startswith(".") else line for line in lines
+        )
+        self.writer.write(f"{data}\r\n.\r\n".encode())
+        await self.expect(250)
+
+    async def quit(self):
+        if self.writer is None:
+            return
+        try:
+            await self.command("QUIT", 221)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            log.debug("QUIT to %s:%s failed: %s", self.host, self.port, e)
+        self.writer.close()
+        self.writer = None
+
+
+async def send_emails_async(
+    messages: Sequence[Message],
+    concurrency: int = SMTP_CONCURRENCY,
+    failed: list | None = None,
+) -> int:
+    """Sends messages over a pool of `concurrency` SMTP connections.
+
+    The undelivered messages are appended to `failed` when given.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait(message)
+
+    async def worker() -> int:
+        sent = 0
+        client = AsyncSMTP()
+
+        while not queue.empty():
+            item = queue.get_nowait()
+            from_, to, subject, text = item
+            to, message = build_message(from_, to, subject, text)
+            try:
+                if client.writer is None:
+                    await client.connect()
+                await client.sendmail(from_, to, message)
+                sent += 1
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                log.error("Cannot send email to %s", to)
+                if failed is not None:
+                    failed.append(item)
+                await client.quit()
+
+        await client.quit()
+        return sent
+
+    workers = min(concurrency, len(messages))
+    results = await asyncio.gather(*[worker() for _ in range(workers)])
+
+    return sum(results)
@@ -12,3 +12,15 @@ class AuthenticationError(Exception):
 
 class InsufficientBalanceError(Exception):
     pass
+
+
+class ConfigError(Exception):
+    pass
+
+
+class IdempotencyKeyReused(Exception):
+    pass
+
+
+class CheckpointError(Exception):
+    pass
@@ -1,10 +1,13 @@
+import asyncio
+import time
 from decimal import Decimal
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import httpx
 from pydantic import BaseModel, Field
 
-from dundie.settings import API_BASE_URL
+from dundie.settings import API_BASE_URL, RATES_CACHE_TTL
+from dundie.utils.shared_cache import shared_cache
 
 
 class USDRate(BaseModel):
@@ -14,21 +17,117 @@ class USDRate(BaseModel):
     value: Decimal = Field(alias="high")
 
 
-def get_rates(currencies: List[str]) -> Dict[str, USDRate]:
-    """Gets current rate for USD vs Currency"""
-    return_data = {}
+# currency -> (expires at, rate), only successful fetches are kept.
+_rates_cache: Dict[str, Tuple[float, USDRate]] = {}
+
+
+def rate_key(currency: str) -> str:
+    return f"rate:{currency}"
+
+
+def fetch_rates(keys: List[str]) -> Dict[str, dict]:
+    """Fetches the rates of `rate_key` keys, failed ones are left out."""
+    fetched = {}
+    for key in keys:
+        currency = key.removeprefix("rate:")
+        response = httpx.get(API_BASE_URL.format(currency=currency))
+        if response.status_code == 200:
+            fetched[key] = response.json()["USD" + str(currency)]
+    return fetched
+
+
+async def fetch_rates_async(keys: List[str]) -> Dict[str, dict]:
+    """Same as `fetch_rates`, with the requests made concurrently."""
+    currencies = [key.removeprefix("rate:") for key in keys]
+
+    async with httpx.AsyncClient() as client:
+        responses = await asyncio.gather(
+            *[
+                client.get(API_BASE_URL.format(currency=currency))
+                for currency in currencies
+            ]
+        )
+
+    return {
+        rate_key(currency): response.json()["USD" + str(currency)]
+        for currency, response in zip(currencies, responses)
+        if response.status_code == 200
+    }
+
+
+def cached_rates(
+    currencies: List[str],
+) -> Tuple[Dict[str, USDRate], List[str]]:
+    """Rates known by this process and the currencies still missing."""
+    found = {}
+    missing = []
+    now = time.monotonic()
 
     for currency in currencies:
+        cached = _rates_cache.get(currency)
+
         if currency == "USD":
-            return_data[currency] = USDRate(high=Decimal(1))
+            found[currency] = USDRate(high=Decimal(1))
+        elif cached and cached[0] > now:
+            found[currency] = cached[1]
+        else:
+            missing.append(currency)
+
+    return found, missing
+
+
+def keep_rates(currencies: List[str], fetched: Dict[str, dict]):
+    """Builds the rates of `currencies` from fetched data, keeping them.
+
+    Currencies that could not be fetched get a zero `api/error` rate.
+    """
+    rates = {}
+    expires = time.monotonic() + RATES_CACHE_TTL
+
+    for currency in currencies:
+        data = fetched.get(rate_key(currency))
+        if data is None:
+            rates[currency] = USDRate(name="api/error", high=Decimal(0))
         else:
-            response = httpx.get(API_BASE_URL.format(currency=currency))
-            if response.status_code == 200:
-                data = response.json()["USD" + str(currency)]
-                return_data[currency] = USDRate(**data)
-            else:
-                return_data[currency] = USDRate(
-                    name="api/error", high=Decimal(0)
-                )
-
-    return return_data
+            rates[currency] = USDRate(**data)
+            _rates_cache[currency] = (expires, rates[currency])
+
+    return rates
+
+
+def get_rates(currencies: List[str]) -> Dict[str, USDRate]:
+    """Gets current rate for USD vs Currency
+
+    Fetched rates are reused for `RATES_CACHE_TTL` seconds, in this
+    process and by the user's other processes through `shared_cache`,
+    which lets a single process fetch a rate missing everywhere.
+    """
+    rates, missing = cached_rates(currencies)
+
+    if missing:
+        fetched = shared_cache.fetch_many(
+            [rate_key(currency) for currency in missing],
+            RATES_CACHE_TTL,
+            fetch_rates,
+        )
+        rates.update(keep_rates(missing, fetched))
+
+    return rates
+
+
+async def get_rates_async(currencies: List[str]) -> Dict[str, USDRate]:
+    """Same as `get_rates`, fetching the missing rates concurrently."""
+    rates, missing = cached_rates(currencies)
+
+    if missing:
+        # The shared cache is blocking, it runs in a worker thread and
+        # fetches there on a loop of its own.
+        fetched = await asyncio.to_thread(
+            shared_cache.fetch_many,
+            [rate_key(currency) for currency in missing],
+            RATES_CACHE_TTL,
+            lambda keys: asyncio.run(fetch_rates_async(keys)),
+        )
+        rates.update(keep_rates(missing, fetched))
+
+    return rates
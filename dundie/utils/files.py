@@ -0,0 +1,28 @@
+"""Files and directories private to the user running dundie."""
+
+import os
+import stat
+
+
+def owned(info: os.stat_result) -> bool:
+    """Tells whether the running user owns the file of `info`."""
+    return info.st_uid == os.getuid()
+
+
+def private_dir(path: str) -> str:
+    """Creates `path` with mode 0700 when missing and returns it.
+
+    An existing one must be a directory of the running user that nobody
+    else can write to, or the files dundie keeps there could be planted.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or not owned(info)
+        or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    ):
+        raise PermissionError(
+            f"{path} must be a directory writable only by you"
+        )
+    return path
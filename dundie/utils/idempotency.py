@@ -0,0 +1,119 @@
+"""Deduplicates retried writes with client supplied keys.
+
+The key is looked up and saved in the transaction of the write itself,
+through the unique (person_id, key) index, so a retry either finds the
+committed result or runs the write for the first time, never twice. A
+key reused for another command or other arguments is refused.
+"""
+
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, select
+
+from dundie.database import get_session
+from dundie.models import IdempotencyKey
+from dundie.settings import IDEMPOTENCY_PURGE_INTERVAL, IDEMPOTENCY_TTL
+from dundie.utils.errors import IdempotencyKeyReused
+from dundie.utils.writer import Operation, run_write
+
+_last_purge: Dict[str, float] = {"at": float("-inf")}
+
+
+def fingerprint(arguments: Dict[str, Any]) -> str:
+    """Digest of the arguments of a write."""
+    data = json.dumps(arguments, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def find_result(
+    session: Session,
+    person_id: int,
+    key: str,
+    command: str,
+    arguments: str = "",
+):
+    """Returns (found, result) of a key, O(1) through its unique index."""
+    sql = select(
+        IdempotencyKey.command,
+        IdempotencyKey.fingerprint,
+        IdempotencyKey.result,
+    ).where(IdempotencyKey.person_id == person_id, IdempotencyKey.key == key)
+    stored = session.exec(sql).first()
+    if stored is None:
+        return False, None
+    if stored.command != command:
+        raise IdempotencyKeyReused(
+            f"Idempotency key {key!r} was used for {stored.command!r}"
+        )
+    # Keys saved before fingerprints existed have none.
+    if stored.fingerprint and stored.fingerprint != arguments:
+        raise IdempotencyKeyReused(
+            f"Idempotency key {key!r} was used with other arguments"
+        )
+    return True, json.loads(stored.result)
+
+
+def expire_keys(session: Session, now: datetime | None = None) -> int:
+    """Deletes keys older than `IDEMPOTENCY_TTL` in one statement."""
+    cutoff = (now or datetime.now()) - timedelta(seconds=IDEMPOTENCY_TTL)
+    result = session.exec(
+        delete(IdempotencyKey).where(IdempotencyKey.created < cutoff)
+    )
+    return result.rowcount
+
+
+def run_idempotent(
+    op: Operation,
+    person_id: int,
+    key: str | None,
+    command: str,
+    arguments: Dict[str, Any] | None = None,
+) -> Any:
+    """`run_write(op)` that runs at most once per `key` and person.
+
+    `arguments` are what `op` was built from, a retry with the same key
+    and other arguments raises `IdempotencyKeyReused`.
+    """
+    if key is None:
+        return run_write(op)
+
+    digest = fingerprint(arguments or {})
+
+    def once(session: Session):
+        found, result = find_result(session, person_id, key, command, digest)
+        if found:
+            return result
+
+        now = time.monotonic()
+        if now - _last_purge["at"] > IDEMPOTENCY_PURGE_INTERVAL:
+            _last_purge["at"] = now
+            expire_keys(session)
+
+        result = op(session)
+        session.add(
+            IdempotencyKey(
+                person_id=person_id,
+                key=key,
+                command=command,
+                fingerprint=digest,
+                result=json.dumps(result),
+            )
+        )
+        return result
+
+    try:
+        return run_write(once)
+    except IntegrityError:
+        # A concurrent attempt with the same key committed first.
+        with get_session() as session:
+            found, result = find_result(
+                session, person_id, key, command, digest
+            )
+        if not found:
+            raise
+        return result
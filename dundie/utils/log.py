@@ -1,24 +1,117 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
+from datetime import datetime, timezone
 from logging import handlers
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+from dundie.settings import LOG_FILE, LOG_FORMAT, LOG_LEVEL, LOG_LEVELS
+
 log = logging.getLogger("dundie")
 fmt = logging.Formatter(
     "%(asctime)s %(name)s %(levelname)s l:%(lineno)d f:%(filename)s:\
     %(message)s"
 )
 
+_lock = threading.Lock()
+_listener: handlers.QueueListener | None = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data)
+
+
+class DeferredQueueHandler(handlers.QueueHandler):
+    """Queues records, leaving the formatting to the listener thread.
+
+    Only the message arguments are merged in the caller, so mutable
+    arguments are captured as they were when logging.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = fmt.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> dict:
+    """Parses "api=INFO,utils.email=DEBUG" into logger name -> level."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[f"dundie.{name.strip()}"] = level.strip().upper()
+    return levels
+
+
+def configure_logging(
+    logfile: str = LOG_FILE,
+    level: str = LOG_LEVEL,
+    log_format: str = LOG_FORMAT,
+    levels: str = LOG_LEVELS,
+) -> handlers.QueueListener:
+    """Sets up the `dundie` loggers once, later calls are no-ops.
+
+    Records go through a queue to a listener thread that owns the
+    rotating file handler, so logging never waits on disk.
+    """
+    global _listener
+
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        file_handler = handlers.RotatingFileHandler(
+            logfile, maxBytes=10**6, backupCount=10, delay=True
+        )
+        file_handler.setFormatter(
+            JSONFormatter() if log_format == "json" else fmt
+        )
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        log.addHandler(DeferredQueueHandler(records))
+        log.setLevel(level.upper())
+        for name, subsystem_level in parse_levels(levels).items():
+            logging.getLogger(name).setLevel(subsystem_level)
+
+        _listener = handlers.QueueListener(records, file_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        return _listener
+
+
+def _restart_listener():
+    # Forked children (e.g. the benchmarks' servers) inherit no threads.
+    if _listener is not None:
+        _listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_listener)
 
-def get_logger(logfile="dundie.log"):
-    """Returns a configured logger."""
-    fh = handlers.RotatingFileHandler(
-        logfile,
-        maxBytes=10**6,
-        backupCount=10,
-    )
-    fh.setLevel(LOG_LEVEL)
-    fh.setFormatter(fmt)
-    log.addHandler(fh)
 
-    return log
+def get_logger(name: str = "dundie") -> logging.Logger:
+    """Returns a configured logger, use the module `__name__`."""
+    configure_logging()
+    return logging.getLogger(name)
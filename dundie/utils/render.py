@@ -0,0 +1,135 @@
+"""Table rendering for the listing commands.
+
+- `rich` lays out a single Rich table, measuring every cell
+- `pager` renders Rich tables one page at a time through the pager
+- `fixed` streams fixed width columns sized from the first page
+- `tsv` streams tab separated values, ideal when piping to other tools
+- `auto` picks `tsv` when piped, `pager` for large outputs on a terminal
+  and `rich` otherwise
+"""
+
+import io
+import shutil
+import sys
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Sequence
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from dundie.records import format_field
+from dundie.settings import RENDER_PAGE_SIZE, RENDER_ROW_THRESHOLD
+
+FORMATS = ["auto", "rich", "pager", "fixed", "tsv"]
+MAX_FIXED_WIDTH = 40
+# `dundie serve` renders for a remote terminal and cannot spawn a pager,
+# large interactive outputs fall back to `fixed` when this is disabled.
+PAGER_ENABLED = True
+
+Row = Sequence[Any]
+
+
+def choose_format(fmt: str, size: int) -> str:
+    """Resolves `auto` to a concrete format."""
+    if fmt != "auto":
+        return fmt
+    if not sys.stdout.isatty():
+        return "tsv"
+    if size > RENDER_ROW_THRESHOLD:
+        return "pager" if PAGER_ENABLED else "fixed"
+    return "rich"
+
+
+def render(
+    title: str, headers: List[str], rows: Sequence[Row], fmt: str = "auto"
+):
+    """Writes `rows` to stdout using the requested format.
+
+    Cells are formatted lazily, so streaming formats start writing
+    before the whole result has been converted to text.
+    """
+    fmt = choose_format(fmt, len(rows))
+
+    if fmt == "tsv":
+        write_lines(tsv_lines(headers, rows))
+    elif fmt == "fixed":
+        write_lines(fixed_lines(headers, rows))
+    elif fmt == "pager" and PAGER_ENABLED:
+        click.echo_via_pager(rich_pages(title, headers, rows), color=True)
+    else:
+        Console().print(build_table(title, headers, rows))
+
+
+def write_lines(lines: Iterable[str]):
+    """Streams lines to stdout one page at a time."""
+    out = sys.stdout
+    lines = iter(lines)
+    while page := list(islice(lines, RENDER_PAGE_SIZE)):
+        out.write("".join(page))
+        out.flush()
+
+
+def build_table(title: str | None, headers: List[str], rows: Iterable[Row]):
+    table = Table(title=title)
+
+    for header in headers:
+        table.add_column(header, style="magenta")
+
+    for row in rows:
+        table.add_row(*cells(row))
+
+    return table
+
+
+def cells(row: Row) -> List[str]:
+    return [format_field(value) for value in row]
+
+
+def clean(value: str) -> str:
+    return value.replace("\t", " ").replace("\n", " ")
+
+
+def tsv_lines(headers: List[str], rows: Iterable[Row]) -> Iterator[str]:
+    yield "\t".join(headers) + "\n"
+    for row in rows:
+        yield "\t".join(clean(value) for value in cells(row)) + "\n"
+
+
+def fixed_lines(headers: List[str], rows: Sequence[Row]) -> Iterator[str]:
+    sample = [cells(row) for row in rows[:RENDER_PAGE_SIZE]]
+    widths = [
+        min(
+            max([len(header)] + [len(row[i]) for row in sample]),
+            MAX_FIXED_WIDTH,
+        )
+        for i, header in enumerate(headers)
+    ]
+
+    def line(values: Row) -> str:
+        parts = []
+        for value, width in zip(values, widths):
+            value = clean(value)
+            if len(value) > width:
+                value = value[: width - 1] + "…"
+            parts.append(value.ljust(width))
+        return "  ".join(parts).rstrip() + "\n"
+
+    yield line(headers)
+    yield "  ".join("-" * width for width in widths) + "\n"
+    for row in rows:
+        yield line(cells(row))
+
+
+def rich_pages(
+    title: str, headers: List[str], rows: Sequence[Row]
+) -> Iterator[str]:
+    """Renders one Rich table per page, lazily as the pager reads."""
+    width = shutil.get_terminal_size().columns
+
+    for start in range(0, len(rows), RENDER_PAGE_SIZE):
+        buffer = io.StringIO()
+        console = Console(file=buffer, force_terminal=True, width=width)
+        page = rows[start : start + RENDER_PAGE_SIZE]
+        console.print(build_table(title if not start else None, headers, page))
+        yield buffer.getvalue()
@@ -0,0 +1,55 @@
+"""Set-based application of recurring grant rules."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Numeric, String, literal
+from sqlmodel import Session, insert, select, update
+
+from dundie.models import Balance, GrantRule, Movement, Person
+
+PERIODS = ("daily", "weekly", "monthly")
+
+
+def period_key(period: str, now: datetime) -> str:
+    """Names the period `now` falls in, e.g. 2026-10 for monthly."""
+    if period == "daily":
+        return now.strftime("%Y-%m-%d")
+    if period == "weekly":
+        year, week, _ = now.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "monthly":
+        return now.strftime("%Y-%m")
+    raise ValueError(f"Unknown period {period!r}, use one of {PERIODS}")
+
+
+def apply_rule(session: Session, rule: GrantRule, now: datetime) -> int:
+    """Credits every person matched by `rule` with two statements.
+
+    Movements are inserted from a SELECT and balances incremented by a
+    single UPDATE, whatever the number of people. Returns that number.
+    """
+    people = select(Person.id)
+    if rule.dept is not None:
+        people = people.where(Person.dept == rule.dept)
+
+    value = Decimal(rule.value)
+
+    session.exec(
+        insert(Movement).from_select(
+            ["person_id", "actor", "value", "date"],
+            select(
+                Person.id,
+                literal(rule.actor, String),
+                literal(value, Numeric),
+                literal(now, DateTime),
+            ).where(Person.id.in_(people)),
+        )
+    )
+    result = session.exec(
+        update(Balance)
+        .where(Balance.person_id.in_(people))
+        .values(value=Balance.value + value)
+    )
+
+    return result.rowcount
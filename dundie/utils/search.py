@@ -0,0 +1,112 @@
+"""Full-text search over people.
+
+On SQLite people are indexed by the `person_search` FTS5 table declared
+in `dundie.models`, matched by prefix and ranked by bm25. Other backends
+fall back to case insensitive substring filters ordered by person.
+"""
+
+from sqlalchemy import column, literal, literal_column, or_, table, text
+from sqlmodel import Session, func, select
+
+from dundie.models import PERSON_SEARCH_DDL, Balance, Movement, Person
+
+person_search = table("person_search", column("rowid"), column("rank"))
+
+SEARCH_COLUMNS = (Person.name, Person.email, Person.dept, Person.role)
+
+
+def search_words(term: str) -> list:
+    """The words of `term` to match, quotes are not part of any."""
+    return term.replace('"', " ").split()
+
+
+def match_expression(term: str) -> str:
+    """Turns user input into an FTS5 query matching every word prefix.
+
+    Words are quoted so FTS5 operators and punctuation in the input are
+    searched literally, `jim sal` becomes `"jim"* "sal"*`. A term without
+    `search_words` gives an empty query that FTS5 refuses.
+    """
+    return " ".join(f'"{word}"*' for word in search_words(term))
+
+
+def search_sql(
+    term: str,
+    filters: list,
+    limit: int | None = None,
+    offset: int = 0,
+    dialect: str = "sqlite",
+):
+    """Builds a listing with the columns of `read_sql` for `term`.
+
+    The page of matching people is selected first, balances and the last
+    movement are only looked up for the people on that page.
+    """
+    if dialect == "sqlite":
+        matches = (
+            select(Person.id, person_search.c.rank)
+            .join(person_search, person_search.c.rowid == Person.id)
+            .where(
+                literal_column("person_search").op("MATCH")(
+                    match_expression(term)
+                ),
+                *filters,
+            )
+            .order_by(person_search.c.rank, Person.id)
+        )
+    else:
+        words = [
+            or_(*[field.ilike(f"%{word}%") for field in SEARCH_COLUMNS])
+            for word in search_words(term)
+        ]
+        matches = (
+            select(Person.id, literal(0).label("rank"))
+            .where(*words, *filters)
+            .order_by(Person.id)
+        )
+
+    if limit is not None:
+        matches = matches.limit(limit).offset(offset)
+    matches = matches.subquery()
+
+    last_movement = (
+        select(func.max(Movement.date))
+        .where(Movement.person_id == Person.id)
+        .scalar_subquery()
+    )
+
+    return (
+        select(
+            Person.email,
+            Balance.value,
+            last_movement,
+            Person.name,
+            Person.dept,
+            Person.role,
+            Person.currency,
+        )
+        .join(matches, matches.c.id == Person.id)
+        .join(Balance, Balance.person_id == Person.id)
+        .order_by(matches.c.rank, Person.id)
+    )
+
+
+def rebuild_index(session: Session) -> int:
+    """Recreates the index from the person table, returns rows indexed.
+
+    Also creates the table and its triggers on databases that predate
+    them. Nothing to rebuild outside SQLite.
+    """
+    if session.bind.dialect.name != "sqlite":
+        return 0
+
+    for statement in PERSON_SEARCH_DDL:
+        session.exec(text(statement))
+    session.exec(
+        text("INSERT INTO person_search(person_search) VALUES ('rebuild')")
+    )
+    session.exec(
+        text("INSERT INTO person_search(person_search) VALUES ('optimize')")
+    )
+
+    return session.exec(text("SELECT count(*) FROM person")).one()[0]
@@ -0,0 +1,187 @@
+"""Cache shared by every dundie process of a user.
+
+A small SQLite file (`SHARED_CACHE_PATH`) keeps JSON values with an
+expiry, so parallel commands reuse exchange rates and the logged person
+instead of each fetching them. Misses are filled under the SQLite write
+lock (`BEGIN IMMEDIATE`): the first process fetches while the others
+wait for the lock, find the fresh value and return it, so N concurrent
+misses trigger one upstream call.
+
+An empty `SHARED_CACHE_PATH` disables it, values are then fetched every
+time by the callers' own caches. So does a file that cannot be used: one
+owned by another user or in a directory others can write to, a corrupt
+one or a lock held past `SHARED_CACHE_LOCK_TIMEOUT`.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import suppress
+from typing import Any, Callable, Dict, List
+
+from dundie.settings import SHARED_CACHE_LOCK_TIMEOUT, SHARED_CACHE_PATH
+from dundie.utils.files import owned, private_dir
+from dundie.utils.log import get_logger
+
+log = get_logger(__name__)
+
+Fetch = Callable[[List[str]], Dict[str, Any]]
+# Failures of the cache itself, the callers then go without it.
+CACHE_ERRORS = (sqlite3.Error, OSError)
+
+
+class SharedCache:
+    def __init__(self, path: str, lock_timeout: float = 30):
+        self.path = path
+        self.lock_timeout = lock_timeout
+        self._local = threading.local()
+        os.register_at_fork(after_in_child=self._forget_connections)
+
+    def _forget_connections(self):
+        # SQLite connections must not be used across a fork.
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            private_dir(os.path.dirname(os.path.abspath(self.path)))
+            fd = os.open(
+                self.path, os.O_CREAT | os.O_RDWR | os.O_NOFOLLOW, 0o600
+            )
+            try:
+                if not owned(os.fstat(fd)):
+                    raise PermissionError(f"{self.path} is not yours")
+            finally:
+                os.close(fd)
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.lock_timeout,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entry ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def _select(self, connection, keys: List[str]) -> Dict[str, Any]:
+        placeholders = ",".join("?" * len(keys))
+        rows = connection.execute(
+            f"SELECT key, value FROM entry WHERE key IN ({placeholders}) "
+            "AND expires > ?",
+            [*keys, time.time()],
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    def _unavailable(self, error: Exception):
+        log.warning("Shared cache %s unavailable: %s", self.path, error)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Values of the `keys` that are cached and not expired."""
+        if not self.path or not keys:
+            return {}
+        try:
+            return self._select(self.connect(), keys)
+        except CACHE_ERRORS as e:
+            self._unavailable(e)
+            return {}
+
+    def fetch_many(
+        self, keys: List[str], ttl: float, fetch: Fetch
+    ) -> Dict[str, Any]:
+        """Cached values of `keys`, the missing ones filled by `fetch`.
+
+        `fetch` receives the missing keys and returns the values to
+        cache, keys it leaves out are not cached and missing from the
+        result. Only one process at a time runs `fetch`.
+        """
+        if not self.path:
+            return fetch(keys) if keys else {}
+
+        found = self.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if not missing:
+            return found
+
+        try:
+            connection = self.connect()
+            connection.execute("BEGIN IMMEDIATE")
+        except CACHE_ERRORS as e:
+            self._unavailable(e)
+            return {**found, **fetch(missing)}
+
+        fetched = None
+        fetching = False
+        try:
+            # Another process may have filled them while we waited.
+            found.update(self._select(connection, missing))
+            missing = [key for key in missing if key not in found]
+            if missing:
+                log.debug("Shared cache fetching %s", missing)
+                fetching = True
+                fetched = fetch(missing)
+                fetching = False
+                self._store(connection, fetched, ttl)
+                found.update(fetched)
+            connection.execute("COMMIT")
+        except CACHE_ERRORS as e:
+            self._rollback(connection)
+            if fetching:
+                raise
+            self._unavailable(e)
+            if fetched is None:
+                fetched = fetch(missing)
+            found.update(fetched)
+        except BaseException:
+            self._rollback(connection)
+            raise
+
+        return found
+
+    def _rollback(self, connection):
+        if connection.in_transaction:
+            with suppress(sqlite3.Error):
+                connection.execute("ROLLBACK")
+
+    def get_or_fetch(
+        self, key: str, ttl: float, fetch: Callable[[], Any]
+    ) -> Any:
+        """Single key `fetch_many`, `fetch` returning None is not cached."""
+
+        def fetch_one(keys):
+            value = fetch()
+            return {} if value is None else {key: value}
+
+        return self.fetch_many([key], ttl, fetch_one).get(key)
+
+    def _store(self, connection, values: Dict[str, Any], ttl: float):
+        now = time.time()
+        connection.execute("DELETE FROM entry WHERE expires <= ?", [now])
+        connection.executemany(
+            "INSERT OR REPLACE INTO entry (key, value, expires) "
+            "VALUES (?, ?, ?)",
+            [
+                (key, json.dumps(value), now + ttl)
+                for key, value in values.items()
+            ],
+        )
+
+    def delete_prefix(self, prefix: str):
+        """Drops every entry whose key starts with `prefix`."""
+        if not self.path:
+            return
+        try:
+            self.connect().execute(
+                "DELETE FROM entry WHERE substr(key, 1, ?) = ?",
+                [len(prefix), prefix],
+            )
+        except CACHE_ERRORS as e:
+            self._unavailable(e)
+
+
+shared_cache = SharedCache(SHARED_CACHE_PATH, SHARED_CACHE_LOCK_TIMEOUT)
@@ -0,0 +1,103 @@
+"""Read-only snapshots of the SQLite database for reports.
+
+The live database is copied with the SQLite backup API, which reads a
+consistent state in one step, into a temporary file renamed over the
+snapshot. Readers of a previous snapshot keep their file, the rename is
+atomic. The copy is opened with `immutable=1`, so SQLite takes no locks
+and never checks for changes, and mmap'ed, so pages are read straight
+from the page cache.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import create_engine
+
+from dundie import database
+from dundie.settings import (
+    SNAPSHOT_MAX_AGE,
+    SNAPSHOT_MMAP_SIZE,
+    SNAPSHOT_PATH,
+)
+from dundie.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+def database_file() -> str:
+    """Path of the live SQLite database file."""
+    url = database.engine.url
+    if url.get_backend_name() != "sqlite" or url.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        raise RuntimeError("Snapshots need a SQLite database file")
+    return os.path.abspath(url.database)
+
+
+def take_snapshot(path: str | None = None) -> str:
+    """Copies the live database to `path`, returns the snapshot path."""
+    source_path = database_file()
+    path = path or SNAPSHOT_PATH or f"{source_path}.snapshot"
+    partial = f"{path}.{os.getpid()}.partial"
+
+    start = time.perf_counter()
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    target = sqlite3.connect(partial)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+    os.replace(partial, path)
+    log.info("Snapshot %s taken in %.3fs", path, time.perf_counter() - start)
+    return path
+
+
+def fresh_snapshot(path: str | None = None) -> str:
+    """Returns a snapshot younger than `SNAPSHOT_MAX_AGE`, taking one."""
+    path = path or SNAPSHOT_PATH or f"{database_file()}.snapshot"
+
+    try:
+        age = time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
+        age = None
+
+    if age is None or age >= SNAPSHOT_MAX_AGE:
+        take_snapshot(path)
+
+    return path
+
+
+def snapshot_engine(path: str) -> Engine:
+    """Read-only engine over a snapshot file."""
+    path = os.path.abspath(path)
+    engine = create_engine(
+        f"sqlite:///file:{path}?mode=ro&immutable=1&uri=true"
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_mmap_size(connection, record):
+        connection.execute(f"PRAGMA mmap_size = {SNAPSHOT_MMAP_SIZE}")
+
+    return engine
+
+
+@contextmanager
+def snapshot(path: str | None = None):
+    """Runs the reports in the block on a snapshot of the database.
+
+    Writes keep going to the live database.
+    """
+    engine = snapshot_engine(fresh_snapshot(path))
+    try:
+        with database.use_snapshot(engine):
+            yield engine
+    finally:
+        engine.dispose()
@@ -1,5 +1,16 @@
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ProcessPoolExecutor
 from random import sample
 from string import ascii_letters, digits
+from typing import List
+
+from dundie.settings import PASSWORD_HASH_COST, PASSWORD_POOL_THRESHOLD
+
+SCRYPT_R = 8
+SCRYPT_P = 1
 
 
 def generate_simple_password(size=8):
@@ -8,3 +19,61 @@ def generate_simple_password(size=8):
     """
     password = sample(ascii_letters + digits, size)
     return "".join(password)
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * n * r,
+        dklen=32,
+    )
+
+
+def hash_password(password: str, cost: int | None = None) -> str:
+    """Hashes a password with scrypt.
+
+    Returns `scrypt$n$r$p$salt$hash`, salt and hash base64 encoded.
+    """
+    n = 2 ** (PASSWORD_HASH_COST if cost is None else cost)
+    salt = os.urandom(16)
+    digest = _scrypt(password, salt, n, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hashes many passwords, in a process pool for large batches."""
+    if len(passwords) < PASSWORD_POOL_THRESHOLD:
+        return [hash_password(password) for password in passwords]
+
+    with ProcessPoolExecutor() as pool:
+        chunksize = max(len(passwords) // (4 * (os.cpu_count() or 1)), 1)
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Checks a password against a `hash_password` result."""
+    try:
+        scheme, n, r, p, salt, digest = stored.split("$")
+    except ValueError:
+        return False
+    if scheme != "scrypt":
+        return False
+
+    computed = _scrypt(
+        password, base64.b64decode(salt), int(n), int(r), int(p)
+    )
+    return hmac.compare_digest(computed, base64.b64decode(digest))
+
+
+def needs_rehash(stored: str) -> bool:
+    """Tells whether a hash was made with another cost setting."""
+    parts = stored.split("$")
+    return len(parts) != 6 or parts[1] != str(2**PASSWORD_HASH_COST)
@@ -0,0 +1,153 @@
+"""Group commit of the writes made by concurrent callers.
+
+`run_write(op)` runs `op(session)` and commits it. When a long running
+server starts the writer with `start_writer()`, operations from every
+thread are queued to a single writer thread that runs them in batches
+and commits each batch once, so N concurrent `add`/`transfer` calls cost
+one transaction instead of N. Callers block until the batch holding
+their operation is committed and get its result or exception back.
+
+If an operation fails the batch is rolled back and its operations are
+replayed one transaction each, so a failure only reaches its own caller.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+from sqlmodel import Session
+
+from dundie.database import get_session
+from dundie.settings import GROUP_COMMIT_BATCH_SIZE, GROUP_COMMIT_MAX_DELAY
+from dundie.utils.log import get_logger
+
+log = get_logger(__name__)
+
+Operation = Callable[[Session], Any]
+Job = Tuple[Operation, Future]
+
+
+def run_in_transaction(op: Operation) -> Any:
+    """Runs `op` in its own session and commits it."""
+    with get_session() as session:
+        result = op(session)
+        session.commit()
+        return result
+
+
+class GroupCommitWriter:
+    """Single thread committing queued operations in batches."""
+
+    def __init__(
+        self,
+        batch_size: int = GROUP_COMMIT_BATCH_SIZE,
+        max_delay: float = GROUP_COMMIT_MAX_DELAY,
+    ):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.jobs: queue.Queue[Job | None] = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.run, name="dundie-writer", daemon=True
+        )
+        self.batches = 0
+        self.operations = 0
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Commits what is queued and stops the thread."""
+        self.jobs.put(None)
+        self.thread.join()
+
+    def submit(self, op: Operation) -> Future:
+        future: Future = Future()
+        self.jobs.put((op, future))
+        return future
+
+    def next_batch(self) -> Tuple[List[Job], bool]:
+        """Blocks for one job, then waits `max_delay` for more."""
+        first = self.jobs.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                job = (
+                    self.jobs.get(timeout=timeout)
+                    if timeout > 0
+                    else self.jobs.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if job is None:
+                return batch, True
+            batch.append(job)
+
+        return batch, False
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self.next_batch()
+            if batch:
+                self.commit(batch)
+
+    def commit(self, batch: List[Job]):
+        results = []
+        try:
+            with get_session() as session:
+                for op, _ in batch:
+                    results.append(op(session))
+                session.commit()
+        except Exception:
+            log.debug("Batch of %s failed, replaying it", len(batch))
+            for op, future in batch:
+                try:
+                    future.set_result(run_in_transaction(op))
+                except Exception as e:
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+        self.batches += 1
+        self.operations += len(batch)
+
+
+_writer: GroupCommitWriter | None = None
+
+
+def start_writer(**options) -> GroupCommitWriter:
+    """Routes `run_write` through a group commit writer thread."""
+    global _writer
+    if _writer is None:
+        _writer = GroupCommitWriter(**options)
+        _writer.start()
+    return _writer
+
+
+def stop_writer():
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop()
+        log.info(
+            "Group commit: %s operations in %s batches",
+            writer.operations,
+            writer.batches,
+        )
+
+
+def run_write(op: Operation) -> Any:
+    """Runs and commits `op`, grouped with concurrent writes if enabled."""
+    writer = _writer
+    if writer is None:
+        return run_in_transaction(op)
+    return writer.submit(op).result()
@@ -1,3 +1,4 @@
+import os
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -5,6 +6,8 @@ from sqlalchemy import pool
 
 from alembic import context
 from dundie import models
+from dundie.config import load_config
+from dundie.settings import SQL_CON_STRING
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -15,6 +18,11 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# A database_url set in the env or in the dundie config file points
+# migrations to the same database as the app.
+if os.getenv("DUNDIE_DATABASE_URL") or "database_url" in load_config():
+    config.set_main_option("sqlalchemy.url", SQL_CON_STRING)
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -0,0 +1,48 @@
+"""Adicionando a tabela apitoken
+
+Revision ID: 4c1d2e7a9b10
+Revises: 792aa52e10ec
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d2e7a9b10'
+down_revision: Union[str, None] = '792aa52e10ec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'apitoken',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('person_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'token_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column('created', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['person_id'], ['person.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_apitoken_id'), 'apitoken', ['id'])
+    op.create_index(
+        op.f('ix_apitoken_person_id'), 'apitoken', ['person_id']
+    )
+    op.create_index(
+        op.f('ix_apitoken_token_hash'), 'apitoken', ['token_hash'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_apitoken_token_hash'), table_name='apitoken')
+    op.drop_index(op.f('ix_apitoken_person_id'), table_name='apitoken')
+    op.drop_index(op.f('ix_apitoken_id'), table_name='apitoken')
+    op.drop_table('apitoken')
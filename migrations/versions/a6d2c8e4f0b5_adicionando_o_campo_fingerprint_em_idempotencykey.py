@@ -0,0 +1,36 @@
+"""Adicionando o campo fingerprint em idempotencykey
+
+Revision ID: a6d2c8e4f0b5
+Revises: f3a7b1d9c5e4
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2c8e4f0b5'
+down_revision: Union[str, None] = 'f3a7b1d9c5e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Chaves antigas ficam sem fingerprint e nao sao comparadas.
+    op.add_column(
+        'idempotencykey',
+        sa.Column(
+            'fingerprint',
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+            server_default='',
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('idempotencykey', 'fingerprint')
@@ -0,0 +1,46 @@
+"""Hash das senhas em user
+
+Revision ID: b7e3f95c0d21
+Revises: 4c1d2e7a9b10
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from dundie.utils.user import hash_passwords
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f95c0d21'
+down_revision: Union[str, None] = '4c1d2e7a9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+user = sa.table(
+    'user', sa.column('id', sa.Integer), sa.column('password', sa.String)
+)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(user.c.id, user.c.password).where(
+            user.c.password.not_like('scrypt$%')
+        )
+    ).all()
+
+    hashes = hash_passwords([password for _, password in rows])
+    for (user_id, _), password_hash in zip(rows, hashes):
+        connection.execute(
+            user.update()
+            .where(user.c.id == user_id)
+            .values(password=password_hash)
+        )
+
+
+def downgrade() -> None:
+    # Hashes cannot be reverted, users keep their current passwords.
+    pass
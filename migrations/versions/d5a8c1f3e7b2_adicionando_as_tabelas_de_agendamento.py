@@ -0,0 +1,59 @@
+"""Adicionando as tabelas de agendamento
+
+Revision ID: d5a8c1f3e7b2
+Revises: b7e3f95c0d21
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8c1f3e7b2'
+down_revision: Union[str, None] = 'b7e3f95c0d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'grantrule',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dept', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('value', sa.Numeric(scale=3), nullable=False),
+        sa.Column(
+            'period', sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column(
+            'actor', sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column('active', sa.Boolean(), nullable=False),
+        sa.Column('created', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_grantrule_id'), 'grantrule', ['id'])
+    op.create_table(
+        'grantrun',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rule_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'period', sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column('people', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['rule_id'], ['grantrule.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('rule_id', 'period'),
+    )
+    op.create_index(op.f('ix_grantrun_id'), 'grantrun', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_grantrun_id'), table_name='grantrun')
+    op.drop_table('grantrun')
+    op.drop_index(op.f('ix_grantrule_id'), table_name='grantrule')
+    op.drop_table('grantrule')
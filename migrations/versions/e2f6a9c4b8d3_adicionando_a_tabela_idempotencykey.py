@@ -0,0 +1,50 @@
+"""Adicionando a tabela idempotencykey
+
+Revision ID: e2f6a9c4b8d3
+Revises: d5a8c1f3e7b2
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f6a9c4b8d3'
+down_revision: Union[str, None] = 'd5a8c1f3e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'idempotencykey',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('person_id', sa.Integer(), nullable=False),
+        sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            'command', sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column(
+            'result', sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column('created', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['person_id'], ['person.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('person_id', 'key'),
+    )
+    op.create_index(op.f('ix_idempotencykey_id'), 'idempotencykey', ['id'])
+    op.create_index(
+        op.f('ix_idempotencykey_created'), 'idempotencykey', ['created']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_idempotencykey_created'), table_name='idempotencykey'
+    )
+    op.drop_index(op.f('ix_idempotencykey_id'), table_name='idempotencykey')
+    op.drop_table('idempotencykey')
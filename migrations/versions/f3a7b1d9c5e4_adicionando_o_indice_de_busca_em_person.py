@@ -0,0 +1,72 @@
+"""Adicionando o indice de busca em person
+
+Revision ID: f3a7b1d9c5e4
+Revises: e2f6a9c4b8d3
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7b1d9c5e4'
+down_revision: Union[str, None] = 'e2f6a9c4b8d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabela FTS5 e triggers, apenas no SQLite. Copia de
+# `dundie.models.PERSON_SEARCH_DDL` na data desta migracao.
+PERSON_SEARCH_DDL = [
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS person_search USING fts5("
+        "name, email, dept, role, content='person', content_rowid='id', "
+        "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS person_search_insert "
+        "AFTER INSERT ON person BEGIN "
+        "INSERT INTO person_search(rowid, name, email, dept, role) "
+        "VALUES (new.id, new.name, new.email, new.dept, new.role); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS person_search_delete "
+        "AFTER DELETE ON person BEGIN "
+        "INSERT INTO person_search(person_search, rowid, name, email, dept, "
+        "role) VALUES ('delete', old.id, old.name, old.email, old.dept, "
+        "old.role); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS person_search_update "
+        "AFTER UPDATE OF name, email, dept, role ON person BEGIN "
+        "INSERT INTO person_search(person_search, rowid, name, email, dept, "
+        "role) VALUES ('delete', old.id, old.name, old.email, old.dept, "
+        "old.role); "
+        "INSERT INTO person_search(rowid, name, email, dept, role) "
+        "VALUES (new.id, new.name, new.email, new.dept, new.role); END"
+    ),
+]
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f('ix_movement_person_id'), 'movement', ['person_id']
+    )
+
+    if op.get_context().dialect.name == 'sqlite':
+        for statement in PERSON_SEARCH_DDL:
+            op.execute(statement)
+        op.execute(
+            "INSERT INTO person_search(person_search) VALUES ('rebuild')"
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS person_search_update')
+        op.execute('DROP TRIGGER IF EXISTS person_search_delete')
+        op.execute('DROP TRIGGER IF EXISTS person_search_insert')
+        op.execute('DROP TABLE IF EXISTS person_search')
+
+    op.drop_index(op.f('ix_movement_person_id'), table_name='movement')
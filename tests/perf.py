@@ -0,0 +1,140 @@
+"""Pytest plugin timing core operations and failing on regressions.
+
+Tests marked `perf` receive the `perf` fixture, a callable that runs a
+function a few times and records its best time:
+
+    @pytest.mark.perf(rounds=5, threshold=0.5)
+    def test_read_speed(perf):
+        perf(core.read)
+
+    pytest -m perf --perf-save=.perf.json        # record a baseline
+    pytest -m perf --perf-baseline=.perf.json    # fail when slower
+
+A timing fails the test when it exceeds the baseline by more than
+`threshold` (a fraction, `--perf-threshold` by default), a missing
+baseline file is an error. Works under pytest-xdist, worker timings are
+merged by the controller. CI times the base branch of every pull request
+and compares the pull request against it.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "performance regression checks")
+    group.addoption(
+        "--perf-baseline",
+        default=None,
+        help="JSON file with previous timings to compare against.",
+    )
+    group.addoption(
+        "--perf-save",
+        default=None,
+        help="Write the timings of this run to a JSON file.",
+    )
+    group.addoption(
+        "--perf-threshold",
+        type=float,
+        default=0.5,
+        help="Allowed slowdown over the baseline, 0.5 means 50%%.",
+    )
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(PerfRecorder(config), "dundie-perf")
+
+
+class PerfRecorder:
+    """Keeps the best timing of every perf test, in seconds."""
+
+    def __init__(self, config):
+        self.config = config
+        self.timings: Dict[str, float] = {}
+        self.baseline: Dict[str, float] = {}
+
+        path = config.getoption("perf_baseline")
+        if path and not Path(path).exists():
+            raise pytest.UsageError(
+                f"No perf baseline at {path}, record one with --perf-save"
+            )
+        if path:
+            self.baseline = json.loads(Path(path).read_text())
+
+    def check(self, name: str, best: float, threshold: float | None):
+        self.timings[name] = best
+
+        if name not in self.baseline:
+            return
+        if threshold is None:
+            threshold = self.config.getoption("perf_threshold")
+
+        limit = self.baseline[name] * (1 + threshold)
+        if best > limit:
+            pytest.fail(
+                f"{name} took {best * 1000:.2f}ms, baseline "
+                f"{self.baseline[name] * 1000:.2f}ms (+{threshold:.0%} "
+                f"allowed)",
+                pytrace=False,
+            )
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        # pytest-xdist controller: collect the timings of a worker.
+        timings = getattr(node, "workeroutput", {}).get("perf_timings")
+        if timings:
+            self.timings.update(json.loads(timings))
+
+    def pytest_sessionfinish(self, session):
+        workeroutput = getattr(self.config, "workeroutput", None)
+        if workeroutput is not None:
+            workeroutput["perf_timings"] = json.dumps(self.timings)
+            return
+
+        path = self.config.getoption("perf_save")
+        if path and self.timings:
+            Path(path).write_text(
+                json.dumps(dict(sorted(self.timings.items())), indent=2)
+            )
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.timings:
+            return
+
+        terminalreporter.section("perf timings")
+        for name, best in sorted(self.timings.items()):
+            line = f"{name:<60} {best * 1000:9.2f}ms"
+            if name in self.baseline:
+                change = best / self.baseline[name] - 1
+                line += f" {change:+7.1%}"
+            terminalreporter.write_line(line)
+
+
+@pytest.fixture
+def perf(request) -> Callable:
+    """Times a callable, see the module docstring."""
+    marker = request.node.get_closest_marker("perf")
+    if marker is None:
+        pytest.fail("The perf fixture needs @pytest.mark.perf")
+
+    rounds = marker.kwargs.get("rounds", 5)
+    threshold = marker.kwargs.get("threshold")
+    recorder = request.config.pluginmanager.get_plugin("dundie-perf")
+
+    def run(func: Callable, *args, **kwargs):
+        result = func(*args, **kwargs)  # warm up caches and connections
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            best = min(best, time.perf_counter() - start)
+
+        name = request.node.nodeid.split("::", 1)[-1]
+        recorder.check(name, best, threshold)
+        return result
+
+    return run
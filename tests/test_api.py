@@ -0,0 +1,143 @@
+import threading
+
+import httpx
+import pytest
+
+from dundie import api
+from dundie.core import create_api_token, read, transfer
+from dundie.database import get_session
+from dundie.utils.auth import principal
+from dundie.utils.db import add_person
+
+
+@pytest.fixture
+def client(fictional_data):
+    session = get_session()
+    for person in fictional_data:
+        add_person(session, person)
+    session.commit()
+
+    server = api.create_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.server_address
+    token = create_api_token()
+
+    with httpx.Client(
+        base_url=f"http://{host}:{port}",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as http:
+        yield http
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_api_requires_a_valid_token(client):
+    response = client.get("/people", headers={"Authorization": "Bearer x"})
+
+    assert response.status_code == 401
+
+
+@pytest.mark.unit
+def test_api_paginates_people(client):
+    response = client.get("/people", params={"per_page": 2})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [item["email"] for item in data["items"]] == [
+        "michael@dundermifflin.com",
+        "joe@doe.com",
+    ]
+    assert data["next_page"] == 2
+
+    data = client.get("/people", params={"per_page": 2, "page": 2}).json()
+    assert [item["email"] for item in data["items"]] == ["jim@doe.com"]
+    assert data["next_page"] is None
+
+
+@pytest.mark.unit
+def test_api_add_and_stats(client):
+    response = client.post("/add", json={"value": 10, "dept": "Sales"})
+    assert response.status_code == 200
+
+    stats = client.get("/stats", params={"dept": "Sales"}).json()
+    assert stats["people"] == 1
+    assert stats["balance"] == 110
+
+
+@pytest.mark.unit
+def test_api_transfer_to_unknown_user(client):
+    response = client.post("/transfer", json={"value": 1, "to": "x@y.com"})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.unit
+def test_api_transfer_refuses_values_below_one(client):
+    balances = [person.balance for person in read()]
+
+    for value in (0, -1000):
+        response = client.post(
+            "/transfer", json={"value": value, "to": "jim@doe.com"}
+        )
+        assert response.status_code == 400
+
+    with pytest.raises(ValueError):
+        transfer(-1000, to_email="jim@doe.com")
+
+    assert [person.balance for person in read()] == balances
+
+
+@pytest.mark.unit
+def test_api_refuses_limit_and_offset(client):
+    for params in ({"limit": 1}, {"offset": 2}):
+        response = client.get("/people", params=params)
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/people", {"from_person": "x"}),
+        ("/people", {"bogus": "1"}),
+        ("/movements", {"currency": "BRL"}),
+        ("/stats", {"page": "2"}),
+    ],
+)
+def test_api_refuses_unknown_parameters(client, path, params):
+    response = client.get(path, params=params)
+
+    assert response.status_code == 400
+    assert response.json()["error"].startswith("Unknown parameters")
+
+
+@pytest.mark.unit
+def test_api_denies_commands_outside_permission(client):
+    with principal("jim@doe.com"):
+        token = create_api_token()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/add", json={"value": 1}, headers=headers)
+    assert response.status_code == 403
+
+    response = client.get("/people", params={"dept": "Sales"}, headers=headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.unit
+def test_api_listings_are_limited_to_the_caller_scope(client):
+    with principal("jim@doe.com"):
+        token = create_api_token()
+
+    response = client.get(
+        "/people", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 200
+    assert [item["email"] for item in response.json()["items"]] == [
+        "jim@doe.com"
+    ]
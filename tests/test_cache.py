@@ -0,0 +1,76 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from dundie import database
+from dundie.core import add, movements, read
+from dundie.database import get_session
+from dundie.utils import cache
+from dundie.utils.db import add_person
+
+
+@pytest.fixture
+def people(fictional_data):
+    session = get_session()
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+    cache.clear_cache()
+
+
+@pytest.mark.unit
+def test_read_is_served_from_cache(people):
+    first = read(dept="Sales")
+
+    with patch("dundie.core.get_rates") as get_rates:
+        second = read(dept="Sales")
+
+    assert second == first
+    get_rates.assert_not_called()
+    assert cache.cache_info()["hits"] == 1
+    assert cache.cache_info()["misses"] == 1
+
+
+@pytest.mark.unit
+def test_writes_invalidate_cached_results(people):
+    before = read(email="joe@doe.com")
+    movements(email="joe@doe.com")
+
+    add(10, email="joe@doe.com")
+
+    assert read(email="joe@doe.com")[0].balance == before[0].balance + 10
+    assert len(movements(email="joe@doe.com")) == 2
+    assert cache.cache_info()["hits"] == 0
+
+
+@pytest.mark.unit
+def test_least_recently_used_entry_is_evicted(people):
+    with patch("dundie.utils.cache.QUERY_CACHE_SIZE", 2):
+        read(dept="Sales")
+        read(dept="Security")
+        read(dept="Sales")
+        read(dept="Management")
+        assert cache.cache_info()["size"] == 2
+
+        read(dept="Sales")
+        read(dept="Security")
+
+    assert cache.cache_info()["hits"] == 2
+    assert cache.cache_info()["misses"] == 4
+
+
+@pytest.mark.unit
+def test_writes_from_other_processes_invalidate_results(people, sqlite_only):
+    balance = read(email="joe@doe.com")[0].balance
+
+    # Another process writing to the file, outside this engine.
+    path = database.engine.url.database
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "UPDATE balance SET value = value + 10 WHERE person_id = "
+            "(SELECT id FROM person WHERE email = 'joe@doe.com')"
+        )
+
+    assert read(email="joe@doe.com")[0].balance == balance + 10
+    assert cache.cache_info()["hits"] == 0
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+import timeit
+from unittest.mock import patch
+
+import pytest
+
+from dundie import config
+from dundie.config import cast, check_config, load_config, setting
+from dundie.utils.errors import ConfigError
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "dundie.toml"
+    path.write_text(
+        "smtp_port = 2525\n[db]\npool_size = 20\npool_pre_ping = false\n"
+    )
+    load_config.cache_clear()
+    with patch.dict(os.environ, {"DUNDIE_CONFIG": str(path)}):
+        yield path
+    load_config.cache_clear()
+
+
+@pytest.mark.unit
+def test_setting_precedence_env_then_file_then_default(config_file):
+    assert setting("SMTP_PORT", 8025) == 2525
+    assert setting("DB_POOL_SIZE", 5) == 20
+    assert setting("DB_POOL_PRE_PING", True) is False
+    assert setting("SMTP_HOST", "localhost") == "localhost"
+
+    with patch.dict(os.environ, {"DUNDIE_SMTP_PORT": "25"}):
+        assert setting("SMTP_PORT", 8025) == 25
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "value, default", [("many", 5), ("maybe", True), (True, 1), ([1], "x")]
+)
+def test_cast_rejects_invalid_values(value, default):
+    with pytest.raises(ConfigError):
+        cast("NAME", value, default)
+
+
+@pytest.mark.unit
+def test_unknown_config_keys_are_refused(config_file):
+    config_file.write_text("smtp_prot = 25\n")
+    load_config.cache_clear()
+
+    with pytest.raises(ConfigError, match="smtp_prot"):
+        check_config()
+
+
+@pytest.mark.unit
+def test_config_is_parsed_once(config_file):
+    assert load_config() is load_config()
+
+    per_call = timeit.timeit(lambda: setting("SMTP_PORT", 8025), number=1000)
+    # Resolving every setting (~30) stays far below a millisecond.
+    assert per_call / 1000 * 30 < 0.001
+
+
+@pytest.mark.unit
+def test_defaults_do_not_import_tomllib(tmp_path):
+    env = {**os.environ, "HOME": str(tmp_path)}
+    env.pop("DUNDIE_CONFIG", None)
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, dundie.settings; print('tomllib' in sys.modules)",
+        ],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
+    assert config.CONFIG_PATHS[0] == "dundie.toml"
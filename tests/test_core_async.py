@@ -0,0 +1,66 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from dundie import core, core_async
+from dundie.database import get_session
+from dundie.utils.db import add_person
+from dundie.utils.errors import AuthenticationError
+
+
+@pytest.fixture
+def people(fictional_data):
+    session = get_session()
+    for person in fictional_data:
+        add_person(session, person)
+    session.commit()
+
+
+@pytest.mark.unit
+def test_async_listings_match_sync_api(people):
+    async def listings():
+        return await asyncio.gather(
+            core_async.read(),
+            core_async.read(dept="Sales"),
+            core_async.movements(),
+            core_async.stats(),
+        )
+
+    read, sales, movements, stats = asyncio.run(listings())
+
+    assert read == core.read()
+    assert sales == core.read(dept="Sales")
+    assert movements == core.movements()
+    assert stats == core.stats()
+
+
+@pytest.mark.unit
+def test_async_read_matches_sync_api_with_lowercase_currency(people):
+    result = asyncio.run(core_async.read(currency="usd"))
+
+    assert result == core.read(currency="usd")
+    assert {person.currency for person in result} == {"USD"}
+    assert all(person.value == person.balance for person in result)
+
+
+@pytest.mark.unit
+def test_async_add_and_transfer_update_balances(people):
+    async def writes():
+        await core_async.add(Decimal(10), dept="Sales")
+        return await core_async.transfer(50, to_email="jim@doe.com")
+
+    assert asyncio.run(writes()) == [True, "Jim Doe"]
+
+    balances = {person.email: person.balance for person in core.read()}
+    assert balances["joe@doe.com"] == 110
+    assert balances["jim@doe.com"] == 550
+    assert balances["michael@dundermifflin.com"] == 50
+
+
+@pytest.mark.unit
+def test_async_login_required_raises_without_login(people, monkeypatch):
+    monkeypatch.setattr("keyring.get_password", lambda *args: None)
+
+    with pytest.raises(AuthenticationError):
+        asyncio.run(core_async.read())
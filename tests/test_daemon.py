@@ -0,0 +1,98 @@
+import os
+import threading
+
+import pytest
+
+from dundie import client
+from dundie.daemon import DaemonServer
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = str(tmp_path / "dundie.sock")
+    server = DaemonServer(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield path
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_forward_runs_command_on_daemon(daemon, capsys):
+    exit_code = client.forward(["show", "--format", "tsv"], daemon)
+
+    out = capsys.readouterr().out
+    assert exit_code == 0
+    assert "michael@dundermifflin.com" in out
+
+
+@pytest.mark.unit
+def test_forward_reports_usage_errors(daemon, capsys):
+    exit_code = client.forward(["bogus"], daemon)
+
+    captured = capsys.readouterr()
+    assert exit_code == 2
+    assert "No such command" in captured.out + captured.err
+
+
+@pytest.mark.unit
+def test_forward_returns_none_without_daemon(tmp_path):
+    assert client.forward(["show"], str(tmp_path / "missing.sock")) is None
+
+
+@pytest.mark.unit
+def test_should_forward_skips_interactive_commands(daemon, monkeypatch):
+    monkeypatch.setattr(client, "DAEMON_SOCKET", daemon)
+    monkeypatch.delenv("DUNDIE_NO_DAEMON", raising=False)
+
+    assert client.should_forward(["show"]) is True
+    assert client.should_forward(["login", "a@b.com"]) is False
+
+
+@pytest.mark.unit
+def test_should_forward_skips_long_running_commands(daemon, monkeypatch):
+    monkeypatch.setattr(client, "DAEMON_SOCKET", daemon)
+    monkeypatch.delenv("DUNDIE_NO_DAEMON", raising=False)
+
+    assert client.should_forward(["api", "--port", "8080"]) is False
+    assert client.should_forward(["load", "people.csv"]) is False
+
+
+@pytest.mark.unit
+def test_forward_runs_locally_with_other_settings(daemon, monkeypatch):
+    monkeypatch.setenv("DUNDIE_DATABASE_URL", "sqlite:////tmp/other.db")
+
+    assert client.forward(["show"], daemon) is None
+
+
+@pytest.mark.unit
+def test_forward_runs_locally_with_other_config_file(
+    daemon, monkeypatch, tmp_path
+):
+    config = tmp_path / "dundie.toml"
+    config.write_text('database_url = "sqlite:////tmp/other.db"\n')
+    monkeypatch.chdir(tmp_path)
+
+    assert client.forward(["show"], daemon) is None
+
+
+@pytest.mark.unit
+def test_client_ignores_sockets_of_other_users(daemon, monkeypatch, tmp_path):
+    monkeypatch.setattr(client, "DAEMON_SOCKET", daemon)
+    monkeypatch.delenv("DUNDIE_NO_DAEMON", raising=False)
+    assert client.should_forward(["show"]) is True
+
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(daemon).st_uid + 1)
+    assert client.should_forward(["show"]) is False
+    assert client.forward(["show"], daemon) is None
+
+
+@pytest.mark.unit
+def test_client_ignores_paths_that_are_not_sockets(tmp_path):
+    planted = tmp_path / "dundie.sock"
+    planted.write_text("")
+
+    assert client.forward(["show"], str(planted)) is None
@@ -1,8 +1,14 @@
 import pytest
 from sqlmodel import select
 
-from dundie.models import Balance, InvalidEmailError, Person
-from dundie.utils.db import add_movement, add_person, get_session
+from dundie.models import Balance, InvalidEmailError, Movement, Person
+from dundie.utils.db import (
+    add_movement,
+    add_person,
+    get_session,
+    increment_balance_sql,
+    withdraw,
+)
 
 
 @pytest.mark.unit
@@ -71,3 +77,28 @@ def test_add_or_remove_points_for_person(fictional_data):
 
     assert before == 500
     assert after == 400
+
+
+@pytest.mark.unit
+def test_withdraw_refuses_to_overdraw(fictional_data):
+    session = get_session()
+    person, *_ = add_person(session, fictional_data[1])
+    session.commit()
+
+    assert withdraw(session, person, 600, "system") is False
+    assert withdraw(session, person, 200, "system") is True
+    session.commit()
+    session.refresh(person.balance)
+    movements = session.exec(
+        select(Movement.value).where(Movement.person_id == person.id)
+    ).all()
+
+    assert person.balance.value == 300
+    assert movements == [500, -200]
+
+
+@pytest.mark.unit
+def test_increment_balance_falls_back_to_update():
+    sql = increment_balance_sql("mssql", 1, 10)
+
+    assert str(sql).startswith("UPDATE balance")
@@ -0,0 +1,105 @@
+import asyncio
+import socket
+from unittest.mock import patch
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from dundie.utils.email import (
+    send_bulk_email,
+    send_emails_async,
+    send_emails_blocking,
+)
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.received = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.append((envelope.mail_from, envelope.rcpt_tos))
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture
+def smtp_server():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    with (
+        patch("dundie.utils.email.SMTP_HOST", "127.0.0.1"),
+        patch("dundie.utils.email.SMTP_PORT", port),
+    ):
+        yield handler
+
+    controller.stop()
+
+
+def build_messages(size):
+    return [
+        ("master@dundie.com", f"user{i}@dm.com", "Subject", f"Hello {i}")
+        for i in range(size)
+    ]
+
+
+@pytest.mark.unit
+def test_send_emails_async_delivers_every_message(smtp_server):
+    handler = smtp_server
+    messages = build_messages(25)
+
+    sent = asyncio.run(send_emails_async(messages, concurrency=4))
+
+    assert sent == 25
+    assert sorted(rcpt[0] for _, rcpt in handler.received) == sorted(
+        to for _, to, _, _ in messages
+    )
+
+
+@pytest.mark.unit
+def test_send_emails_blocking_delivers_every_message(smtp_server):
+    handler = smtp_server
+
+    sent = send_emails_blocking(build_messages(5))
+
+    assert sent == 5
+    assert len(handler.received) == 5
+
+
+@pytest.mark.unit
+def test_send_bulk_email_inside_a_running_loop(smtp_server):
+    """
+    Test if the async backend works when called from an event loop.
+    """
+
+    async def send_from_loop():
+        return send_bulk_email(build_messages(3))
+
+    with patch("dundie.utils.email.EMAIL_BACKEND", "async"):
+        sent = asyncio.run(send_from_loop())
+
+    assert sent == 3
+    assert len(smtp_server.received) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", ["smtp", "async"])
+def test_send_bulk_email_reports_undelivered_messages(backend):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    messages = build_messages(3)
+    failed = []
+
+    with (
+        patch("dundie.utils.email.EMAIL_BACKEND", backend),
+        patch("dundie.utils.email.SMTP_HOST", "127.0.0.1"),
+        patch("dundie.utils.email.SMTP_PORT", port),
+    ):
+        assert send_bulk_email(messages, failed) == 0
+
+    assert sorted(failed) == sorted(messages)
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from click.testing import CliRunner
+from sqlmodel import select
+
+from dundie.cli import main
+from dundie.core import add, movements, remove, transfer
+from dundie.database import get_session
+from dundie.models import IdempotencyKey
+from dundie.utils import writer
+from dundie.utils.db import add_person
+from dundie.utils.errors import IdempotencyKeyReused
+from dundie.utils.idempotency import expire_keys
+
+
+@pytest.fixture
+def people(fictional_data):
+    session = get_session()
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+
+@pytest.mark.unit
+def test_retried_add_is_applied_once(people):
+    add(10, email="jim@doe.com", idempotency_key="run-1")
+    add(10, email="jim@doe.com", idempotency_key="run-1")
+    add(10, email="jim@doe.com", idempotency_key="run-2")
+
+    assert len(movements(email="jim@doe.com")) == 3
+
+
+@pytest.mark.unit
+def test_retried_transfer_returns_the_first_result(people):
+    first = transfer(5, to_email="jim@doe.com", idempotency_key="t-1")
+    second = transfer(5, to_email="jim@doe.com", idempotency_key="t-1")
+
+    assert first == second == [True, "Jim Doe"]
+    assert len(movements(email="jim@doe.com")) == 2
+
+
+@pytest.mark.unit
+def test_key_reused_for_another_command_is_refused(people):
+    add(1, email="jim@doe.com", idempotency_key="k")
+
+    with pytest.raises(IdempotencyKeyReused):
+        transfer(1, to_email="jim@doe.com", idempotency_key="k")
+
+
+@pytest.mark.unit
+def test_concurrent_retries_write_once(people):
+    writer.start_writer(max_delay=0.05)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            list(
+                pool.map(
+                    lambda _: add(1, email="joe@doe.com", idempotency_key="c"),
+                    range(8),
+                )
+            )
+    finally:
+        writer.stop_writer()
+
+    assert len(movements(email="joe@doe.com")) == 2
+
+
+@pytest.mark.unit
+def test_expired_keys_are_deleted_in_bulk(people):
+    add(1, email="jim@doe.com", idempotency_key="old")
+    add(1, email="jim@doe.com", idempotency_key="new")
+
+    with get_session() as session:
+        assert expire_keys(session, datetime.now()) == 0
+        assert expire_keys(session, datetime.now() + timedelta(days=2)) == 2
+        session.commit()
+        assert session.exec(select(IdempotencyKey)).all() == []
+
+
+@pytest.mark.unit
+def test_add_command_with_idempotency_key(people):
+    runner = CliRunner()
+    args = ["add", "3", "--email", "jim@doe.com", "--idempotency-key", "x"]
+
+    assert runner.invoke(main, args).exit_code == 0
+    assert runner.invoke(main, args).exit_code == 0
+
+    assert len(movements(email="jim@doe.com")) == 2
+
+
+@pytest.mark.unit
+def test_key_reused_with_other_arguments_is_refused(people):
+    add(10, email="jim@doe.com", idempotency_key="k")
+    add(Decimal("10.0"), email="jim@doe.com", idempotency_key="k")
+
+    with pytest.raises(IdempotencyKeyReused):
+        add(99, email="jim@doe.com", idempotency_key="k")
+    with pytest.raises(IdempotencyKeyReused):
+        add(10, email="joe@doe.com", idempotency_key="k")
+
+    transfer(5, to_email="jim@doe.com", idempotency_key="t")
+    with pytest.raises(IdempotencyKeyReused):
+        transfer(6, to_email="jim@doe.com", idempotency_key="t")
+
+    assert len(movements(email="jim@doe.com")) == 3
+
+
+@pytest.mark.unit
+def test_remove_does_not_share_keys_with_add(people):
+    add(10, email="jim@doe.com", idempotency_key="k")
+
+    with pytest.raises(IdempotencyKeyReused):
+        remove(10, email="jim@doe.com", idempotency_key="k")
+
+    remove(3, email="jim@doe.com", idempotency_key="r")
+    remove(3, email="jim@doe.com", idempotency_key="r")
+
+    values = [m.value for m in movements(email="jim@doe.com")]
+    assert values[-1] == -3
+    assert len(values) == 3
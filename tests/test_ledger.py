@@ -0,0 +1,74 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from dundie import database
+from dundie.cli import main
+from dundie.core import add, export_ledger, movements
+from dundie.database import get_session
+from dundie.ledger import LedgerReader
+from dundie.utils.db import add_person
+
+
+@pytest.fixture
+def people(fictional_data, monkeypatch):
+    # Movements record $USER as their actor.
+    monkeypatch.setenv("USER", "alice")
+
+    session = get_session()
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+    add(Decimal("12.345"), email="jim@doe.com")
+    add(-3, dept="Sales")
+
+
+@pytest.mark.unit
+def test_export_ledger_round_trip(people, tmp_path):
+    path = tmp_path / "ledger.dlg"
+
+    assert export_ledger(str(path), chunk_size=2) == 5
+
+    with LedgerReader(str(path)) as ledger:
+        rows = list(ledger.rows())
+        assert len(ledger) == 5
+        assert ledger.actors == ["system", "alice"]
+        assert sum(ledger.column("value")) == 700_000 + 12_345 - 3_000
+
+    expected = [(m.date, m.value, m.actor) for m in movements()]
+    assert sorted(row[2:] for row in rows) == sorted(expected)
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[3][3] == Decimal("12.345")
+
+
+@pytest.mark.unit
+def test_export_ledger_streams_outside_sqlite(people, sqlite_only, tmp_path):
+    raw, streamed = tmp_path / "raw.dlg", tmp_path / "streamed.dlg"
+    export_ledger(str(raw), chunk_size=2)
+
+    with patch.object(database.engine.dialect, "name", "postgresql"):
+        assert export_ledger(str(streamed), chunk_size=2) == 5
+
+    assert streamed.read_bytes() == raw.read_bytes()
+
+
+@pytest.mark.unit
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-ledger"
+    path.write_bytes(b"x" * 64)
+
+    with pytest.raises(ValueError):
+        LedgerReader(str(path))
+
+
+@pytest.mark.unit
+def test_export_ledger_command(people, tmp_path):
+    path = tmp_path / "ledger.dlg"
+
+    result = CliRunner().invoke(main, ["export-ledger", str(path)])
+
+    assert result.exit_code == 0
+    assert "Exported 5 movements" in result.output
@@ -1,6 +1,6 @@
 import pytest
 
-from dundie.core import load
+from dundie.core import load, load_diff
 
 from .constants import TEST_PEOPLE_FILE
 
@@ -33,3 +33,76 @@ def test_load_positive_created_first_person():
 
     first_person = load(TEST_PEOPLE_FILE)[0]
     assert test_person == first_person
+
+
+@pytest.mark.unit
+@pytest.mark.high
+def test_load_positive_emails_new_people(outbox):
+    """
+    Test if load sends the password email to each created person.
+    """
+    load(TEST_PEOPLE_FILE)
+
+    assert sorted(to for _, to, _, _ in outbox) == [
+        "bruno@dm.com",
+        "jim@dundlermifflin.com",
+        "schrute@dundlermifflin.com",
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.high
+def test_load_diff_positive_does_not_write_to_database():
+    """
+    Test if load_diff summarizes the changes without saving anything.
+    """
+    summary = load_diff(TEST_PEOPLE_FILE)
+
+    assert len(summary["created"]) == 3
+    assert summary["updated"] == []
+    assert summary["missing"] == ["michael@dundermifflin.com"]
+
+    summary = load_diff(TEST_PEOPLE_FILE)
+    assert len(summary["created"]) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.medium
+def test_load_diff_positive_detects_updated_people(tmp_path):
+    """
+    Test if load_diff reports people whose dept, role or currency changed.
+    """
+    load(TEST_PEOPLE_FILE)
+
+    changed_file = tmp_path / "people.csv"
+    changed_file.write_text(
+        "Jim Halpert, Sales, Manager, jim@dundlermifflin.com, USD\n"
+    )
+
+    summary = load_diff(str(changed_file))
+
+    assert summary["updated"] == ["jim@dundlermifflin.com"]
+    assert summary["created"] == []
+    assert summary["unchanged"] == 0
+    assert len(summary["missing"]) == 3
+
+
+@pytest.mark.unit
+@pytest.mark.medium
+def test_load_positive_repeated_email_is_an_update(tmp_path):
+    """
+    Test if a person repeated in the file is created once and then
+    reported as updated, by load and by load_diff.
+    """
+    people_file = tmp_path / "people.csv"
+    people_file.write_text(
+        "Pam Beesly, Sales, Salesman, pam@dm.com, USD\n"
+        "Pam Beesly, Sales, Manager, pam@dm.com, USD\n"
+    )
+
+    summary = load_diff(str(people_file))
+    assert summary["created"] == ["pam@dm.com"]
+    assert summary["updated"] == ["pam@dm.com"]
+
+    result = load(str(people_file))
+    assert [person["created"] for person in result] == [True, False]
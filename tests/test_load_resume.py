@@ -0,0 +1,245 @@
+import json
+import os
+from csv import reader
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+from sqlmodel import select
+
+from dundie import core
+from dundie.cli import main
+from dundie.core import load, reject_path
+from dundie.database import get_session
+from dundie.models import Person
+from dundie.utils.checkpoint import Checkpoint, Outbox, Position
+from dundie.utils.errors import CheckpointError
+
+ROWS = [
+    f"Person {number}, Sales, Salesman, person{number}@dm.com, USD"
+    for number in range(1, 8)
+]
+
+
+def people_emails():
+    with get_session() as session:
+        emails = session.exec(select(Person.email)).all()
+    return sorted(email for email in emails if email.startswith("person"))
+
+
+@pytest.fixture
+def roster(tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text("\n".join(ROWS) + "\n")
+    return str(path)
+
+
+@pytest.mark.unit
+@pytest.mark.high
+def test_load_positive_rejects_invalid_rows(roster):
+    """
+    Test if load writes the failing rows to the reject file and loads
+    the others.
+    """
+    with open(roster, "a") as file:
+        file.write("Bad Email, Sales, Salesman, not-an-email, USD\n")
+        file.write("Too Few, Sales, few@dm.com\n")
+
+    result = load(roster, chunk_size=3)
+
+    assert len(result) == 7
+    assert len(people_emails()) == 7
+
+    with open(reject_path(roster)) as file:
+        rejects = list(reader(file))
+    assert [row[0] for row in rejects] == ["8", "9"]
+    assert rejects[0][-2] == "not-an-email"
+    assert not os.path.exists(Checkpoint(roster).path)
+
+
+@pytest.mark.unit
+@pytest.mark.high
+def test_load_positive_resumes_from_checkpoint(roster, outbox):
+    """
+    Test if a load that fails keeps the committed chunks and a resume
+    loads only the rest.
+    """
+    hash_passwords = core.hash_passwords
+    calls = []
+
+    def failing_hash(passwords):
+        calls.append(passwords)
+        if len(calls) == 2:
+            raise RuntimeError("worker died")
+        return hash_passwords(passwords)
+
+    with (
+        patch("dundie.core.hash_passwords", failing_hash),
+        pytest.raises(RuntimeError),
+    ):
+        load(roster, chunk_size=3)
+
+    assert people_emails() == [f"person{n}@dm.com" for n in (1, 2, 3)]
+    with open(Checkpoint(roster).path) as file:
+        assert json.load(file)["row"] == 3
+
+    result = load(roster, resume=True, chunk_size=3)
+
+    assert [person["email"] for person in result] == [
+        f"person{n}@dm.com" for n in range(4, 8)
+    ]
+    assert len(people_emails()) == 7
+    assert len(outbox) == 7
+    assert not os.path.exists(Checkpoint(roster).path)
+
+
+@pytest.mark.unit
+@pytest.mark.high
+def test_load_positive_resume_writes_rejects_once(roster):
+    """
+    Test if the rejects of a chunk that was not committed are written
+    only by the run that commits it.
+    """
+    lines = ROWS[:4] + ["Bad Email, Sales, Salesman, not-an-email, USD"]
+    with open(roster, "w") as file:
+        file.write("\n".join(lines) + "\n")
+    hash_passwords = core.hash_passwords
+    calls = []
+
+    def failing_hash(passwords):
+        calls.append(passwords)
+        if len(calls) == 2:
+            raise RuntimeError("worker died")
+        return hash_passwords(passwords)
+
+    with (
+        patch("dundie.core.hash_passwords", failing_hash),
+        pytest.raises(RuntimeError),
+    ):
+        load(roster, chunk_size=3)
+
+    assert not os.path.exists(reject_path(roster))
+
+    load(roster, resume=True, chunk_size=3)
+
+    with open(reject_path(roster)) as file:
+        assert [row[0] for row in reader(file)] == ["5"]
+
+
+@pytest.mark.unit
+@pytest.mark.medium
+def test_load_positive_rejects_undecodable_rows(roster):
+    """
+    Test if a row that is not UTF-8 is rejected instead of stopping the
+    load.
+    """
+    with open(roster, "ab") as file:
+        file.write(b"J\xf3, Sales, Salesman, jo@dm.com, USD\n")
+
+    result = load(roster)
+
+    assert len(result) == 7
+    with open(reject_path(roster)) as file:
+        rejects = list(reader(file))
+    assert rejects[0][0] == "8"
+    assert "utf-8" in rejects[0][1]
+    assert rejects[0][2].startswith("J\\xf3")
+
+
+@pytest.mark.unit
+@pytest.mark.high
+def test_load_positive_resume_resends_undelivered_emails(roster, outbox):
+    """
+    Test if emails that could not be sent are kept in the outbox and
+    sent by the next resume.
+    """
+
+    def failing_bulk(messages, failed=None):
+        failed.extend(messages[1:])
+        outbox.extend(messages[:1])
+        return 1
+
+    with patch("dundie.core.send_bulk_email", failing_bulk):
+        load(roster, chunk_size=3)
+
+    undelivered = Outbox(roster)
+    assert len(undelivered.pending()) == 4
+    assert os.stat(undelivered.path).st_mode & 0o777 == 0o600
+    out = CliRunner().invoke(main, ["load", roster])
+    assert "load --resume" in out.output
+
+    outbox.clear()
+    load(roster, resume=True)
+
+    assert sorted(message[1] for message in outbox) == [
+        f"person{n}@dm.com" for n in (2, 3, 5, 6)
+    ]
+    assert not os.path.exists(undelivered.path)
+
+
+@pytest.mark.unit
+@pytest.mark.high
+def test_load_positive_emails_survive_a_failure_after_commit(roster, outbox):
+    """
+    Test if the emails of a committed chunk are sent by a resume when
+    the load dies before sending them.
+    """
+    with (
+        patch("dundie.core.RejectFile.write", side_effect=OSError("full")),
+        pytest.raises(OSError),
+    ):
+        load(roster, chunk_size=3)
+
+    assert len(Outbox(roster).pending()) == 3
+    assert outbox == []
+
+    load(roster, resume=True, chunk_size=3)
+
+    assert len(outbox) == 7
+    assert not os.path.exists(Outbox(roster).path)
+
+
+@pytest.mark.unit
+@pytest.mark.medium
+def test_load_negative_failed_commit_keeps_no_emails(roster):
+    """
+    Test if the emails of a chunk whose commit fails are not kept.
+    """
+    with (
+        patch("sqlmodel.Session.commit", side_effect=RuntimeError("down")),
+        pytest.raises(RuntimeError),
+    ):
+        load(roster, chunk_size=3)
+
+    assert not os.path.exists(Outbox(roster).path)
+
+
+@pytest.mark.unit
+@pytest.mark.medium
+def test_load_negative_resume_of_changed_file(roster):
+    """
+    Test if resuming refuses a file changed since its checkpoint.
+    """
+    Checkpoint(roster).save(Position(10, 1))
+    with open(roster, "a") as file:
+        file.write("New Person, Sales, Salesman, new@dm.com, USD\n")
+
+    with pytest.raises(CheckpointError):
+        load(roster, resume=True)
+
+
+@pytest.mark.unit
+@pytest.mark.medium
+def test_load_positive_cli_resume(roster):
+    """
+    Test if `dundie load --resume` skips the rows already committed.
+    """
+    first_chunk = len(ROWS[0]) + len(ROWS[1]) + 2
+    Checkpoint(roster).save(Position(first_chunk, 2))
+
+    out = CliRunner().invoke(
+        main, ["load", roster, "--resume", "--chunk-size", "2"]
+    )
+
+    assert out.exit_code == 0, out.output
+    assert people_emails() == [f"person{n}@dm.com" for n in range(3, 8)]
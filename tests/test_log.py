@@ -0,0 +1,60 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from dundie.utils.log import (
+    DeferredQueueHandler,
+    JSONFormatter,
+    get_logger,
+    parse_levels,
+)
+
+
+@pytest.mark.unit
+def test_get_logger_configures_handlers_once():
+    get_logger("dundie.core")
+    get_logger("dundie.api")
+
+    handlers = get_logger().handlers
+
+    assert len(handlers) == 1
+    assert isinstance(handlers[0], DeferredQueueHandler)
+
+
+@pytest.mark.unit
+def test_records_are_queued_with_their_arguments_merged():
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("test.deferred")
+    logger.propagate = False
+    logger.addHandler(DeferredQueueHandler(records))
+
+    values = [1]
+    logger.warning("values=%s", values)
+    values.append(2)
+
+    record = records.get_nowait()
+    assert record.msg == "values=[1]"
+    assert record.args is None
+
+
+@pytest.mark.unit
+def test_json_formatter():
+    record = logging.LogRecord(
+        "dundie.api", logging.INFO, "api.py", 10, "hello %s", ("jim",), None
+    )
+
+    data = json.loads(JSONFormatter().format(record))
+
+    assert data["message"] == "hello jim"
+    assert data["logger"] == "dundie.api"
+    assert data["level"] == "INFO"
+
+
+@pytest.mark.unit
+def test_parse_levels():
+    assert parse_levels("api=info, utils.email=DEBUG,") == {
+        "dundie.api": "INFO",
+        "dundie.utils.email": "DEBUG",
+    }
@@ -0,0 +1,66 @@
+"""Timings of the core operations, see `tests.perf`."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.data import seeded_database
+from dundie import core
+from tests.perf import PerfRecorder
+
+PEOPLE = 2_000
+
+
+@pytest.fixture
+def seeded(setup_testing_database):
+    with (
+        seeded_database(PEOPLE, movements=3),
+        patch("dundie.utils.cache.QUERY_CACHE_SIZE", 0),
+    ):
+        yield
+
+
+@pytest.mark.perf
+def test_perf_read(seeded, perf):
+    assert len(perf(core.read)) == PEOPLE
+
+
+@pytest.mark.perf
+def test_perf_read_page(seeded, perf):
+    assert len(perf(core.read, dept="Dept 7", limit=20)) == 20
+
+
+@pytest.mark.perf
+def test_perf_movements(seeded, perf):
+    assert len(perf(core.movements, dept="Dept 7")) == PEOPLE // 50 * 3
+
+
+@pytest.mark.perf
+def test_perf_stats(seeded, perf):
+    assert perf(core.stats)["people"] == PEOPLE
+
+
+@pytest.mark.perf
+def test_perf_search(seeded, perf):
+    assert len(perf(core.search, term="person 12", limit=20)) == 20
+
+
+@pytest.mark.perf
+def test_perf_add_to_dept(seeded, perf):
+    perf(core.add, 1, dept="Dept 7")
+
+
+@pytest.mark.perf(rounds=20)
+def test_perf_transfer(seeded, perf):
+    assert perf(core.transfer, 1, to_email="person1@dm.com")[0]
+
+
+@pytest.mark.unit
+def test_perf_missing_baseline_is_an_error(tmp_path):
+    config = SimpleNamespace(
+        getoption=lambda name: str(tmp_path / "missing.json")
+    )
+
+    with pytest.raises(pytest.UsageError, match="--perf-save"):
+        PerfRecorder(config)
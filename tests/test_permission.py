@@ -0,0 +1,90 @@
+import pytest
+
+from dundie.core import movements, read, stats
+from dundie.database import get_session
+from dundie.models import Person
+from dundie.utils.auth import Scope, get_permission, principal, resolve_scope
+from dundie.utils.db import add_person
+
+
+@pytest.fixture
+def office():
+    people = [
+        Person(
+            name="Joe Doe", dept="Sales", role="Manager", email="joe@doe.com"
+        ),
+        Person(
+            name="Ann Doe", dept="Sales", role="Clerk", email="ann@doe.com"
+        ),
+        Person(
+            name="Jim Doe", dept="Security", role="Guard", email="jim@doe.com"
+        ),
+    ]
+    session = get_session()
+    for person in people:
+        add_person(session, person)
+    session.commit()
+    return {person.email: person for person in people}
+
+
+@pytest.mark.unit
+def test_resolve_scope_by_role(office):
+    admin = Person(
+        name="Michael",
+        dept="Management",
+        role="Manager",
+        email="michael@dundermifflin.com",
+    )
+
+    assert resolve_scope(admin) == Scope()
+    assert resolve_scope(office["joe@doe.com"]) == Scope(dept="Sales")
+    assert resolve_scope(office["jim@doe.com"]) == Scope(
+        dept="Security", email="jim@doe.com"
+    )
+
+
+@pytest.mark.unit
+def test_get_permission_refuses_filters_outside_scope(office):
+    manager = office["joe@doe.com"]
+    clerk = office["ann@doe.com"]
+
+    assert get_permission(manager, {}, "read") is True
+    assert get_permission(manager, {"dept": "Security"}, "read") is False
+    assert get_permission(manager, {"dept": "Sales"}, "add") is False
+    assert get_permission(clerk, {"email": "joe@doe.com"}, "read") is False
+    assert get_permission(clerk, {}, "transfer") is True
+
+
+@pytest.mark.unit
+def test_get_permission_denies_unlisted_commands(office):
+    manager = office["joe@doe.com"]
+
+    assert get_permission(manager, {}, "search") is True
+    assert get_permission(manager, {}, "some_new_command") is False
+    assert get_permission(manager, {}, None) is False
+
+
+@pytest.mark.unit
+def test_manager_listings_only_fetch_own_dept(office):
+    with principal("joe@doe.com"):
+        people = read()
+        other_dept = read(email="jim@doe.com")
+        dept_stats = stats()
+        history = movements()
+
+    assert {record.email for record in people} == {
+        "joe@doe.com",
+        "ann@doe.com",
+    }
+    assert other_dept == []
+    assert list(dept_stats["depts"]) == ["Sales"]
+    assert {record.email for record in history} == {
+        "joe@doe.com",
+        "ann@doe.com",
+    }
+
+
+@pytest.mark.unit
+def test_people_only_see_themselves(office):
+    with principal("ann@doe.com"):
+        assert [record.email for record in read()] == ["ann@doe.com"]
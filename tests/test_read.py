@@ -1,8 +1,12 @@
+from decimal import Decimal
+from unittest.mock import patch
+
 import pytest
 
-from dundie.core import read
+from dundie.core import movements, read
 from dundie.database import get_session
 from dundie.utils.db import add_person
+from dundie.utils.exchange import USDRate
 
 
 @pytest.mark.unit
@@ -19,7 +23,75 @@ def test_read_with_query(fictional_data):
     assert len(result) == 3
 
     result = read(dept="Sales")
-    assert result[0]["name"] == "Joe Doe"
+    assert result[0].name == "Joe Doe"
 
     result = read(email="jim@doe.com")
-    assert result[0]["name"] == "Jim Doe"
+    assert result[0].name == "Jim Doe"
+
+
+@pytest.mark.unit
+def test_read_returns_records_with_balance_and_value(fictional_data):
+    session = get_session()
+
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+    result = read(email="joe@doe.com")
+
+    assert result[0].balance == 100
+    assert result[0].value == 100
+    assert result[0].last_movement is not None
+    assert result[0]._asdict()["dept"] == "Sales"
+
+
+@pytest.mark.unit
+def test_movements_returns_one_record_per_movement(fictional_data):
+    session = get_session()
+
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+    result = movements(dept="Security")
+
+    assert len(result) == 1
+    assert result[0].email == "jim@doe.com"
+    assert result[0].value == 500
+    assert result[0].actor == "system"
+
+
+def fake_rates(currencies):
+    values = {"USD": 1, "BRL": 5, "EUR": Decimal("0.5")}
+    return {code: USDRate(high=values[code]) for code in currencies}
+
+
+@pytest.mark.unit
+def test_read_converts_each_currency_once(fictional_data):
+    session = get_session()
+    fictional_data[1].currency = "BRL"
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+    with patch("dundie.core.get_rates", side_effect=fake_rates) as rates:
+        result = {record.email: record for record in read()}
+
+    rates.assert_called_once_with(["BRL", "USD"])
+    assert result["jim@doe.com"].value == 2500
+    assert result["joe@doe.com"].value == 100
+
+
+@pytest.mark.unit
+def test_read_reports_values_in_target_currency(fictional_data):
+    session = get_session()
+    fictional_data[1].currency = "BRL"
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+    with patch("dundie.core.get_rates", side_effect=fake_rates):
+        result = read(email="jim@doe.com", currency="eur")
+
+    assert result[0].currency == "EUR"
+    assert result[0].value == 250
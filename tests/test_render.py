@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from dundie.cli import movements, show
+from dundie.utils.render import choose_format
+
+cmd = CliRunner()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "tty,size,expected",
+    [(False, 1, "tsv"), (True, 1, "rich"), (True, 10_000, "pager")],
+)
+def test_choose_format_auto(tty, size, expected):
+    with patch("sys.stdout.isatty", return_value=tty):
+        assert choose_format("auto", size) == expected
+
+
+@pytest.mark.unit
+def test_choose_format_keeps_explicit_format():
+    assert choose_format("fixed", 10_000) == "fixed"
+
+
+@pytest.mark.unit
+def test_show_streams_tsv_when_piped():
+    out = cmd.invoke(show)
+
+    lines = out.output.splitlines()
+    assert lines[0].split("\t")[0] == "Email"
+    assert lines[1].split("\t")[0] == "michael@dundermifflin.com"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("fmt", ["rich", "fixed", "tsv"])
+def test_movements_renders_every_format(fmt):
+    out = cmd.invoke(movements, ["--format", fmt])
+
+    assert out.exit_code == 0
+    assert "system" in out.output
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+from click.testing import CliRunner
+from sqlmodel import select
+
+from dundie.cli import main
+from dundie.core import (
+    add_grant_rule,
+    grant_rules,
+    read,
+    remove_grant_rule,
+    run_schedule,
+)
+from dundie.database import get_session
+from dundie.models import GrantRun
+from dundie.utils.db import add_person
+from dundie.utils.schedule import period_key
+
+
+@pytest.fixture
+def people(fictional_data):
+    session = get_session()
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+
+def balances():
+    return {record.email: record.balance for record in read()}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "period, expected",
+    [("daily", "2026-10-19"), ("weekly", "2026-W43"), ("monthly", "2026-10")],
+)
+def test_period_key(period, expected):
+    assert period_key(period, datetime(2026, 10, 19)) == expected
+
+
+@pytest.mark.unit
+def test_run_schedule_grants_once_per_period(people):
+    add_grant_rule(10, "monthly", dept="Sales")
+    add_grant_rule(1, "daily")
+    before = balances()
+
+    october = datetime(2026, 10, 5)
+    assert len(run_schedule(now=october)) == 2
+    assert run_schedule(now=october) == []
+    assert run_schedule(now=datetime(2026, 10, 6)) == [
+        {"rule": 2, "period": "2026-10-06", "people": 3}
+    ]
+
+    after = balances()
+    assert after["joe@doe.com"] == before["joe@doe.com"] + 12
+    assert after["jim@doe.com"] == before["jim@doe.com"] + 2
+
+    with get_session() as session:
+        assert len(session.exec(select(GrantRun)).all()) == 3
+
+
+@pytest.mark.unit
+def test_removed_rules_are_not_applied(people):
+    rule_id = add_grant_rule(10, "monthly")
+
+    assert remove_grant_rule(rule_id) is True
+    assert remove_grant_rule(rule_id) is False
+    assert grant_rules() == []
+    assert run_schedule() == []
+
+
+@pytest.mark.unit
+def test_schedule_commands(people):
+    runner = CliRunner()
+
+    result = runner.invoke(
+        main, ["schedule", "add", "5", "--dept", "Sales", "--period", "weekly"]
+    )
+    assert result.exit_code == 0
+    assert "Rule 1" in result.output
+
+    result = runner.invoke(main, ["schedule", "run"])
+    assert "applied" in result.output
+    assert "to 1 people" in result.output
+
+    result = runner.invoke(main, ["schedule", "run"])
+    assert "Nothing due." in result.output
@@ -0,0 +1,120 @@
+import pytest
+from click.testing import CliRunner
+from sqlmodel import select, text
+
+from dundie import database
+from dundie.cli import main
+from dundie.core import build_filters, search
+from dundie.database import create_search_index, get_session
+from dundie.models import Person
+from dundie.utils.db import add_person
+from dundie.utils.search import match_expression, search_sql
+
+
+@pytest.fixture
+def people(sqlite_only, fictional_data):
+    session = get_session()
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+
+@pytest.mark.unit
+def test_match_expression_quotes_words_as_prefixes():
+    assert match_expression("jim sal") == '"jim"* "sal"*'
+    assert match_expression('jim" OR "') == '"jim"* "OR"*'
+
+
+@pytest.mark.unit
+def test_search_matches_word_prefixes_across_columns(people):
+    assert [p.email for p in search(term="jim")] == ["jim@doe.com"]
+    assert [p.email for p in search(term="do sec")] == ["jim@doe.com"]
+    assert [p.email for p in search(term="doe.com man")] == ["joe@doe.com"]
+    assert search(term="pam") == []
+    assert search(term="  ") == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("term", ['"', '""', ' " " '])
+def test_search_of_only_quotes_is_empty(people, term):
+    assert search(term=term) == []
+
+    out = CliRunner().invoke(main, ["search", term, "--format", "tsv"])
+    assert out.exit_code == 0, out.output
+
+
+@pytest.mark.unit
+def test_search_ranks_and_filters(people):
+    result = search(term="doe")
+    assert {p.email for p in result} == {"jim@doe.com", "joe@doe.com"}
+
+    result = search(term="doe", dept="Sales")
+    assert [p.name for p in result] == ["Joe Doe"]
+    assert result[0].balance == 100
+
+
+@pytest.mark.unit
+def test_index_follows_updates_and_deletes(people):
+    with get_session() as session:
+        jim = session.exec(select(Person).where(Person.name == "Jim Doe"))
+        jim = jim.one()
+        jim.name = "Jim Halpert"
+        session.add(jim)
+        session.commit()
+
+    assert [p.name for p in search(term="halp")] == ["Jim Halpert"]
+
+    with get_session() as session:
+        session.exec(text("DELETE FROM balance WHERE person_id = 3"))
+        session.exec(text("DELETE FROM movement WHERE person_id = 3"))
+        session.exec(text("DELETE FROM user WHERE person_id = 3"))
+        session.exec(text("DELETE FROM person WHERE id = 3"))
+        session.commit()
+
+    assert search(term="halp") == []
+
+
+@pytest.mark.unit
+def test_substring_fallback_outside_sqlite(people):
+    sql = search_sql("DOE sec", build_filters({}), dialect="postgresql")
+
+    with get_session() as session:
+        rows = session.exec(sql).all()
+
+    assert [row.email for row in rows] == ["jim@doe.com"]
+
+
+@pytest.mark.unit
+def test_search_command_and_rebuild(people):
+    with get_session() as session:
+        session.exec(
+            text(
+                "INSERT INTO person_search(person_search) "
+                "VALUES ('delete-all')"
+            )
+        )
+        session.commit()
+
+    runner = CliRunner()
+    out = runner.invoke(main, ["search", "joe", "--format", "tsv"])
+    assert "Nothing to show." in out.output
+
+    out = runner.invoke(
+        main, ["search", "--rebuild", "joe", "--format", "tsv"]
+    )
+    assert out.exit_code == 0
+    assert "Indexed 3 people" in out.output
+    assert "joe@doe.com" in out.output
+
+
+@pytest.mark.unit
+def test_search_index_is_added_to_older_databases(people):
+    with database.engine.begin() as connection:
+        for name in ("insert", "delete", "update"):
+            connection.exec_driver_sql(f"DROP TRIGGER person_search_{name}")
+        connection.exec_driver_sql("DROP TABLE person_search")
+
+    create_search_index(database.engine)
+    create_search_index(database.engine)
+
+    assert [p.email for p in search(term="jim")] == ["jim@doe.com"]
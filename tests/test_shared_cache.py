@@ -0,0 +1,204 @@
+import multiprocessing
+import os
+import sqlite3
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from dundie import core
+from dundie.database import get_session
+from dundie.models import Person
+from dundie.utils import exchange
+from dundie.utils.auth import principal
+from dundie.utils.db import add_person
+from dundie.utils.auth import get_person, person_key
+from dundie.utils.shared_cache import SharedCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.db"))
+    with (
+        patch("dundie.utils.exchange.shared_cache", cache),
+        patch("dundie.utils.auth.shared_cache", cache),
+        patch.dict(exchange._rates_cache, clear=True),
+    ):
+        yield cache
+
+
+@pytest.mark.unit
+def test_values_are_fetched_once_until_they_expire(cache):
+    calls = []
+
+    def fetch(keys):
+        calls.append(keys)
+        return {key: {"n": len(calls)} for key in keys if key != "bad"}
+
+    assert cache.fetch_many(["a", "bad"], 0.2, fetch) == {"a": {"n": 1}}
+    assert cache.fetch_many(["a"], 0.2, fetch) == {"a": {"n": 1}}
+    assert calls == [["a", "bad"]]
+
+    time.sleep(0.25)
+    assert cache.fetch_many(["a"], 0.2, fetch) == {"a": {"n": 2}}
+
+
+@pytest.mark.unit
+def test_disabled_cache_always_fetches():
+    cache = SharedCache("")
+    fetch = lambda keys: {key: 1 for key in keys}  # noqa: E731
+
+    with patch.object(cache, "connect") as connect:
+        assert cache.fetch_many(["a"], 60, fetch) == {"a": 1}
+        assert cache.get_or_fetch("b", 60, lambda: None) is None
+
+    connect.assert_not_called()
+
+
+def fetch_rate_in_child(calls, results):
+    rate = exchange.get_rates(["BRL"])["BRL"]
+    with results.get_lock():
+        results.value += rate.value == 5
+
+
+@pytest.mark.unit
+def test_concurrent_processes_fetch_a_rate_once(cache):
+    context = multiprocessing.get_context("fork")
+    calls = context.Value("i", 0)
+    results = context.Value("i", 0)
+
+    def slow_upstream(url, *args, **kwargs):
+        with calls.get_lock():
+            calls.value += 1
+        time.sleep(0.2)
+        return httpx.Response(200, json={"USDBRL": {"high": "5"}})
+
+    with patch("httpx.get", slow_upstream):
+        processes = [
+            context.Process(target=fetch_rate_in_child, args=(calls, results))
+            for _ in range(20)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    assert results.value == 20
+    assert calls.value == 1
+
+
+@pytest.mark.unit
+def test_failed_rates_are_not_shared(cache):
+    with patch("httpx.get", return_value=httpx.Response(500)):
+        assert exchange.get_rates(["EUR"])["EUR"].name == "api/error"
+
+    assert cache.get_many([exchange.rate_key("EUR")]) == {}
+
+
+@pytest.mark.unit
+def test_logged_person_is_shared_until_a_load(cache):
+    from dundie.core import load
+    from tests.constants import TEST_PEOPLE_FILE
+
+    person = get_person("michael@dundermifflin.com")
+    assert person.role == "Manager"
+
+    with patch("dundie.utils.auth.get_read_session") as session:
+        assert get_person("michael@dundermifflin.com").id == person.id
+    session.assert_not_called()
+
+    load(TEST_PEOPLE_FILE)
+    assert cache.get_many([person_key("michael@dundermifflin.com")]) == {}
+
+
+@pytest.mark.unit
+def test_logged_person_is_not_shared_across_databases(cache, tmp_path):
+    from sqlmodel import create_engine
+
+    from dundie import models
+
+    assert get_person("michael@dundermifflin.com").role == "Manager"
+
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    models.SQLModel.metadata.create_all(bind=other)
+    with patch("dundie.database.engine", other):
+        assert get_person("michael@dundermifflin.com") is None
+
+    assert get_person("michael@dundermifflin.com").role == "Manager"
+    other.dispose()
+
+
+def counting_fetch(calls):
+    def fetch(keys):
+        calls.append(keys)
+        return {key: len(calls) for key in keys}
+
+    return fetch
+
+
+@pytest.mark.unit
+def test_cache_in_a_directory_others_can_write_is_not_used(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    cache = SharedCache(str(shared / "cache.db"))
+    calls = []
+
+    assert cache.fetch_many(["a"], 60, counting_fetch(calls)) == {"a": 1}
+    assert cache.fetch_many(["a"], 60, counting_fetch(calls)) == {"a": 2}
+    assert not os.path.exists(shared / "cache.db")
+
+
+@pytest.mark.unit
+def test_symlinked_cache_file_is_not_followed(tmp_path):
+    target = tmp_path / "elsewhere.db"
+    (tmp_path / "cache.db").symlink_to(target)
+    cache = SharedCache(str(tmp_path / "cache.db"))
+
+    assert cache.get_or_fetch("a", 60, lambda: 1) == 1
+    assert not target.exists()
+
+
+@pytest.mark.unit
+def test_corrupt_or_locked_cache_falls_back_to_fetch(tmp_path):
+    corrupt = tmp_path / "corrupt.db"
+    corrupt.write_bytes(b"not a database" * 100)
+    corrupt.chmod(0o600)
+    calls = []
+
+    cache = SharedCache(str(corrupt))
+    assert cache.fetch_many(["a"], 60, counting_fetch(calls)) == {"a": 1}
+    cache.delete_prefix("a")
+
+    cache = SharedCache(str(tmp_path / "locked.db"), lock_timeout=0.1)
+    cache.connect()
+    holder = sqlite3.connect(cache.path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        assert cache.fetch_many(["a"], 60, counting_fetch(calls)) == {"a": 2}
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+
+@pytest.mark.unit
+def test_forged_principal_cannot_write(cache):
+    jim = Person(
+        name="Jim Doe", dept="Security", role="Guard", email="jim@doe.com"
+    )
+    with get_session() as session:
+        add_person(session, jim)
+        session.commit()
+    admin = get_person("michael@dundermifflin.com").model_dump()
+    cache.get_or_fetch(person_key("jim@doe.com"), 60, lambda: admin)
+
+    assert get_person("jim@doe.com").role == "Guard"
+
+    with (
+        principal("jim@doe.com"),
+        patch.object(cache, "get_or_fetch") as cached,
+        pytest.raises(SystemExit),
+    ):
+        core.add(1000, email="jim@doe.com")
+    cached.assert_not_called()
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from dundie import database
+from dundie.cli import main
+from dundie.core import add, movements, read
+from dundie.utils.db import add_person
+from dundie.utils.snapshot import snapshot, take_snapshot
+
+
+@pytest.fixture
+def people(sqlite_only, fictional_data):
+    session = database.get_session()
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+
+@pytest.mark.unit
+def test_snapshot_reads_the_database_as_copied(people, tmp_path):
+    path = take_snapshot(str(tmp_path / "copy.db"))
+    add(10, email="jim@doe.com")
+
+    with snapshot(path) as engine:
+        assert "immutable=1" in str(engine.url)
+        assert len(movements(email="jim@doe.com")) == 1
+
+    assert len(movements(email="jim@doe.com")) == 2
+
+
+@pytest.mark.unit
+def test_snapshot_is_opened_read_only_with_mmap(people, tmp_path):
+    with (
+        snapshot(str(tmp_path / "copy.db")),
+        database.get_read_session() as session,
+    ):
+        connection = session.connection().connection
+        mmap_size = connection.execute("PRAGMA mmap_size").fetchone()
+        assert mmap_size[0] > 0
+
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute("DELETE FROM movement")
+
+
+@pytest.mark.unit
+def test_snapshot_is_reused_while_fresh(people, tmp_path):
+    path = str(tmp_path / "copy.db")
+
+    with snapshot(path):
+        pass
+    taken = os.stat(path).st_mtime_ns
+
+    with patch("dundie.utils.snapshot.SNAPSHOT_MAX_AGE", 60), snapshot(path):
+        pass
+    assert os.stat(path).st_mtime_ns == taken
+
+    time.sleep(0.01)
+    with patch("dundie.utils.snapshot.SNAPSHOT_MAX_AGE", 0), snapshot(path):
+        pass
+    assert os.stat(path).st_mtime_ns > taken
+
+
+@pytest.mark.unit
+def test_snapshot_reads_do_not_wait_for_writers(people, tmp_path):
+    path = take_snapshot(str(tmp_path / "copy.db"))
+
+    writer = sqlite3.connect(database.engine.url.database, timeout=0)
+    writer.execute("BEGIN EXCLUSIVE")
+    try:
+        with snapshot(path):
+            assert len(read()) == 3
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+@pytest.mark.unit
+def test_show_command_with_snapshot(people, tmp_path):
+    with patch(
+        "dundie.utils.snapshot.SNAPSHOT_PATH", str(tmp_path / "copy.db")
+    ):
+        out = CliRunner().invoke(
+            main, ["show", "--snapshot", "--format", "tsv"]
+        )
+
+    assert out.exit_code == 0
+    assert "jim@doe.com" in out.output
+    assert (tmp_path / "copy.db").exists()
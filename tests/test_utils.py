@@ -1,7 +1,20 @@
 import pytest
 
 from dundie.utils.email import check_valid_email
-from dundie.utils.user import generate_simple_password
+from unittest.mock import patch
+
+from sqlmodel import select
+
+from dundie.core import login
+from dundie.database import get_session
+from dundie.models import Person, User
+from dundie.utils.user import (
+    generate_simple_password,
+    hash_password,
+    hash_passwords,
+    needs_rehash,
+    verify_password,
+)
 
 
 @pytest.mark.unit
@@ -20,9 +33,7 @@ def test_negative_check_valid_email(address):
 
 @pytest.mark.unit
 def test_generate_simple_password():
-    """Test generation of random simple passwords.
-    TODO: Generate hashed complex passwords, encrypt it
-    """
+    """Test generation of random simple passwords."""
     passwords = []
 
     for _ in range(100):
@@ -31,3 +42,70 @@ def test_generate_simple_password():
     print(passwords)
 
     assert len(set(passwords)) == 100
+
+
+@pytest.mark.unit
+def test_hash_password_is_salted_and_verifiable():
+    first = hash_password("1234")
+    second = hash_password("1234")
+
+    assert first != second
+    assert first.startswith("scrypt$")
+    assert verify_password("1234", first) is True
+    assert verify_password("4321", first) is False
+
+
+@pytest.mark.unit
+def test_verify_password_rejects_plaintext_storage():
+    assert verify_password("1234", "1234") is False
+
+
+@pytest.mark.unit
+def test_hash_passwords_in_process_pool():
+    passwords = [generate_simple_password() for _ in range(4)]
+
+    with patch("dundie.utils.user.PASSWORD_POOL_THRESHOLD", 2):
+        hashes = hash_passwords(passwords)
+
+    assert all(map(verify_password, passwords, hashes))
+
+
+@pytest.mark.unit
+def test_needs_rehash_after_cost_change():
+    stored = hash_password("1234", cost=5)
+
+    assert needs_rehash(stored) is True
+    assert needs_rehash(hash_password("1234")) is False
+
+
+@pytest.mark.unit
+def test_login_checks_hashed_password():
+    with patch("keyring.set_password") as set_password:
+        assert login("michael@dundermifflin.com", "wrong") is False
+        assert login("michael@dundermifflin.com", "1234") is True
+
+    set_password.assert_called_once()
+
+
+@pytest.mark.unit
+def test_login_rehashes_password_after_cost_change():
+    sql = (
+        select(User)
+        .join(Person, Person.id == User.person_id)
+        .where(Person.email == "michael@dundermifflin.com")
+    )
+    with get_session() as session:
+        user = session.exec(sql).one()
+        user.password = hash_password("1234", cost=5)
+        session.commit()
+
+    with patch("keyring.set_password") as set_password:
+        assert login("michael@dundermifflin.com", "1234") is True
+
+    set_password.assert_called_once_with(
+        "Dundie", "logged_user", "michael@dundermifflin.com"
+    )
+    with get_session() as session:
+        stored = session.exec(sql).one().password
+    assert not needs_rehash(stored)
+    assert verify_password("1234", stored)
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+from sqlmodel import select
+
+from dundie.core import add, transfer
+from dundie.database import get_session
+from dundie.models import Balance, Person
+from dundie.utils import writer
+from dundie.utils.db import add_person
+from dundie.utils.errors import InsufficientBalanceError
+
+
+@pytest.fixture
+def group_commit(fictional_data):
+    session = get_session()
+    for person in fictional_data:
+        add_person(session=session, instance=person)
+    session.commit()
+
+    yield writer.start_writer(batch_size=50, max_delay=0.05)
+    writer.stop_writer()
+
+
+def balance(email):
+    with get_session() as session:
+        return session.exec(
+            select(Balance.value).join(Person).where(Person.email == email)
+        ).first()
+
+
+@pytest.mark.unit
+def test_concurrent_writes_share_transactions(group_commit):
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: add(1, email="jim@doe.com"), range(40)))
+
+    assert balance("jim@doe.com") == 540
+    assert group_commit.operations == 40
+    assert group_commit.batches < 40
+
+
+@pytest.mark.unit
+def test_failed_operation_only_fails_its_caller(group_commit):
+    with ThreadPoolExecutor(4) as pool:
+        good = [pool.submit(add, 1, email="joe@doe.com") for _ in range(3)]
+        bad = pool.submit(transfer, 10**6, to_email="joe@doe.com")
+
+        for future in good:
+            future.result()
+        with pytest.raises(InsufficientBalanceError):
+            bad.result()
+
+    assert balance("joe@doe.com") == Decimal(103)
+
+
+@pytest.mark.unit
+def test_run_write_commits_directly_without_writer(fictional_data):
+    session = get_session()
+    add_person(session=session, instance=fictional_data[0])
+    session.commit()
+
+    add(5, email="joe@doe.com")
+
+    assert balance("joe@doe.com") == 105